@@ -0,0 +1,52 @@
+# amostragem.py
+import numpy as np
+
+# Largura útil aproximada do gráfico no layout "centered" do Streamlit
+LARGURA_GRAFICO_PX = 704
+
+def indices_min_max(valores, n_baldes):
+    """
+    Redução por baldes de mínimo/máximo: divide a série em n_baldes faixas
+    consecutivas e mantém, em cada uma, os índices do menor e do maior valor.
+    Totalmente vetorizada (a série é completada com NaN e remodelada em 2D).
+    """
+    n = len(valores)
+    if n_baldes <= 0 or n <= 2 * n_baldes:
+        return np.arange(n)
+    tamanho_balde = -(-n // n_baldes)
+    total_baldes = -(-n // tamanho_balde)
+    baldes = np.full(total_baldes * tamanho_balde, np.nan)
+    baldes[:n] = valores
+    baldes = baldes.reshape(total_baldes, tamanho_balde)
+    inicio_baldes = np.arange(total_baldes) * tamanho_balde
+    return np.union1d(
+        inicio_baldes + np.nanargmin(baldes, axis=1),
+        inicio_baldes + np.nanargmax(baldes, axis=1)
+    )
+
+def indices_obrigatorios(evolucao):
+    """
+    Índices que nunca podem ser descartados: as linhas iniciais, o vencimento e os
+    dois lados de cada mudança de alíquota de IR (o 'salto' de 180/360/720 dias).
+    """
+    n = len(evolucao['dias'])
+    mudancas_aliquota = np.flatnonzero(np.diff(evolucao['aliquota_ir']) != 0)
+    return np.unique(np.concatenate((
+        np.arange(min(2, n)),
+        mudancas_aliquota,
+        mudancas_aliquota + 1,
+        [n - 1] if n else []
+    )).astype(np.int64))
+
+def reduzir_evolucao(evolucao, largura_px=LARGURA_GRAFICO_PX):
+    """
+    Reduz a evolução colunar de uma aplicação para cerca de um ponto por pixel do gráfico,
+    preservando exatamente as descontinuidades de IR e o ponto de vencimento.
+    """
+    if len(evolucao['dias']) <= largura_px:
+        return evolucao
+    indices = np.union1d(
+        indices_min_max(evolucao['valor_liquido'], largura_px // 2),
+        indices_obrigatorios(evolucao)
+    )
+    return {coluna: valores[indices] for coluna, valores in evolucao.items()}
@@ -0,0 +1,269 @@
+# api_comparacao.py
+# Serviço HTTP local (só biblioteca padrão + NumPy) com os mesmos números da página.
+#
+#   python api_comparacao.py --porta 8765
+#   curl -s localhost:8765/comparar -d '{"valor": 10000, "taxa_cdi_anual": 14.65,
+#        "ofertas": [{"nome": "CDB", "tipo": "pos_tributada", "taxa": 100, "prazo_dias": 365},
+#                    {"nome": "LCI", "tipo": "pos_isenta", "taxa": 95, "prazo_dias": 365}]}'
+#
+# Rotas: POST /comparar (uma comparação), POST /comparar/lote ({"comparacoes": [...]}),
+# GET /saude e GET /metricas (percentis de latência por rota).
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from carteira import COLUNAS_RESULTADO, calcular_ofertas
+from produtos import TIPOS_PRODUTO, validar_tipo_produto
+
+PORTA_PADRAO = 8765
+TAXA_CDI_PADRAO = 14.65
+# Latências guardadas por rota para os percentis (as mais recentes)
+JANELA_LATENCIAS = 10_000
+PERCENTIS_LATENCIA = (50, 95, 99)
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+
+_latencias = {}
+_trava_latencias = threading.Lock()
+
+def _ler_comparacao(comparacao, descricao):
+    """
+    Valida e normaliza uma comparação recebida em JSON. Cada oferta tem 'tipo', 'taxa' e
+    'prazo_dias' ou 'vencimento' (AAAA-MM-DD); 'nome' é opcional. Levanta ValueError.
+    """
+    if not isinstance(comparacao, dict):
+        raise ValueError(f"{descricao}: a comparação deve ser um objeto JSON.")
+    ofertas = comparacao.get('ofertas')
+    if not isinstance(ofertas, list) or not ofertas:
+        raise ValueError(f"{descricao}: informe a lista 'ofertas' (ao menos uma).")
+    try:
+        valor = float(comparacao.get('valor', 10000.0))
+        taxa_cdi_anual = float(comparacao.get('taxa_cdi_anual', TAXA_CDI_PADRAO))
+        data_inicio = date.fromisoformat(comparacao['data_inicio']) if comparacao.get('data_inicio') else date.today()
+        nomes, tipos, taxas, prazos = [], [], [], []
+        for posicao, oferta in enumerate(ofertas, start=1):
+            descricao_oferta = f"{descricao}, oferta {posicao}"
+            nomes.append(str(oferta.get('nome') or '').strip() or f"Aplicação {posicao}")
+            tipos.append(validar_tipo_produto(oferta.get('tipo'), descricao_oferta))
+            taxas.append(float(oferta['taxa']))
+            if oferta.get('prazo_dias') not in (None, ''):
+                prazos.append(int(oferta['prazo_dias']))
+            else:
+                prazos.append((date.fromisoformat(oferta['vencimento']) - data_inicio).days)
+    except KeyError as erro:
+        raise ValueError(f"{descricao}: campo obrigatório ausente: {erro}.") from None
+    except (TypeError, AttributeError) as erro:
+        raise ValueError(f"{descricao}: valor inválido ({erro}).") from None
+    if min(prazos) <= 0:
+        raise ValueError(f"{descricao}: os prazos devem ser positivos.")
+    if not all(math.isfinite(numero) for numero in (valor, taxa_cdi_anual, *taxas)):
+        raise ValueError(f"{descricao}: valor, taxas e CDI devem ser números finitos (NaN e Infinity não são aceitos).")
+    return {
+        'valor': valor, 'taxa_cdi_anual': taxa_cdi_anual, 'data_inicio': data_inicio,
+        'nomes': nomes, 'tipos': tipos, 'taxas': taxas, 'prazos': prazos
+    }
+
+def _sem_nao_finitos(corpo):
+    """
+    Copia o corpo da resposta trocando NaN e ±Infinity (ex.: estouro numérico com um CDI
+    absurdo) por None, que vira null: JSON estrito não tem esses valores.
+    """
+    if isinstance(corpo, float):
+        return corpo if math.isfinite(corpo) else None
+    if isinstance(corpo, dict):
+        return {chave: _sem_nao_finitos(valor) for chave, valor in corpo.items()}
+    if isinstance(corpo, (list, tuple)):
+        return [_sem_nao_finitos(valor) for valor in corpo]
+    return corpo
+
+def _ordem_rendimento(valor):
+    """
+    Chave de ordenação dos rendimentos: um valor não finito nunca é o melhor.
+    """
+    return valor if math.isfinite(valor) else -math.inf
+
+def comparar_lote(comparacoes):
+    """
+    Calcula uma lista de comparações. As ofertas de todas as comparações com o mesmo CDI e
+    a mesma data de início são calculadas juntas, numa única chamada vetorizada de
+    carteira.calcular_ofertas para o prazo total e outra para a comparação equivalente
+    (todas as ofertas de cada comparação até o seu vencimento mais curto).
+    Retorna uma lista de resultados na ordem recebida (valores não finitos viram None);
+    levanta ValueError em entradas inválidas.
+    """
+    normalizadas = [_ler_comparacao(comparacao, f"Comparação {posicao}") for posicao, comparacao in enumerate(comparacoes, start=1)]
+
+    grupos = {}
+    for indice, comparacao in enumerate(normalizadas):
+        grupos.setdefault((comparacao['taxa_cdi_anual'], comparacao['data_inicio']), []).append(indice)
+
+    respostas = [None] * len(normalizadas)
+    for (taxa_cdi_anual, data_inicio), indices in grupos.items():
+        membros = [normalizadas[indice] for indice in indices]
+        quantidades = [len(comparacao['nomes']) for comparacao in membros]
+        tipos = np.array([tipo for comparacao in membros for tipo in comparacao['tipos']], dtype=object)
+        taxas = np.array([taxa for comparacao in membros for taxa in comparacao['taxas']])
+        prazos = np.array([prazo for comparacao in membros for prazo in comparacao['prazos']], dtype=np.int64)
+        valores = np.repeat([comparacao['valor'] for comparacao in membros], quantidades)
+        prazos_comparacao = np.repeat([min(comparacao['prazos']) for comparacao in membros], quantidades)
+
+        prazo_total = calcular_ofertas(valores, tipos, taxas, prazos, taxa_cdi_anual, data_inicio)
+        comparacao_equivalente = calcular_ofertas(valores, tipos, taxas, prazos_comparacao, taxa_cdi_anual, data_inicio)
+        colunas = {coluna: prazo_total[coluna].tolist() for coluna in COLUNAS_RESULTADO}
+        rendimentos_comparacao = comparacao_equivalente['rendimento_liquido'].tolist()
+
+        inicio = 0
+        for indice, comparacao, quantidade in zip(indices, membros, quantidades):
+            fim = inicio + quantidade
+            ofertas = [
+                {
+                    'nome': nome,
+                    'tipo': tipo,
+                    'taxa': taxa,
+                    'prazo_dias': prazo,
+                    **{coluna: colunas[coluna][posicao] for coluna in COLUNAS_RESULTADO},
+                    'rendimento_liquido_comparacao': rendimentos_comparacao[posicao]
+                }
+                for posicao, nome, tipo, taxa, prazo in zip(
+                    range(inicio, fim), comparacao['nomes'], comparacao['tipos'], comparacao['taxas'], comparacao['prazos']
+                )
+            ]
+            respostas[indice] = {
+                'data_inicio': data_inicio.isoformat(),
+                'taxa_cdi_anual': taxa_cdi_anual,
+                'valor': comparacao['valor'],
+                'dias_comparacao': min(comparacao['prazos']),
+                'ofertas': ofertas,
+                'melhor_prazo_total': max(ofertas, key=lambda oferta: _ordem_rendimento(oferta['rendimento_liquido']))['nome'],
+                'melhor_comparacao': max(ofertas, key=lambda oferta: _ordem_rendimento(oferta['rendimento_liquido_comparacao']))['nome']
+            }
+            inicio = fim
+    return _sem_nao_finitos(respostas)
+
+def registrar_latencia(rota, segundos):
+    """
+    Guarda a latência de uma requisição (janela das JANELA_LATENCIAS mais recentes por rota).
+    """
+    with _trava_latencias:
+        if rota not in _latencias:
+            _latencias[rota] = {'total': 0, 'janela': deque(maxlen=JANELA_LATENCIAS)}
+        _latencias[rota]['total'] += 1
+        _latencias[rota]['janela'].append(segundos)
+
+def metricas_latencia():
+    """
+    Retorna, por rota, o total de requisições e os percentis de latência (ms) da janela recente.
+    """
+    with _trava_latencias:
+        copias = {rota: (dados['total'], list(dados['janela'])) for rota, dados in _latencias.items()}
+    metricas = {}
+    for rota, (total, janela) in copias.items():
+        latencias_ms = np.array(janela) * 1000
+        metricas[rota] = {
+            'requisicoes': total,
+            **{f'p{percentil}_ms': round(float(valor), 3) for percentil, valor in zip(
+                PERCENTIS_LATENCIA, np.percentile(latencias_ms, PERCENTIS_LATENCIA)
+            )},
+            'max_ms': round(float(latencias_ms.max()), 3)
+        }
+    return metricas
+
+class ManipuladorApi(BaseHTTPRequestHandler):
+    """
+    Manipulador das rotas da API. O ThreadingHTTPServer atende cada requisição numa
+    thread própria, então clientes simultâneos não esperam uns pelos outros.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(_sem_nao_finitos(corpo), ensure_ascii=False, allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ValueError("Corpo da requisição grande demais.")
+        try:
+            return json.loads(self.rfile.read(tamanho) or b'null')
+        except json.JSONDecodeError as erro:
+            raise ValueError(f"JSON inválido: {erro}.") from None
+
+    def _atender(self, rota, tratar):
+        inicio = time.perf_counter()
+        try:
+            status, corpo = tratar()
+        except ValueError as erro:
+            status, corpo = 400, {'erro': str(erro)}
+        except Exception as erro:
+            status, corpo = 500, {'erro': f"Erro interno: {erro}"}
+        self._responder(status, corpo)
+        registrar_latencia(rota, time.perf_counter() - inicio)
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._atender(self.path, lambda: (200, {'status': 'ok'}))
+        elif self.path == '/metricas':
+            self._atender(self.path, lambda: (200, metricas_latencia()))
+        else:
+            self._atender('desconhecida', lambda: (404, {'erro': f"Rota não encontrada: {self.path}"}))
+
+    def do_POST(self):
+        if self.path == '/comparar':
+            self._atender(self.path, lambda: (200, comparar_lote([self._ler_json()])[0]))
+        elif self.path == '/comparar/lote':
+            def tratar_lote():
+                corpo = self._ler_json()
+                comparacoes = corpo.get('comparacoes') if isinstance(corpo, dict) else None
+                if not isinstance(comparacoes, list):
+                    raise ValueError("Informe a lista 'comparacoes'.")
+                return 200, {'resultados': comparar_lote(comparacoes)}
+            self._atender(self.path, tratar_lote)
+        else:
+            self._atender('desconhecida', lambda: (404, {'erro': f"Rota não encontrada: {self.path}"}))
+
+    def log_message(self, formato, *args):
+        # As latências já são registradas em /metricas; sem log por requisição no stderr
+        pass
+
+def iniciar_servidor(host='127.0.0.1', porta=PORTA_PADRAO):
+    """
+    Sobe o servidor numa thread em segundo plano e o retorna (porta=0 escolhe uma porta livre,
+    disponível em servidor.server_address). Encerre com servidor.shutdown().
+    """
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorApi)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='api-comparacao', daemon=True).start()
+    return servidor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="API HTTP local (JSON) do comparador. Tipos de produto: " + ', '.join(TIPOS_PRODUTO) + "."
+    )
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço de escuta (padrão: %(default)s)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help="Porta (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    servidor = ThreadingHTTPServer((args.host, args.porta), ManipuladorApi)
+    servidor.daemon_threads = True
+    print(f"API do comparador em http://{args.host}:{servidor.server_address[1]}", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,27 +1,38 @@
 # app.py
+import os
 import streamlit as st
-import math
-import pandas as pd
 from datetime import date, timedelta
 
-# Importar as funções dos módulos
-from calculations import (
-    calcular_rendimento_pos_fixado, 
-    calcular_rendimento_prefixado,
-    gerar_evolucao_pos_fixada,
-    gerar_evolucao_prefixada
-)
+# Importar as funções dos módulos (apenas o necessário para o formulário;
+# os módulos de cálculo e gráficos são carregados sob demanda, ver inicializacao.py)
+from inicializacao import aguardar_modulos_pesados, aquecer_modulos_em_segundo_plano
+from perfilamento import iniciar_medicao, medir_etapa, finalizar_medicao
 from ui_elements import (
     apply_custom_css,
     render_logo_and_separator,
     render_main_title_and_intro,
     render_input_forms,
+    ofertas_informadas,
+    render_cdi_curve_input,
     render_results_summary,
     render_conclusion,
     render_rentability_chart,
     render_evolution_chart,
+    render_simulation_controls,
+    render_reinvestment_controls,
+    render_fan_chart,
     render_comparative_conclusion,
-    render_detailed_sections,
+    render_reinvestment_conclusion,
+    render_scenario_heatmap,
+    render_breakeven_chart,
+    render_redemption_scrubber,
+    render_sensitivity_panel,
+    render_detailed_sections_header,
+    render_offer_detail,
+    render_export_controls,
+    render_export_downloads,
+    render_debug_controls,
+    render_performance_debug,
     render_footer
 )
 
@@ -41,180 +52,257 @@ apply_custom_css()
 render_logo_and_separator()
 render_main_title_and_intro()
 
-# Obtém as entradas do usuário
-(
-    valor_aplicar, 
-    taxa_aplicacao_tributada_cdi, 
-    data_vencimento_tributada, 
-    taxa_aplicacao_isenta_cdi, 
-    data_vencimento_isenta,
-    enable_prefixada,
-    taxa_aplicacao_prefixada_anual,
-    data_vencimento_prefixada,
-    taxa_cdi_anual_atual
-) = render_input_forms()
-
-# --- Processamento e Exibição de Resultados (após o botão) ---
-if st.button("Comparar Aplicações", key="comparar_button"):
-    hoje = date.today()
+# Modo diagnóstico (opt-in): ?debug=1 na URL ou COMPARADOR_DEBUG=1 no ambiente
+modo_diagnostico = st.query_params.get("debug") == "1" or os.environ.get("COMPARADOR_DEBUG") == "1"
+gerar_cprofile = render_debug_controls() if modo_diagnostico else False
 
-    datas_validas = True
-    if data_vencimento_tributada <= hoje or data_vencimento_isenta <= hoje:
-        st.error("Por favor, selecione datas de vencimento futuras para as aplicações pós-fixadas.")
-        datas_validas = False
-    if enable_prefixada and data_vencimento_prefixada <= hoje:
-        st.error("Por favor, selecione uma data de vencimento futura para a aplicação pré-fixada.")
-        datas_validas = False
-
-    if datas_validas:
-        # --- Cálculos e lógicas (mantido do seu código original) ---
-        # ...
-        # --- Cálculos para o PRAZO TOTAL ---
-        dias_corridos_tributada_full = (data_vencimento_tributada - hoje).days
-        dias_uteis_estimados_tributada_full = math.ceil(dias_corridos_tributada_full * 0.7)
-        if dias_uteis_estimados_tributada_full <= 0: dias_uteis_estimados_tributada_full = 1
-
-        valor_final_tributada_full, rendimento_liquido_tributada_full, aliquota_ir_tributada_full, imposto_renda_tributada_full = calcular_rendimento_pos_fixado(
-            valor_aplicar, taxa_aplicacao_tributada_cdi, dias_uteis_estimados_tributada_full, taxa_cdi_anual_atual, isenta_ir=False
-        )
+# Carrega numpy/pandas/plotly em segundo plano enquanto o usuário preenche o formulário
+aquecer_modulos_em_segundo_plano()
 
-        dias_corridos_isenta_full = (data_vencimento_isenta - hoje).days
-        dias_uteis_estimados_isenta_full = math.ceil(dias_corridos_isenta_full * 0.7)
-        if dias_uteis_estimados_isenta_full <= 0: dias_uteis_estimados_isenta_full = 1
+# --- Processamento e Exibição de Resultados ---
+def buscar_analises(chave, calcular_agora, montar):
+    """
+    Análises caras (Monte Carlo e mapa de cenários, ver resultados.montar_analises): só são
+    calculadas no clique em "Comparar Aplicações" (calcular_agora) e ficam guardadas na sessão.
+    Nas reexecuções seguintes, são reaproveitadas enquanto a chave das entradas não mudar;
+    com entradas alteradas, retorna None até o próximo clique.
+    """
+    if calcular_agora:
+        from cache_resultados import buscar_ou_montar_pacote
+        st.session_state['analises'] = {'chave': chave, 'pacote': buscar_ou_montar_pacote(chave, montar)}
+    analises = st.session_state.get('analises')
+    if analises is None or analises['chave'] != chave:
+        return None
+    return analises['pacote']
 
-        valor_final_isenta_full, rendimento_liquido_isenta_full, _, _ = calcular_rendimento_pos_fixado(
-            valor_aplicar, taxa_aplicacao_isenta_cdi, dias_uteis_estimados_isenta_full, taxa_cdi_anual_atual, isenta_ir=True
+@st.fragment
+def secao_exportacao(carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, curva_cdi, parametros_reinvestimento):
+    """
+    Exportação (sob demanda) da evolução diária completa, não só dos pontos do gráfico.
+    É um fragmento: marcar a caixa ou trocar o formato só reexecuta esta seção, com as
+    entradas da última comparação, sem refazer os resultados.
+    """
+    formato_exportacao = render_export_controls()
+    if formato_exportacao is None:
+        return
+    from cache_calculos import calcular_evolucao_carteira
+    from exportacao import FORMATOS_EXPORTACAO, cenario_da_carteira, exportar_para_bytes
+
+    def cenarios_exportados():
+        yield cenario_da_carteira(
+            'prazo_original', carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, curva_cdi,
+            calcular_evolucao=calcular_evolucao_carteira
         )
+        if parametros_reinvestimento is not None:
+            yield cenario_da_carteira(
+                'reinvestimento', carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, curva_cdi,
+                reinvestimento=parametros_reinvestimento
+            )
 
-        valor_final_prefixada_full = 0
-        rendimento_liquido_prefixada_full = 0
-        aliquota_ir_prefixada_full = 0
-        imposto_renda_prefixada_full = 0
-        dias_corridos_prefixada_full = 0
+    arquivos = exportar_para_bytes(cenarios_exportados(), formato_exportacao)
+    render_export_downloads(
+        arquivos, formato_exportacao, FORMATOS_EXPORTACAO[formato_exportacao]['extensao'],
+        FORMATOS_EXPORTACAO[formato_exportacao]['mime']
+    )
 
-        if enable_prefixada:
-            dias_corridos_prefixada_full = (data_vencimento_prefixada - hoje).days
-            valor_final_prefixada_full, rendimento_liquido_prefixada_full, aliquota_ir_prefixada_full, imposto_renda_prefixada_full = calcular_rendimento_prefixado(
-                valor_aplicar, taxa_aplicacao_prefixada_anual, dias_corridos_prefixada_full
-            )
+# Chaves dos fragmentos de resultados (ver redesenhar_oferta)
+FRAGMENTO_COMPARACAO = 'comparacao'
 
-        # --- Identificar a data de vencimento mais curta para comparação ---
-        datas_para_comparacao = [data_vencimento_tributada, data_vencimento_isenta]
-        if enable_prefixada:
-            datas_para_comparacao.append(data_vencimento_prefixada)
-            
-        data_vencimento_comparativa = min(datas_para_comparacao)
-        dias_corridos_comparativos = (data_vencimento_comparativa - hoje).days
-        dias_uteis_comparativos = math.ceil(dias_corridos_comparativos * 0.7)
-        if dias_uteis_comparativos <= 0: dias_uteis_comparativos = 1 
-
-        # --- Cálculos para a COMPARAÇÃO EQUIVALENTE (até a data mais curta) ---
-        valor_final_tributada_comp, rendimento_liquido_tributada_comp, aliquota_ir_tributada_comp, _ = calcular_rendimento_pos_fixado(
-            valor_aplicar, taxa_aplicacao_tributada_cdi, dias_uteis_comparativos, taxa_cdi_anual_atual, 
-            isenta_ir=False, prazo_dias_corridos_para_ir=dias_corridos_comparativos
-        )
+def chave_fragmento_oferta(indice):
+    """Chave do fragmento com o detalhamento e a série da oferta de posição indice."""
+    return f'oferta_{indice}'
 
-        valor_final_isenta_comp, rendimento_liquido_isenta_comp, _, _ = calcular_rendimento_pos_fixado(
-            valor_aplicar, taxa_aplicacao_isenta_cdi, dias_uteis_comparativos, taxa_cdi_anual_atual, 
-            isenta_ir=True, prazo_dias_corridos_para_ir=dias_corridos_comparativos
-        )
-        
-        valor_final_prefixada_comp = 0
-        rendimento_liquido_prefixada_comp = 0
-        aliquota_ir_prefixada_comp = 0
-        if enable_prefixada:
-            valor_final_prefixada_comp, rendimento_liquido_prefixada_comp, aliquota_ir_prefixada_comp, _ = calcular_rendimento_prefixado(
-                valor_aplicar, taxa_aplicacao_prefixada_anual, dias_corridos_comparativos
+def redesenhar_oferta(indice):
+    """
+    Callback da taxa e do vencimento de cada oferta (ver render_input_forms): com os resultados
+    na tela, só o fragmento da comparação e o da própria oferta são reexecutados; as demais
+    ofertas continuam como estão, servidas dos arrays guardados na sessão (incremental.py).
+    Nome, tipo, quantidade e entradas compartilhadas reexecutam o app inteiro.
+    """
+    if chave_fragmento_oferta(indice) in st.session_state.get('fragmentos_resultados', ()):
+        st.rerun([FRAGMENTO_COMPARACAO, chave_fragmento_oferta(indice)])
+
+def carteira_informada(hoje, exibir_erros):
+    """
+    Monta a carteira com as ofertas atuais dos widgets (ver ofertas_informadas). Retorna
+    (ofertas, carteira_ofertas), com carteira_ofertas None se alguma oferta for inválida
+    (com exibir_erros, o motivo é exibido).
+    """
+    ofertas = ofertas_informadas()
+    if any(oferta['data_vencimento'] <= hoje for oferta in ofertas):
+        if exibir_erros:
+            st.error("Por favor, selecione datas de vencimento futuras para todas as aplicações.")
+        return ofertas, None
+
+    from carteira import montar_carteira
+    try:
+        return ofertas, montar_carteira(ofertas, hoje)
+    except ValueError as erro:
+        if exibir_erros:
+            st.error(str(erro))
+        return ofertas, None
+
+@st.fragment(key=FRAGMENTO_COMPARACAO)
+def secao_comparacao(valor_aplicar, taxa_cdi_anual_atual, curva_cdi, parametros_simulacao, parametros_reinvestimento, modo_diagnostico, gerar_cprofile):
+    """
+    Calcula e exibe a comparação entre as ofertas. O pacote de resultados vem do cache entre
+    sessões (cache_resultados.py) quando as mesmas entradas já foram comparadas hoje; senão, é
+    montado por resultados.montar_pacote com as unidades de cálculo da sessão, e só as
+    ofertas alteradas são recalculadas. As análises caras só rodam no clique no botão (ver
+    buscar_analises).
+    É um fragmento: a mudança de uma oferta só reexecuta esta seção e a da oferta (ver
+    redesenhar_oferta). As ofertas vêm dos widgets; os demais argumentos só mudam numa
+    execução completa.
+    """
+    hoje = date.today()
+    ofertas, carteira_ofertas = carteira_informada(hoje, exibir_erros=True)
+    if carteira_ofertas is None:
+        return
+
+    iniciar_medicao(medir_memoria=modo_diagnostico, gerar_cprofile=gerar_cprofile, medir_figuras=modo_diagnostico)
+    try:
+        with medir_etapa('imports_calculo'):
+            # Módulos de cálculo (já aquecidos em segundo plano, na maioria das vezes)
+            aguardar_modulos_pesados()
+            from cache_resultados import buscar_ou_montar_pacote, chave_entradas
+            from resultados import montar_analises, montar_pacote
+
+        # Pacote de resultados (números e figuras prontas), compartilhado entre sessões
+        # para as entradas mais frequentes; numa falha, só as ofertas alteradas são recalculadas
+        # (unidades da sessão, ver incremental.py)
+        unidades_analises = st.session_state.setdefault('unidades_analises', {})
+        with medir_etapa('pacote_resultados'):
+            pacote = buscar_ou_montar_pacote(
+                chave_entradas(valor_aplicar, ofertas, taxa_cdi_anual_atual, curva_cdi, None, hoje, parametros_reinvestimento),
+                lambda: montar_pacote(
+                    carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, curva_cdi,
+                    st.session_state.setdefault('unidades_ofertas', {}), unidades_analises,
+                    parametros_reinvestimento
+                )
             )
+        dados = pacote['dados']
+        figuras = pacote['figuras']
 
-        # --- Dicionários para passar para as funções de UI ---
-        cores_aplicacoes = {
-            'Pós-Fixada Tributada': 'lightseagreen', 
-            'Pós-Fixada Isenta': 'darkorange',
-            'Pré-fixada': 'cornflowerblue' 
-        }
-
-        rendimentos_full = {
-            "Pós-Fixada Tributada": rendimento_liquido_tributada_full,
-            "Pós-Fixada Isenta": rendimento_liquido_isenta_full
-        }
-        if enable_prefixada:
-            rendimentos_full["Pré-fixada"] = rendimento_liquido_prefixada_full
-
-        rendimentos_comp = {
-            "Pós-Fixada Tributada": rendimento_liquido_tributada_comp,
-            "Pós-Fixada Isenta": rendimento_liquido_isenta_comp
-        }
-        if enable_prefixada:
-            rendimentos_comp["Pré-fixada"] = rendimento_liquido_prefixada_comp
-
-        dados_evolucao_list = []
-        dados_evolucao_list.extend(gerar_evolucao_pos_fixada(
-            valor_aplicar, taxa_aplicacao_tributada_cdi, taxa_cdi_anual_atual, hoje, data_vencimento_tributada, False, 'Pós-Fixada Tributada'
-        ))
-        dados_evolucao_list.extend(gerar_evolucao_pos_fixada(
-            valor_aplicar, taxa_aplicacao_isenta_cdi, taxa_cdi_anual_atual, hoje, data_vencimento_isenta, True, 'Pós-Fixada Isenta'
-        ))
-        if enable_prefixada:
-            dados_evolucao_list.extend(gerar_evolucao_prefixada(
-                valor_aplicar, taxa_aplicacao_prefixada_anual, hoje, data_vencimento_prefixada, 'Pré-fixada'
-            ))
-        df_evolucao = pd.DataFrame(dados_evolucao_list)
-
-        details_tributada = {
-            'taxa_aplicacao_cdi': taxa_aplicacao_tributada_cdi,
-            'data_vencimento': data_vencimento_tributada,
-            'dias_corridos': dias_corridos_tributada_full,
-            'dias_uteis': dias_uteis_estimados_tributada_full,
-            'rendimento_bruto': rendimento_liquido_tributada_full + imposto_renda_tributada_full,
-            'aliquota_ir': aliquota_ir_tributada_full,
-            'imposto_renda': imposto_renda_tributada_full,
-            'valor_final_liquido': valor_final_tributada_full,
-            'rendimento_liquido': rendimento_liquido_tributada_full
-        }
-        details_isenta = {
-            'taxa_aplicacao_cdi': taxa_aplicacao_isenta_cdi,
-            'data_vencimento': data_vencimento_isenta,
-            'dias_corridos': dias_corridos_isenta_full,
-            'dias_uteis': dias_uteis_estimados_isenta_full,
-            'valor_final_liquido': valor_final_isenta_full,
-            'rendimento_liquido': rendimento_liquido_isenta_full
-        }
-        details_prefixada = None
-        if enable_prefixada:
-            details_prefixada = {
-                'taxa_anual_prefixada': taxa_aplicacao_prefixada_anual,
-                'data_vencimento': data_vencimento_prefixada,
-                'dias_corridos': dias_corridos_prefixada_full,
-                'rendimento_bruto': rendimento_liquido_prefixada_full + imposto_renda_prefixada_full,
-                'aliquota_ir': aliquota_ir_prefixada_full,
-                'imposto_renda': imposto_renda_prefixada_full,
-                'valor_final_liquido': valor_final_prefixada_full,
-                'rendimento_liquido': rendimento_liquido_prefixada_full
-            }
+        # Monte Carlo (se pedido) e mapa de cenários (com uma isenta e uma tributada indexadas ao CDI)
+        analises = None
+        if parametros_simulacao is not None or {'pos_isenta', 'pos_tributada'} <= set(carteira_ofertas['tipos'].tolist()):
+            with medir_etapa('analises'):
+                analises = buscar_analises(
+                    chave_entradas(valor_aplicar, ofertas, taxa_cdi_anual_atual, curva_cdi, parametros_simulacao, hoje) + ('analises',),
+                    # O clique vale só para a execução em que aconteceu
+                    st.session_state.pop('analises_pedidas', False),
+                    lambda: montar_analises(carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, parametros_simulacao, unidades_analises)
+                )
+            if analises is None:
+                st.info("As entradas mudaram: clique em **Comparar Aplicações** para atualizar a simulação de Monte Carlo e o mapa de cenários.")
+        if analises is None:
+            analises = {'dados': {'simulacao': None, 'cenarios': None}, 'figuras': {}}
 
         # --- Exibição dos resultados (chamando funções de ui_elements) ---
-        render_results_summary(valor_aplicar, taxa_cdi_anual_atual)
-        render_conclusion(rendimentos_full, enable_prefixada)
+        render_conclusion(dados['rendimentos_full'])
+        render_rentability_chart(figuras['rentabilidade_total'], 'Rendimento Líquido Comparativo (Prazos Originais)')
+        render_evolution_chart(figuras['evolucao'], reinvestimento=dados['reinvestimento'] is not None)
+        if analises['dados']['simulacao'] is not None:
+            render_fan_chart(analises['dados']['simulacao'], dados['data_vencimento_comparativa'], analises['figuras']['leque'])
+        render_comparative_conclusion(dados['data_vencimento_comparativa'], dados['dias_uteis_comparativos'], dados['rendimentos_comp'])
         render_rentability_chart(
-            {
-                'Aplicação': list(rendimentos_full.keys()), 
-                'Rendimento Líquido (R$)': list(rendimentos_full.values())
-            }, 
-            'Rendimento Líquido Comparativo (Prazos Originais)', 
-            cores_aplicacoes
+            figuras['rentabilidade_comparativa'],
+            f'Rendimento Líquido Comparativo (até {dados["data_vencimento_comparativa"].strftime("%d/%m/%Y")})'
         )
-        render_evolution_chart(df_evolucao, cores_aplicacoes)
-        render_comparative_conclusion(data_vencimento_comparativa, dias_uteis_comparativos, rendimentos_comp)
-        render_rentability_chart(
-            {
-                'Aplicação': list(rendimentos_comp.keys()), 
-                'Rendimento Líquido (R$)': list(rendimentos_comp.values())
-            }, 
-            f'Rendimento Líquido Comparativo (até {data_vencimento_comparativa.strftime("%d/%m/%Y")})', 
-            cores_aplicacoes
+        # Reinvestimento até o vencimento mais longo (opcional, só com vencimentos diferentes)
+        if dados['reinvestimento'] is not None:
+            render_reinvestment_conclusion(dados['reinvestimento'])
+            render_rentability_chart(
+                figuras['rentabilidade_reinvestida'],
+                f'Rendimento Líquido com Reinvestimento (até {dados["reinvestimento"]["data_horizonte"].strftime("%d/%m/%Y")})'
+            )
+        # Mapa de cenários e ponto de equilíbrio só existem com uma isenta e uma tributada indexadas ao CDI
+        if analises['dados']['cenarios'] is not None:
+            render_scenario_heatmap(analises['figuras']['cenarios'], dados['data_vencimento_comparativa'])
+        if dados['equilibrio'] is not None:
+            render_breakeven_chart(
+                figuras['equilibrio'], dados['equilibrio']['taxa_isenta_cdi'],
+                dados['equilibrio']['taxa_tributada_cdi'], dados['equilibrio']['comparativo']
+            )
+        render_redemption_scrubber(dados['indice_resgate'], hoje)
+        render_sensitivity_panel(dados['sensibilidade'])
+        secao_exportacao(
+            carteira_ofertas, valor_aplicar, taxa_cdi_anual_atual, curva_cdi,
+            parametros_reinvestimento if dados['reinvestimento'] is not None else None
         )
-        render_detailed_sections(details_tributada, details_isenta, details_prefixada)
+    finally:
+        # Também numa execução interrompida (rerun), para devolver o tracemalloc
+        medicoes, caminho_pstats = finalizar_medicao()
+    if modo_diagnostico:
+        from cache_calculos import estatisticas_cache
+        from cache_resultados import estatisticas_pacotes
+        render_performance_debug(medicoes, estatisticas_cache(), caminho_pstats, estatisticas_pacotes())
+
+def secao_oferta(indice, valor_aplicar, taxa_cdi_anual_atual, curva_cdi):
+    """
+    Detalhamento e série de evolução de uma oferta. Roda como um fragmento por oferta (chave
+    chave_fragmento_oferta(indice)), reexecutado só quando a taxa ou o vencimento dela mudam;
+    a unidade de cálculo da oferta é reaproveitada enquanto as suas entradas não mudarem.
+    """
+    _, carteira_ofertas = carteira_informada(date.today(), exibir_erros=False)
+    if carteira_ofertas is None:
+        return
+    from resultados import montar_oferta
+
+    oferta = montar_oferta(
+        carteira_ofertas, indice, valor_aplicar, taxa_cdi_anual_atual, curva_cdi,
+        st.session_state.setdefault('unidades_ofertas', {})
+    )
+    render_offer_detail(oferta['detalhe'], oferta['figura'])
+
+def processar_comparacao(valor_aplicar, taxa_cdi_anual_atual, curva_cdi_enviada, parametros_simulacao, parametros_reinvestimento, modo_diagnostico, gerar_cprofile):
+    """
+    Exibe os resultados: o resumo das entradas compartilhadas, o fragmento da comparação e um
+    fragmento por oferta (ver redesenhar_oferta). Retorna as chaves dos fragmentos exibidos.
+    """
+    arquivo_curva_cdi, interpolacao_curva_cdi = curva_cdi_enviada
+    curva_cdi = None
+    if arquivo_curva_cdi is not None:
+        from curva_cdi import carregar_curva_cdi
+        try:
+            arquivo_curva_cdi.seek(0)
+            curva_cdi = carregar_curva_cdi(arquivo_curva_cdi, interpolacao_curva_cdi)
+        except ValueError as erro:
+            st.error(f"Não foi possível ler a curva de CDI: {erro}")
+            return []
+
+    render_results_summary(valor_aplicar, taxa_cdi_anual_atual, curva_cdi)
+    secao_comparacao(
+        valor_aplicar, taxa_cdi_anual_atual, curva_cdi, parametros_simulacao,
+        parametros_reinvestimento, modo_diagnostico, gerar_cprofile
+    )
+    render_detailed_sections_header()
+    fragmentos = [FRAGMENTO_COMPARACAO]
+    for indice in range(len(ofertas_informadas())):
+        chave = chave_fragmento_oferta(indice)
+        st.fragment(secao_oferta, key=chave)(indice, valor_aplicar, taxa_cdi_anual_atual, curva_cdi)
+        fragmentos.append(chave)
+    return fragmentos
+
+# Obtém as entradas do usuário
+valor_aplicar, _, taxa_cdi_anual_atual = render_input_forms(ao_alterar_oferta=redesenhar_oferta)
+curva_cdi_enviada = render_cdi_curve_input()
+parametros_simulacao = render_simulation_controls(taxa_cdi_anual_atual)
+parametros_reinvestimento = render_reinvestment_controls()
+
+# Depois do primeiro clique, os resultados acompanham as mudanças nas entradas (só as
+# ofertas alteradas são recalculadas); as análises caras esperam um novo clique
+comparar = st.button("Comparar Aplicações", key="comparar_button")
+if comparar:
+    st.session_state['comparacao_ativa'] = True
+st.session_state['analises_pedidas'] = comparar
+# Só os fragmentos exibidos nesta execução podem ser reexecutados sozinhos (ver redesenhar_oferta)
+st.session_state['fragmentos_resultados'] = []
+if st.session_state.get('comparacao_ativa'):
+    st.session_state['fragmentos_resultados'] = processar_comparacao(
+        valor_aplicar, taxa_cdi_anual_atual, curva_cdi_enviada, parametros_simulacao,
+        parametros_reinvestimento, modo_diagnostico, gerar_cprofile
+    )
 
 # --- Rodapé ---
 render_footer()
\ No newline at end of file
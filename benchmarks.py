@@ -0,0 +1,225 @@
+# benchmarks.py
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import calculations
+import carteira
+from amostragem import reduzir_evolucao
+from calendario import dias_uteis_entre
+
+# Data fixa para que os resultados sejam reproduzíveis (o calendário depende da data)
+DATA_BASE = date(2025, 1, 2)
+HORIZONTES_DIAS = {'30d': 30, '1a': 365, '5a': 1825, '10a': 3650, '30a': 10950}
+CORES_APLICACOES = {
+    'Pós-Fixada Tributada': 'lightseagreen',
+    'Pós-Fixada Isenta': 'darkorange',
+    'Pré-fixada': 'cornflowerblue'
+}
+TOLERANCIA_PADRAO = 0.15
+RENDIMENTOS_BARRAS = {'Pós-Fixada Tributada': 1208.63, 'Pós-Fixada Isenta': 1369.32, 'Pré-fixada': 1275.00}
+
+def _evolucoes(dias):
+    """
+    As três séries de evolução que o app.py monta para um horizonte, com os valores padrão do formulário.
+    """
+    data_fim = DATA_BASE + timedelta(days=dias)
+    return {
+        'Pós-Fixada Tributada': calculations.calcular_evolucao_pos_fixada(10000.0, 100, 14.65, DATA_BASE, data_fim, False),
+        'Pós-Fixada Isenta': calculations.calcular_evolucao_pos_fixada(10000.0, 95, 14.65, DATA_BASE, data_fim, True),
+        'Pré-fixada': calculations.calcular_evolucao_prefixada(10000.0, 15.0, DATA_BASE, data_fim)
+    }
+
+def _reduzir_evolucoes(evolucoes):
+    """
+    Mesma redução das séries para o gráfico de evolução feita no app.py.
+    """
+    return {nome: reduzir_evolucao(evolucao) for nome, evolucao in evolucoes.items()}
+
+def _carteira_de_ofertas(quantidade, dias_maximo):
+    """
+    Carteira com ofertas dos três tipos padrão alternados e vencimentos espalhados até dias_maximo.
+    """
+    tipos_e_taxas = [('pos_tributada', 100.0), ('pos_isenta', 95.0), ('pre', 15.0)]
+    return carteira.montar_carteira([
+        {
+            'nome': f'Oferta {indice + 1}',
+            'tipo': tipos_e_taxas[indice % 3][0],
+            'taxa': tipos_e_taxas[indice % 3][1],
+            'data_vencimento': DATA_BASE + timedelta(days=dias_maximo * (indice + 1) // quantidade)
+        }
+        for indice in range(quantidade)
+    ], DATA_BASE)
+
+def casos_de_benchmark():
+    """
+    Retorna a lista de casos (nome, função sem argumentos) a medir.
+    """
+    from ui_elements import build_evolution_figure, build_rentability_figure
+
+    dias_uteis_1a = dias_uteis_entre(DATA_BASE, DATA_BASE + timedelta(days=365))
+    casos = [
+        ('calcular_rendimento_pos_fixado', lambda: calculations.calcular_rendimento_pos_fixado(
+            10000.0, 100, dias_uteis_1a, 14.65, isenta_ir=False, prazo_dias_corridos_para_ir=365
+        )),
+        ('calcular_rendimento_prefixado', lambda: calculations.calcular_rendimento_prefixado(10000.0, 15.0, 365)),
+    ]
+
+    for rotulo, dias in HORIZONTES_DIAS.items():
+        data_fim = DATA_BASE + timedelta(days=dias)
+        casos.extend([
+            (f'gerar_evolucao_pos_fixada[{rotulo}]', lambda data_fim=data_fim: calculations.gerar_evolucao_pos_fixada(
+                10000.0, 100, 14.65, DATA_BASE, data_fim, False, 'Pós-Fixada Tributada'
+            )),
+            (f'gerar_evolucao_prefixada[{rotulo}]', lambda data_fim=data_fim: calculations.gerar_evolucao_prefixada(
+                10000.0, 15.0, DATA_BASE, data_fim, 'Pré-fixada'
+            )),
+            (f'calcular_evolucao_pos_fixada[{rotulo}]', lambda data_fim=data_fim: calculations.calcular_evolucao_pos_fixada(
+                10000.0, 100, 14.65, DATA_BASE, data_fim, False
+            )),
+            (f'calcular_evolucao_prefixada[{rotulo}]', lambda data_fim=data_fim: calculations.calcular_evolucao_prefixada(
+                10000.0, 15.0, DATA_BASE, data_fim
+            )),
+        ])
+
+    for rotulo in ('1a', '10a', '30a'):
+        evolucoes = _evolucoes(HORIZONTES_DIAS[rotulo])
+        evolucoes_grafico = _reduzir_evolucoes(evolucoes)
+        casos.extend([
+            (f'reducao_evolucao[{rotulo}]', lambda evolucoes=evolucoes: _reduzir_evolucoes(evolucoes)),
+            (f'build_evolution_figure[{rotulo}]', lambda evolucoes_grafico=evolucoes_grafico: build_evolution_figure(
+                evolucoes_grafico, DATA_BASE, CORES_APLICACOES
+            )),
+        ])
+
+    carteira_20 = _carteira_de_ofertas(20, HORIZONTES_DIAS['10a'])
+    casos.extend([
+        ('calcular_carteira[20 ofertas]', lambda: carteira.calcular_carteira(carteira_20, 10000.0, 14.65)),
+        ('calcular_evolucao_carteira[20 ofertas,10a]', lambda: carteira.calcular_evolucao_carteira(carteira_20, 10000.0, 14.65)),
+    ])
+
+    from simulacao_cdi import simular_cenarios_cdi
+    carteira_3 = _carteira_de_ofertas(3, HORIZONTES_DIAS['1a'])
+    casos.append(('simular_cenarios_cdi[10k,1a]', lambda: simular_cenarios_cdi(
+        carteira_3, 10000.0, DATA_BASE + timedelta(days=HORIZONTES_DIAS['1a'] // 3), 14.65, 12.0, 0.5, 2.0,
+        numero_trajetorias=10_000, semente=0
+    )))
+
+    casos.append(('build_rentability_figure', lambda: build_rentability_figure(
+        list(RENDIMENTOS_BARRAS), list(RENDIMENTOS_BARRAS.values()), 'Rendimento Líquido Comparativo', CORES_APLICACOES
+    )))
+    return casos
+
+def tamanhos_das_figuras():
+    """
+    Tamanho (KB) do JSON que o st.plotly_chart envia ao navegador para cada figura medida.
+    """
+    import plotly.io as pio
+    from ui_elements import build_evolution_figure, build_rentability_figure
+
+    figuras = {
+        f'build_evolution_figure[{rotulo}]': build_evolution_figure(
+            _reduzir_evolucoes(_evolucoes(HORIZONTES_DIAS[rotulo])), DATA_BASE, CORES_APLICACOES
+        )
+        for rotulo in ('1a', '10a', '30a')
+    }
+    figuras['build_rentability_figure'] = build_rentability_figure(
+        list(RENDIMENTOS_BARRAS), list(RENDIMENTOS_BARRAS.values()), 'Rendimento Líquido Comparativo', CORES_APLICACOES
+    )
+    return {nome: round(len(pio.to_json(figura, validate=False)) / 1024, 1) for nome, figura in figuras.items()}
+
+def medir(funcao, repeticoes=5, tempo_minimo=0.2):
+    """
+    Mede uma função com timeit: calibra o número de chamadas por repetição
+    e retorna estatísticas do tempo por chamada (em segundos).
+    """
+    temporizador = timeit.Timer(funcao)
+    chamadas, _ = temporizador.autorange()
+    chamadas = max(1, int(chamadas * tempo_minimo / 0.2))
+    tempos = np.array(temporizador.repeat(repeat=repeticoes, number=chamadas)) / chamadas
+    return {
+        'mediana_s': float(np.median(tempos)),
+        'minimo_s': float(tempos.min()),
+        'desvio_s': float(tempos.std()),
+        'chamadas_por_repeticao': chamadas,
+        'repeticoes': repeticoes
+    }
+
+def executar(filtro=None, repeticoes=5, tempo_minimo=0.2):
+    """
+    Executa todos os casos (ou os que contêm o texto do filtro) e retorna o relatório.
+    """
+    import pandas
+    import plotly
+
+    resultados = {}
+    for nome, funcao in casos_de_benchmark():
+        if filtro and filtro not in nome:
+            continue
+        resultados[nome] = medir(funcao, repeticoes, tempo_minimo)
+        print(f"{nome:<45} {resultados[nome]['mediana_s'] * 1e6:>12.1f} µs", file=sys.stderr)
+    return {
+        'metadados': {
+            'data_execucao': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pandas.__version__,
+            'plotly': plotly.__version__
+        },
+        'resultados': resultados,
+        'tamanhos_figuras_kb': tamanhos_das_figuras()
+    }
+
+def comparar_com_base(relatorio, relatorio_base, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Compara as medianas com um relatório de referência.
+    Retorna a lista de casos com a razão atual/base e se houve regressão (razão > 1 + tolerância).
+    """
+    comparacao = []
+    for nome, resultado in relatorio['resultados'].items():
+        base = relatorio_base['resultados'].get(nome)
+        if base is None:
+            continue
+        razao = resultado['mediana_s'] / base['mediana_s'] if base['mediana_s'] else float('inf')
+        comparacao.append({'caso': nome, 'razao': razao, 'regressao': razao > 1 + tolerancia})
+    return comparacao
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos de cálculo e renderização.")
+    parser.add_argument('--saida', help="Grava o relatório em JSON neste arquivo (padrão: stdout)")
+    parser.add_argument('--base', help="Relatório JSON de referência para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO, help="Aumento relativo tolerado na mediana (padrão: %(default)s)")
+    parser.add_argument('--filtro', help="Executa apenas os casos cujo nome contém este texto")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--tempo-minimo', type=float, default=0.2, help="Tempo mínimo (s) de cada repetição")
+    args = parser.parse_args(argv)
+
+    relatorio = executar(args.filtro, args.repeticoes, args.tempo_minimo)
+
+    codigo_saida = 0
+    if args.base:
+        with open(args.base, encoding='utf-8') as arquivo:
+            comparacao = comparar_com_base(relatorio, json.load(arquivo), args.tolerancia)
+        relatorio['comparacao'] = {'base': args.base, 'tolerancia': args.tolerancia, 'casos': comparacao}
+        for caso in comparacao:
+            marcador = 'REGRESSÃO' if caso['regressao'] else 'ok'
+            print(f"{caso['caso']:<45} {caso['razao']:>6.2f}x  {marcador}", file=sys.stderr)
+        if any(caso['regressao'] for caso in comparacao):
+            codigo_saida = 1
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    return codigo_saida
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# cache_calculos.py
+import threading
+from cachetools import TTLCache
+
+import calculations
+import carteira
+
+# O Streamlit reexecuta o app.py a cada interação; este cache vive no processo
+# e, portanto, é compartilhado por todas as sessões.
+TAMANHO_MAXIMO_CACHE = 1024
+TTL_CACHE_SEGUNDOS = 6 * 60 * 60
+
+_cache = TTLCache(maxsize=TAMANHO_MAXIMO_CACHE, ttl=TTL_CACHE_SEGUNDOS)
+_trava = threading.Lock()
+_estatisticas = {'acertos': 0, 'falhas': 0}
+
+def _buscar_ou_calcular(chave, calcular):
+    """
+    Retorna o valor em cache para a chave ou o calcula (fora da trava) e o armazena.
+    """
+    with _trava:
+        valor = _cache.get(chave)
+        if valor is not None:
+            _estatisticas['acertos'] += 1
+            return valor
+        _estatisticas['falhas'] += 1
+    valor = calcular()
+    with _trava:
+        _cache[chave] = valor
+    return valor
+
+def _somente_leitura(evolucao):
+    """
+    Marca os arrays de um resultado (evolução ou carteira) como somente leitura antes de guardá-lo no cache.
+    """
+    for array in evolucao.values():
+        array.setflags(write=False)
+    return evolucao
+
+def _escalar_evolucao(evolucao_unitaria, valor_inicial):
+    """
+    Escala uma evolução calculada para R$ 1,00 para o valor aplicado.
+    Os rendimentos e os impostos são lineares no valor inicial; a alíquota não muda.
+    """
+    return {
+        'dias': evolucao_unitaria['dias'],
+        'valor_bruto': evolucao_unitaria['valor_bruto'] * valor_inicial,
+        'aliquota_ir': evolucao_unitaria['aliquota_ir'],
+        'imposto_renda': evolucao_unitaria['imposto_renda'] * valor_inicial,
+        'iof': evolucao_unitaria['iof'] * valor_inicial,
+        'valor_liquido': evolucao_unitaria['valor_liquido'] * valor_inicial
+    }
+
+def _identificador_curva(curva_cdi):
+    """
+    Parte da chave de cache que identifica a curva de CDI (None para CDI constante).
+    """
+    return None if curva_cdi is None else curva_cdi['identificador']
+
+def calcular_rendimento_pos_fixado(valor_inicial, taxa_aplicacao_cdi, prazo_dias_uteis, taxa_cdi_anual, isenta_ir=False, prazo_dias_corridos_para_ir=None, data_inicio=None, curva_cdi=None):
+    """
+    Versão em cache de calculations.calcular_rendimento_pos_fixado.
+    O resultado é guardado para R$ 1,00 e escalado, então mudar o valor aplicado não recalcula.
+    """
+    if curva_cdi is not None:
+        # Com curva, a data de início define quais taxas são acumuladas
+        if isenta_ir:
+            prazo_dias_corridos_para_ir = None
+    elif isenta_ir:
+        # Para aplicações isentas, os parâmetros de IR não influenciam o resultado
+        prazo_dias_corridos_para_ir = None
+        data_inicio = None
+    elif prazo_dias_corridos_para_ir is not None:
+        data_inicio = None
+
+    chave = (
+        'pos_fixado', float(taxa_aplicacao_cdi), int(prazo_dias_uteis), float(taxa_cdi_anual),
+        bool(isenta_ir), prazo_dias_corridos_para_ir, data_inicio, _identificador_curva(curva_cdi)
+    )
+    valor_final, rendimento_liquido, aliquota_ir, imposto_renda = _buscar_ou_calcular(
+        chave,
+        lambda: calculations.calcular_rendimento_pos_fixado(
+            1.0, taxa_aplicacao_cdi, prazo_dias_uteis, taxa_cdi_anual,
+            isenta_ir=isenta_ir, prazo_dias_corridos_para_ir=prazo_dias_corridos_para_ir, data_inicio=data_inicio,
+            curva_cdi=curva_cdi
+        )
+    )
+    return valor_final * valor_inicial, rendimento_liquido * valor_inicial, aliquota_ir, imposto_renda * valor_inicial
+
+def calcular_rendimento_prefixado(valor_inicial, taxa_anual_prefixada, dias_corridos_totais):
+    """
+    Versão em cache de calculations.calcular_rendimento_prefixado (chave em R$ 1,00).
+    """
+    chave = ('prefixado', float(taxa_anual_prefixada), int(dias_corridos_totais))
+    valor_final, rendimento_liquido, aliquota_ir, imposto_renda = _buscar_ou_calcular(
+        chave,
+        lambda: calculations.calcular_rendimento_prefixado(1.0, taxa_anual_prefixada, dias_corridos_totais)
+    )
+    return valor_final * valor_inicial, rendimento_liquido * valor_inicial, aliquota_ir, imposto_renda * valor_inicial
+
+def calcular_evolucao_pos_fixada(valor_inicial, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, curva_cdi=None):
+    """
+    Versão em cache de calculations.calcular_evolucao_pos_fixada (chave em R$ 1,00).
+    """
+    chave = (
+        'evolucao_pos_fixada', float(taxa_aplicacao_cdi), float(taxa_cdi_anual), data_inicio, data_fim, bool(isenta_ir),
+        _identificador_curva(curva_cdi)
+    )
+    evolucao_unitaria = _buscar_ou_calcular(
+        chave,
+        lambda: _somente_leitura(calculations.calcular_evolucao_pos_fixada(
+            1.0, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, curva_cdi
+        ))
+    )
+    return _escalar_evolucao(evolucao_unitaria, valor_inicial)
+
+def calcular_evolucao_prefixada(valor_inicial, taxa_anual_prefixada, data_inicio, data_fim):
+    """
+    Versão em cache de calculations.calcular_evolucao_prefixada (chave em R$ 1,00).
+    """
+    chave = ('evolucao_prefixada', float(taxa_anual_prefixada), data_inicio, data_fim)
+    evolucao_unitaria = _buscar_ou_calcular(
+        chave,
+        lambda: _somente_leitura(calculations.calcular_evolucao_prefixada(
+            1.0, taxa_anual_prefixada, data_inicio, data_fim
+        ))
+    )
+    return _escalar_evolucao(evolucao_unitaria, valor_inicial)
+
+def _chave_carteira(carteira_ofertas):
+    """
+    Parte da chave de cache que identifica as ofertas da carteira (os nomes não influenciam o cálculo).
+    """
+    return (
+        tuple(carteira_ofertas['tipos'].tolist()), carteira_ofertas['taxas'].tobytes(),
+        carteira_ofertas['dias_corridos'].tobytes(), carteira_ofertas['data_inicio']
+    )
+
+def calcular_carteira(carteira_ofertas, valor_inicial, taxa_cdi_anual, dias_corridos=None, curva_cdi=None, com_sensibilidades=False):
+    """
+    Versão em cache de carteira.calcular_carteira (chave em R$ 1,00).
+    As sensibilidades ao CDI e à taxa também são lineares no valor aplicado; a por R$ aplicado não.
+    """
+    chave = (
+        'carteira', _chave_carteira(carteira_ofertas), float(taxa_cdi_anual),
+        None if dias_corridos is None else int(dias_corridos),
+        _identificador_curva(curva_cdi), bool(com_sensibilidades)
+    )
+    unitario = _buscar_ou_calcular(
+        chave,
+        lambda: _somente_leitura(carteira.calcular_carteira(
+            carteira_ofertas, 1.0, taxa_cdi_anual, dias_corridos, curva_cdi, com_sensibilidades
+        ))
+    )
+    resultado = dict(unitario)
+    colunas_lineares = ['valor_final_liquido', 'rendimento_bruto', 'rendimento_liquido', 'imposto_renda', 'iof']
+    if com_sensibilidades:
+        colunas_lineares += ['sensibilidade_cdi', 'sensibilidade_taxa']
+    for coluna in colunas_lineares:
+        resultado[coluna] = unitario[coluna] * valor_inicial
+    return resultado
+
+def calcular_evolucao_carteira(carteira_ofertas, valor_inicial, taxa_cdi_anual, curva_cdi=None):
+    """
+    Versão em cache de carteira.calcular_evolucao_carteira (chave em R$ 1,00).
+    """
+    chave = ('evolucao_carteira', _chave_carteira(carteira_ofertas), float(taxa_cdi_anual), _identificador_curva(curva_cdi))
+    evolucao_unitaria = _buscar_ou_calcular(
+        chave,
+        lambda: _somente_leitura(carteira.calcular_evolucao_carteira(
+            carteira_ofertas, 1.0, taxa_cdi_anual, curva_cdi
+        ))
+    )
+    return _escalar_evolucao(evolucao_unitaria, valor_inicial)
+
+def estatisticas_cache():
+    """
+    Retorna os contadores do cache: acertos, falhas, taxa de acerto e ocupação.
+    """
+    with _trava:
+        acertos = _estatisticas['acertos']
+        falhas = _estatisticas['falhas']
+        tamanho = len(_cache)
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': acertos / total if total else 0.0,
+        'tamanho': tamanho,
+        'tamanho_maximo': TAMANHO_MAXIMO_CACHE
+    }
+
+def limpar_cache():
+    """
+    Esvazia o cache e zera os contadores.
+    """
+    with _trava:
+        _cache.clear()
+        _estatisticas['acertos'] = 0
+        _estatisticas['falhas'] = 0
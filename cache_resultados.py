@@ -0,0 +1,134 @@
+# cache_resultados.py
+# Cache, compartilhado por todas as sessões do processo, dos pacotes de resultado já
+# montados (números e figuras prontas, ver resultados.montar_pacote) para as
+# entradas mais frequentes. Módulo leve (sem NumPy): é consultado antes dos cálculos.
+# Nada vivo é compartilhado entre sessões: o cache guarda os dados com arrays somente
+# leitura e as figuras serializadas, e cada leitura recebe contêineres e figuras novos.
+import threading
+from datetime import date
+
+from cachetools import LRUCache
+
+TAMANHO_MAXIMO_PACOTES = 32
+
+_pacotes = LRUCache(maxsize=TAMANHO_MAXIMO_PACOTES)
+_trava = threading.Lock()
+_estatisticas = {'acertos': 0, 'falhas': 0, 'invalidacoes_por_data': 0}
+_data_pacotes = [date.today()]
+
+def chave_entradas(valor_aplicar, ofertas, taxa_cdi_anual, curva_cdi=None, parametros_simulacao=None, data_inicio=None, parametros_reinvestimento=None):
+    """
+    Chave normalizada das entradas da comparação: nomes sem espaços nas pontas, tipos em
+    minúsculas e números arredondados, para que entradas equivalentes caiam no mesmo pacote.
+    """
+    return (
+        data_inicio or date.today(),
+        round(float(valor_aplicar), 2),
+        tuple(
+            (
+                str(oferta.get('nome') or '').strip(), str(oferta.get('tipo') or '').strip().lower(),
+                round(float(oferta['taxa']), 6), oferta['data_vencimento']
+            )
+            for oferta in ofertas
+        ),
+        round(float(taxa_cdi_anual), 6),
+        None if curva_cdi is None else curva_cdi['identificador'],
+        None if parametros_simulacao is None else tuple(sorted(parametros_simulacao.items())),
+        None if parametros_reinvestimento is None else tuple(sorted(parametros_reinvestimento.items()))
+    )
+
+def _invalidar_se_virou_o_dia():
+    """
+    Todos os prazos dependem de date.today(): na virada do dia, descarta os pacotes.
+    Deve ser chamada com a trava adquirida.
+    """
+    hoje = date.today()
+    if hoje != _data_pacotes[0]:
+        _pacotes.clear()
+        _data_pacotes[0] = hoje
+        _estatisticas['invalidacoes_por_data'] += 1
+
+def _copiar_dados(valor):
+    """
+    Cópia dos dicionários, listas e tuplas de um pacote; os arrays NumPy não são copiados,
+    mas ficam somente leitura (como em cache_calculos), e o restante já é imutável.
+    """
+    if isinstance(valor, dict):
+        return {chave: _copiar_dados(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_copiar_dados(item) for item in valor)
+    if hasattr(valor, 'setflags'):
+        valor.setflags(write=False)
+    return valor
+
+def _guardar(pacote):
+    """
+    Forma guardada de um pacote {'dados', 'figuras'}: dados copiados (_copiar_dados) e
+    figuras como o dicionário do plotly (to_plotly_json), sem objetos go.Figure vivos.
+    """
+    return {
+        'dados': _copiar_dados(pacote['dados']),
+        'figuras': {nome: _copiar_dados(figura.to_plotly_json()) for nome, figura in pacote['figuras'].items()}
+    }
+
+def _entregar(guardado):
+    """
+    Pacote novo a partir da forma guardada: contêineres copiados e figuras reconstruídas,
+    para que uma sessão que altere o que recebeu não afete as outras.
+    """
+    import plotly.graph_objects as go
+
+    return {
+        'dados': _copiar_dados(guardado['dados']),
+        'figuras': {nome: go.Figure(figura) for nome, figura in guardado['figuras'].items()}
+    }
+
+def buscar_ou_montar_pacote(chave, montar):
+    """
+    Retorna o pacote guardado para a chave ou o monta (fora da trava) com montar() e o guarda,
+    descartando o menos usado recentemente quando o cache está cheio. O pacote retornado é
+    sempre da sessão que chamou: alterá-lo não muda o que está guardado.
+    """
+    with _trava:
+        _invalidar_se_virou_o_dia()
+        guardado = _pacotes.get(chave)
+        _estatisticas['falhas' if guardado is None else 'acertos'] += 1
+    if guardado is not None:
+        return _entregar(guardado)
+    pacote = montar()
+    guardado = _guardar(pacote)
+    with _trava:
+        _invalidar_se_virou_o_dia()
+        if chave[0] == _data_pacotes[0]:
+            _pacotes[chave] = guardado
+    return pacote
+
+def estatisticas_pacotes():
+    """
+    Retorna os contadores do cache de pacotes: acertos, falhas, taxa de acerto, ocupação
+    e quantas vezes ele foi esvaziado pela virada do dia.
+    """
+    with _trava:
+        acertos = _estatisticas['acertos']
+        falhas = _estatisticas['falhas']
+        invalidacoes = _estatisticas['invalidacoes_por_data']
+        tamanho = len(_pacotes)
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': acertos / total if total else 0.0,
+        'tamanho': tamanho,
+        'tamanho_maximo': TAMANHO_MAXIMO_PACOTES,
+        'invalidacoes_por_data': invalidacoes
+    }
+
+def limpar_pacotes():
+    """
+    Esvazia o cache de pacotes e zera os contadores.
+    """
+    with _trava:
+        _pacotes.clear()
+        _estatisticas['acertos'] = 0
+        _estatisticas['falhas'] = 0
+        _estatisticas['invalidacoes_por_data'] = 0
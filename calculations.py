@@ -1,17 +1,39 @@
 # calculations.py
 from datetime import timedelta
-import math
-import pandas as pd # Mantido para a função gerar_evolucao, embora ela não retorne DataFrame diretamente
+import numpy as np
 
-def calcular_rendimento_pos_fixado(valor_inicial, taxa_aplicacao_cdi, prazo_dias_uteis, taxa_cdi_anual, isenta_ir=False, prazo_dias_corridos_para_ir=None):
+from calendario import adicionar_dias_uteis, dias_uteis_no_prazo, prazo_em_dias_corridos
+from curva_cdi import fatores_acumulados_cdi
+import tributacao
+
+def _exigir_data_inicio(data_inicio, motivo):
+    """
+    Levanta ValueError se data_inicio não foi informada (motivo explica por que ela é necessária).
+    """
+    if data_inicio is None:
+        raise ValueError(f"Informe data_inicio: {motivo}.")
+
+def calcular_rendimento_pos_fixado(valor_inicial, taxa_aplicacao_cdi, prazo_dias_uteis, taxa_cdi_anual, isenta_ir=False, prazo_dias_corridos_para_ir=None, data_inicio=None, curva_cdi=None):
     """
     Calcula o rendimento líquido de aplicações PÓS-FIXADAS (CDI).
+    Se prazo_dias_corridos_para_ir não for informado, os dias corridos para o IR são
+    obtidos pelo calendário de dias úteis a partir de data_inicio.
+    Com curva_cdi (ver curva_cdi.py), o CDI de cada dia útil vem da curva a partir de
+    data_inicio e taxa_cdi_anual é ignorada.
+    data_inicio não tem padrão (o resultado não depende do dia em que roda): é obrigatória
+    nesses dois casos, e a falta dela levanta ValueError.
     """
+    if curva_cdi is not None:
+        _exigir_data_inicio(data_inicio, 'com curva_cdi, ela define quais taxas da curva são acumuladas')
+        fator_acumulado = float(fatores_acumulados_cdi(curva_cdi, data_inicio, taxa_aplicacao_cdi, prazo_dias_uteis)[-1])
+    else:
+        fator_acumulado = None
+
     taxa_cdi_anual_decimal = taxa_cdi_anual / 100
     
     # Consideração: idealmente, a validação de input numérico deve ser feita na UI.
     # Mas, mantendo a função como estava por enquanto para evitar quebrar.
-    if taxa_cdi_anual_decimal <= -1:
+    if fator_acumulado is None and taxa_cdi_anual_decimal <= -1:
         # Se você quiser que esta função seja pura e não imprima erros de UI,
         # você deve retornar um status ou levantar uma exceção aqui.
         # Por enquanto, estou mantendo o erro direto se esta função for chamada sem validação prévia.
@@ -19,14 +41,14 @@ def calcular_rendimento_pos_fixado(valor_inicial, taxa_aplicacao_cdi, prazo_dias
         # Retornar valores que indiquem erro para o chamador tratar.
         return 0, 0, 0, 0 # Exemplo de retorno para erro
 
-    taxa_cdi_diaria = (1 + taxa_cdi_anual_decimal)**(1/252) - 1
-    
-    taxa_aplicacao_diaria = taxa_aplicacao_cdi / 100 * taxa_cdi_diaria
-    
     if prazo_dias_uteis <= 0:
         return valor_inicial, 0, 0, 0
-        
-    valor_final_bruto = valor_inicial * (1 + taxa_aplicacao_diaria)**prazo_dias_uteis
+
+    if fator_acumulado is None:
+        taxa_cdi_diaria = (1 + taxa_cdi_anual_decimal)**(1/252) - 1
+        taxa_aplicacao_diaria = taxa_aplicacao_cdi / 100 * taxa_cdi_diaria
+        fator_acumulado = (1 + taxa_aplicacao_diaria)**prazo_dias_uteis
+    valor_final_bruto = valor_inicial * fator_acumulado
     rendimento_bruto = valor_final_bruto - valor_inicial
 
     if isenta_ir:
@@ -35,25 +57,17 @@ def calcular_rendimento_pos_fixado(valor_inicial, taxa_aplicacao_cdi, prazo_dias
         return valor_final_liquido, rendimento_liquido, 0, 0 # Retorna 0 para imposto e alíquota de IR
 
     else:
-        # A alíquota do IR é baseada nos dias corridos
+        # IOF e IR (tabelas de tributacao.py) são baseados nos dias corridos
         if prazo_dias_corridos_para_ir is None:
-            prazo_dias_corridos_estimado = int(prazo_dias_uteis / 0.7) if prazo_dias_uteis > 0 else 0
+            _exigir_data_inicio(data_inicio, 'sem prazo_dias_corridos_para_ir, o prazo do IR sai do calendário')
+            prazo_dias_corridos_estimado = (adicionar_dias_uteis(data_inicio, prazo_dias_uteis) - data_inicio).days
         else:
             prazo_dias_corridos_estimado = prazo_dias_corridos_para_ir
 
-        if prazo_dias_corridos_estimado <= 180:
-            aliquota_ir = 0.225
-        elif prazo_dias_corridos_estimado <= 360:
-            aliquota_ir = 0.20
-        elif prazo_dias_corridos_estimado <= 720:
-            aliquota_ir = 0.175
-        else:
-            aliquota_ir = 0.15
-
-        imposto_renda = rendimento_bruto * aliquota_ir
-        rendimento_liquido = rendimento_bruto - imposto_renda
+        tributos = tributacao.calcular_tributos(rendimento_bruto, prazo_dias_corridos_estimado)
+        rendimento_liquido = float(tributos['rendimento_liquido'])
         valor_final_liquido = valor_inicial + rendimento_liquido
-        return valor_final_liquido, rendimento_liquido, aliquota_ir, imposto_renda
+        return valor_final_liquido, rendimento_liquido, float(tributos['aliquota_ir']), float(tributos['imposto_renda'])
 
 def calcular_rendimento_prefixado(valor_inicial, taxa_anual_prefixada, dias_corridos_totais):
     """
@@ -68,90 +82,261 @@ def calcular_rendimento_prefixado(valor_inicial, taxa_anual_prefixada, dias_corr
     valor_final_bruto = valor_inicial * (1 + taxa_anual_decimal)**(dias_corridos_totais / 365)
     rendimento_bruto = valor_final_bruto - valor_inicial
 
-    # Determinação da alíquota de IR (baseada em dias corridos)
-    if dias_corridos_totais <= 180:
-        aliquota_ir = 0.225
-    elif dias_corridos_totais <= 360:
-        aliquota_ir = 0.20
-    elif dias_corridos_totais <= 720:
-        aliquota_ir = 0.175
-    else:
-        aliquota_ir = 0.15
+    # IOF e IR pelas tabelas de tributacao.py (baseados em dias corridos)
+    tributos = tributacao.calcular_tributos(rendimento_bruto, dias_corridos_totais)
+    rendimento_liquido = float(tributos['rendimento_liquido'])
+    valor_final_liquido = valor_inicial + rendimento_liquido
+    return valor_final_liquido, rendimento_liquido, float(tributos['aliquota_ir']), float(tributos['imposto_renda'])
+
+def calcular_aliquota_ir(dias_corridos):
+    """
+    Versão vetorizada da tabela regressiva de IR (baseada em dias corridos).
+    A tabela fica em tributacao.TABELA_IR_REGRESSIVA.
+    """
+    return tributacao.aliquota_ir(dias_corridos)
+
+def calcular_grade_pos_fixada(valor_inicial, taxa_aplicacao_cdi, prazo_dias_uteis, taxa_cdi_anual, isenta_ir=False, prazo_dias_corridos_para_ir=None, data_inicio=None):
+    """
+    Versão em lote de calcular_rendimento_pos_fixado para grades de cenários.
+    Todos os parâmetros aceitam escalares ou arrays combináveis por broadcasting do NumPy
+    (ex.: taxas[:, None] x prazos[None, :]). Retorna um dicionário de arrays com
+    'valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda' e 'iof'.
+    Como na função escalar, data_inicio é obrigatória quando há tributadas sem
+    prazo_dias_corridos_para_ir.
+    """
+    valor_inicial = np.asarray(valor_inicial, dtype=float)
+    taxa_cdi_anual_decimal = np.asarray(taxa_cdi_anual, dtype=float) / 100
+    prazo_dias_uteis = np.asarray(prazo_dias_uteis)
+    isenta_ir = np.asarray(isenta_ir, dtype=bool)
+
+    if prazo_dias_corridos_para_ir is None and np.all(isenta_ir):
+        # Sem IR nem IOF, o prazo em dias corridos não muda o resultado
+        prazo_dias_corridos_para_ir = 0
+    elif prazo_dias_corridos_para_ir is None:
+        _exigir_data_inicio(data_inicio, 'sem prazo_dias_corridos_para_ir, o prazo do IR sai do calendário')
+        prazo_dias_corridos_para_ir = prazo_em_dias_corridos(data_inicio, prazo_dias_uteis)
+
+    cdi_valido = taxa_cdi_anual_decimal > -1
+    prazo_valido = prazo_dias_uteis > 0
+
+    with np.errstate(invalid='ignore'):
+        taxa_cdi_diaria = np.power(1 + np.where(cdi_valido, taxa_cdi_anual_decimal, 0), 1/252) - 1
+    taxa_aplicacao_diaria = np.asarray(taxa_aplicacao_cdi, dtype=float) / 100 * taxa_cdi_diaria
 
-    imposto_renda = rendimento_bruto * aliquota_ir
-    rendimento_liquido = rendimento_bruto - imposto_renda
+    valor_final_bruto = valor_inicial * np.power(1 + taxa_aplicacao_diaria, np.where(prazo_valido, prazo_dias_uteis, 0))
+    rendimento_bruto = valor_final_bruto - valor_inicial
+
+    tributos = tributacao.calcular_tributos(rendimento_bruto, prazo_dias_corridos_para_ir, isenta_ir)
+    rendimento_liquido = tributos['rendimento_liquido']
     valor_final_liquido = valor_inicial + rendimento_liquido
-    return valor_final_liquido, rendimento_liquido, aliquota_ir, imposto_renda
 
-def gerar_evolucao_pos_fixada(valor_inicial, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, nome_aplicacao):
+    # Mesmos casos especiais da função escalar: prazo nulo devolve o valor aplicado
+    # e CDI <= -100% devolve tudo zerado.
+    valor_final_liquido = np.where(prazo_valido, valor_final_liquido, valor_inicial)
+    rendimento_liquido = np.where(prazo_valido, rendimento_liquido, 0.0)
+    aliquota_ir = np.where(prazo_valido, tributos['aliquota_ir'], 0.0)
+    imposto_renda = np.where(prazo_valido, tributos['imposto_renda'], 0.0)
+    iof = np.where(prazo_valido, tributos['iof'], 0.0)
+    return {
+        'valor_final_liquido': np.where(cdi_valido, valor_final_liquido, 0.0),
+        'rendimento_liquido': np.where(cdi_valido, rendimento_liquido, 0.0),
+        'aliquota_ir': np.where(cdi_valido, aliquota_ir, 0.0),
+        'imposto_renda': np.where(cdi_valido, imposto_renda, 0.0),
+        'iof': np.where(cdi_valido, iof, 0.0)
+    }
+
+def calcular_grade_prefixada(valor_inicial, taxa_anual_prefixada, dias_corridos_totais):
     """
-    Gera a evolução diária do patrimônio para aplicações PÓS-FIXADAS.
-    Retorna uma lista de dicionários.
+    Versão em lote de calcular_rendimento_prefixado (parâmetros escalares ou arrays
+    com broadcasting). Retorna o mesmo dicionário de calcular_grade_pos_fixada.
     """
-    evolucao_dados = []
-    
-    delta = timedelta(days=1)
-    current_date = data_inicio
-    
-    # Adicionar o valor inicial no dia de início
-    evolucao_dados.append({
-        'Data': data_inicio,
-        'Aplicação': nome_aplicacao,
-        'Valor Líquido': valor_inicial
-    })
-
-    # Itera dia a dia até a data de vencimento
-    while current_date <= data_fim:
-        dias_corridos_acumulados = (current_date - data_inicio).days
-        
-        dias_uteis_acumulados = math.ceil(dias_corridos_acumulados * 0.7) if dias_corridos_acumulados > 0 else 1
-
-        valor_liquido_no_dia, _, _, _ = calcular_rendimento_pos_fixado(
-            valor_inicial, 
-            taxa_aplicacao_cdi, 
-            dias_uteis_acumulados, 
-            taxa_cdi_anual, 
-            isenta_ir=isenta_ir,
-            prazo_dias_corridos_para_ir=dias_corridos_acumulados
-        )
-        evolucao_dados.append({
-            'Data': current_date,
+    valor_inicial = np.asarray(valor_inicial, dtype=float)
+    taxa_anual_decimal = np.asarray(taxa_anual_prefixada, dtype=float) / 100
+    dias_corridos_totais = np.asarray(dias_corridos_totais)
+    prazo_valido = dias_corridos_totais > 0
+
+    valor_final_bruto = valor_inicial * np.power(1 + taxa_anual_decimal, np.where(prazo_valido, dias_corridos_totais, 0) / 365)
+    rendimento_bruto = valor_final_bruto - valor_inicial
+    tributos = tributacao.calcular_tributos(rendimento_bruto, dias_corridos_totais)
+    rendimento_liquido = tributos['rendimento_liquido']
+    return {
+        'valor_final_liquido': np.where(prazo_valido, valor_inicial + rendimento_liquido, valor_inicial),
+        'rendimento_liquido': np.where(prazo_valido, rendimento_liquido, 0.0),
+        'aliquota_ir': np.where(prazo_valido, tributos['aliquota_ir'], 0.0),
+        'imposto_renda': np.where(prazo_valido, tributos['imposto_renda'], 0.0),
+        'iof': np.where(prazo_valido, tributos['iof'], 0.0)
+    }
+
+def calcular_valor_liquido_por_fatores(valor_inicial, fatores_acumulados, dias_corridos, isenta_ir=False):
+    """
+    Valor líquido de aplicações PÓS-FIXADAS a partir de fatores brutos já acumulados
+    (ex.: matriz dias x trajetórias de CDI). dias_corridos define as alíquotas de IOF e IR
+    e é combinado com os fatores por broadcasting (ex.: dias[:, None]).
+    """
+    rendimento_bruto = valor_inicial * (np.asarray(fatores_acumulados) - 1)
+    if isenta_ir:
+        return valor_inicial + rendimento_bruto
+    return valor_inicial + rendimento_bruto * tributacao.fracao_liquida(dias_corridos)
+
+def _grade_de_dias(data_inicio, data_fim):
+    """
+    Monta a grade de dias corridos usada na evolução: a linha inicial do dia 0
+    seguida de um ponto por dia, de data_inicio até data_fim (inclusive).
+    """
+    total_dias = (data_fim - data_inicio).days
+    return np.concatenate(([0], np.arange(0, total_dias + 1))).astype(np.int32)
+
+def calcular_evolucao_pos_fixada(valor_inicial, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, curva_cdi=None):
+    """
+    Calcula a evolução diária de aplicações PÓS-FIXADAS de uma só vez (NumPy).
+    Retorna um dicionário de arrays colunares: 'dias' (dias corridos desde data_inicio),
+    'valor_bruto', 'aliquota_ir', 'imposto_renda', 'iof' e 'valor_liquido'.
+    Com curva_cdi, os fatores diários são acumulados uma vez e cada dia é lido por índice.
+    """
+    dias = _grade_de_dias(data_inicio, data_fim)
+    n = len(dias)
+    dias_uteis = dias_uteis_no_prazo(data_inicio, dias)
+
+    taxa_cdi_anual_decimal = taxa_cdi_anual / 100
+    if curva_cdi is None and taxa_cdi_anual_decimal <= -1:
+        # Mesmo comportamento de calcular_rendimento_pos_fixado: tudo zerado, exceto a linha inicial
+        valor_liquido = np.zeros(n)
+        valor_liquido[0] = valor_inicial
+        return {
+            'dias': dias,
+            'valor_bruto': valor_liquido.copy(),
+            'aliquota_ir': np.zeros(n),
+            'imposto_renda': np.zeros(n),
+            'iof': np.zeros(n),
+            'valor_liquido': valor_liquido
+        }
+
+    if curva_cdi is not None:
+        fatores = fatores_acumulados_cdi(curva_cdi, data_inicio, taxa_aplicacao_cdi, dias_uteis[-1])
+        valor_bruto = valor_inicial * fatores[dias_uteis]
+    else:
+        taxa_cdi_diaria = (1 + taxa_cdi_anual_decimal)**(1/252) - 1
+        taxa_aplicacao_diaria = taxa_aplicacao_cdi / 100 * taxa_cdi_diaria
+        valor_bruto = valor_inicial * np.power(1 + taxa_aplicacao_diaria, dias_uteis)
+    rendimento_bruto = valor_bruto - valor_inicial
+
+    tributos = tributacao.calcular_tributos(rendimento_bruto, dias, isenta_ir)
+    # Como em calcular_rendimento_pos_fixado, sem dia útil decorrido não há alíquota de IR
+    aliquota_ir = np.where(dias_uteis <= 0, 0.0, tributos['aliquota_ir'])
+    imposto_renda = tributos['imposto_renda']
+    iof = tributos['iof']
+    valor_liquido = valor_inicial + tributos['rendimento_liquido']
+
+    # A linha inicial representa apenas o valor aplicado
+    valor_bruto[0] = valor_inicial
+    aliquota_ir[0] = 0
+    imposto_renda[0] = 0
+    iof[0] = 0
+    valor_liquido[0] = valor_inicial
+    return {
+        'dias': dias,
+        'valor_bruto': valor_bruto,
+        'aliquota_ir': aliquota_ir,
+        'imposto_renda': imposto_renda,
+        'iof': iof,
+        'valor_liquido': valor_liquido
+    }
+
+def calcular_evolucao_prefixada(valor_inicial, taxa_anual_prefixada, data_inicio, data_fim):
+    """
+    Calcula a evolução diária de aplicações PRÉ-FIXADAS de uma só vez (NumPy).
+    Retorna o mesmo dicionário de arrays colunares de calcular_evolucao_pos_fixada.
+    """
+    dias = _grade_de_dias(data_inicio, data_fim)
+    taxa_anual_decimal = taxa_anual_prefixada / 100
+
+    valor_bruto = np.where(
+        dias > 0,
+        valor_inicial * np.power(1 + taxa_anual_decimal, dias / 365),
+        valor_inicial
+    )
+    rendimento_bruto = valor_bruto - valor_inicial
+    tributos = tributacao.calcular_tributos(rendimento_bruto, dias)
+    aliquota_ir = np.where(dias > 0, tributos['aliquota_ir'], 0.0)
+    valor_liquido = valor_inicial + tributos['rendimento_liquido']
+    valor_liquido[dias <= 0] = valor_inicial
+    return {
+        'dias': dias,
+        'valor_bruto': valor_bruto,
+        'aliquota_ir': aliquota_ir,
+        'imposto_renda': tributos['imposto_renda'],
+        'iof': tributos['iof'],
+        'valor_liquido': valor_liquido
+    }
+
+def montar_evolucao_colunar(evolucoes):
+    """
+    Junta as evoluções colunares de várias aplicações num único conjunto compacto.
+    Recebe um dicionário {nome_aplicacao: evolucao} e retorna um dicionário com
+    'dias' (int32, relativo à data de início), 'codigo_aplicacao' (int8, índice em
+    'aplicacoes'), 'valor_liquido' (float64) e a lista 'aplicacoes'.
+    """
+    aplicacoes = list(evolucoes.keys())
+    if not aplicacoes:
+        return {
+            'aplicacoes': aplicacoes,
+            'dias': np.empty(0, dtype=np.int32),
+            'codigo_aplicacao': np.empty(0, dtype=np.int8),
+            'valor_liquido': np.empty(0)
+        }
+    return {
+        'aplicacoes': aplicacoes,
+        'dias': np.concatenate([evolucao['dias'] for evolucao in evolucoes.values()]).astype(np.int32, copy=False),
+        'codigo_aplicacao': np.repeat(
+            np.arange(len(aplicacoes), dtype=np.int8),
+            [len(evolucao['dias']) for evolucao in evolucoes.values()]
+        ),
+        'valor_liquido': np.concatenate([evolucao['valor_liquido'] for evolucao in evolucoes.values()])
+    }
+
+def evolucao_para_dataframe(evolucao_colunar, data_inicio):
+    """
+    Monta, de uma só vez e sem conversão linha a linha, o DataFrame usado pelo
+    gráfico de evolução ('Data', 'Aplicação' categórica e 'Valor Líquido').
+    """
+    import pandas as pd
+
+    datas = np.datetime64(data_inicio, 'D') + evolucao_colunar['dias']
+    return pd.DataFrame({
+        'Data': datas.astype('datetime64[s]'),
+        'Aplicação': pd.Categorical.from_codes(
+            evolucao_colunar['codigo_aplicacao'], categories=evolucao_colunar['aplicacoes']
+        ),
+        'Valor Líquido': evolucao_colunar['valor_liquido']
+    }, copy=False)
+
+def _evolucao_para_lista(evolucao, data_inicio, nome_aplicacao):
+    """
+    Converte a evolução colunar no formato antigo (lista de dicionários).
+    """
+    return [
+        {
+            'Data': data_inicio + timedelta(days=dia),
             'Aplicação': nome_aplicacao,
-            'Valor Líquido': valor_liquido_no_dia
-        })
-        current_date += delta
-    return evolucao_dados
+            'Valor Líquido': valor
+        }
+        for dia, valor in zip(evolucao['dias'].tolist(), evolucao['valor_liquido'].tolist())
+    ]
+
+def gerar_evolucao_pos_fixada(valor_inicial, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, nome_aplicacao, curva_cdi=None):
+    """
+    Gera a evolução diária do patrimônio para aplicações PÓS-FIXADAS.
+    Retorna uma lista de dicionários (ver calcular_evolucao_pos_fixada para a versão colunar).
+    """
+    evolucao = calcular_evolucao_pos_fixada(
+        valor_inicial, taxa_aplicacao_cdi, taxa_cdi_anual, data_inicio, data_fim, isenta_ir, curva_cdi
+    )
+    return _evolucao_para_lista(evolucao, data_inicio, nome_aplicacao)
 
 def gerar_evolucao_prefixada(valor_inicial, taxa_anual_prefixada, data_inicio, data_fim, nome_aplicacao):
     """
     Gera a evolução diária do patrimônio para aplicações PRÉ-FIXADAS.
-    Retorna uma lista de dicionários.
+    Retorna uma lista de dicionários (ver calcular_evolucao_prefixada para a versão colunar).
     """
-    evolucao_dados = []
-    
-    delta = timedelta(days=1)
-    current_date = data_inicio
-    
-    # Adicionar o valor inicial no dia de início
-    evolucao_dados.append({
-        'Data': data_inicio,
-        'Aplicação': nome_aplicacao,
-        'Valor Líquido': valor_inicial
-    })
-
-    # Itera dia a dia até a data de vencimento
-    while current_date <= data_fim:
-        dias_corridos_acumulados = (current_date - data_inicio).days
-        
-        valor_liquido_no_dia, _, _, _ = calcular_rendimento_prefixado(
-            valor_inicial, 
-            taxa_anual_prefixada, 
-            dias_corridos_acumulados
-        )
-        evolucao_dados.append({
-            'Data': current_date,
-            'Aplicação': nome_aplicacao,
-            'Valor Líquido': valor_liquido_no_dia
-        })
-        current_date += delta
-    return evolucao_dados
\ No newline at end of file
+    evolucao = calcular_evolucao_prefixada(valor_inicial, taxa_anual_prefixada, data_inicio, data_fim)
+    return _evolucao_para_lista(evolucao, data_inicio, nome_aplicacao)
@@ -0,0 +1,162 @@
+# calendario.py
+from datetime import date, timedelta
+import numpy as np
+
+# Intervalo coberto pelo calendário pré-calculado
+DATA_INICIO_CALENDARIO = date(2000, 1, 1)
+DATA_FIM_CALENDARIO = date(2099, 12, 31)
+
+# Feriados nacionais de data fixa (mês, dia), conforme o calendário ANBIMA/B3
+FERIADOS_FIXOS = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 7),    # Independência do Brasil
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+]
+
+# Dia Nacional de Zumbi e da Consciência Negra (Lei 14.759/2023), feriado nacional a partir de 2024
+ANO_INICIO_CONSCIENCIA_NEGRA = 2024
+
+# Feriados móveis, em dias relativos ao Domingo de Páscoa
+FERIADOS_MOVEIS = [
+    -48,  # Segunda-feira de Carnaval
+    -47,  # Terça-feira de Carnaval
+    -2,   # Sexta-feira Santa
+    60,   # Corpus Christi
+]
+
+def calcular_pascoa(ano):
+    """
+    Calcula o Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano).
+    """
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+def feriados_do_ano(ano):
+    """
+    Retorna a lista de feriados nacionais (bancários) de um ano.
+    """
+    feriados = [date(ano, mes, dia) for mes, dia in FERIADOS_FIXOS]
+    if ano >= ANO_INICIO_CONSCIENCIA_NEGRA:
+        feriados.append(date(ano, 11, 20))
+    pascoa = calcular_pascoa(ano)
+    feriados.extend(pascoa + timedelta(days=deslocamento) for deslocamento in FERIADOS_MOVEIS)
+    return sorted(feriados)
+
+def _montar_calendario():
+    """
+    Pré-calcula, uma única vez, o indicador de dia útil e a contagem acumulada
+    de dias úteis para todo o intervalo do calendário.
+    """
+    ordinal_inicio = DATA_INICIO_CALENDARIO.toordinal()
+    total_dias = DATA_FIM_CALENDARIO.toordinal() - ordinal_inicio + 1
+
+    # date.toordinal() de 0001-01-01 é 1 (segunda-feira), logo (ordinal - 1) % 7 == 0 é segunda
+    dias_da_semana = (np.arange(ordinal_inicio, ordinal_inicio + total_dias) - 1) % 7
+    eh_dia_util = dias_da_semana < 5
+
+    indices_feriados = [
+        feriado.toordinal() - ordinal_inicio
+        for ano in range(DATA_INICIO_CALENDARIO.year, DATA_FIM_CALENDARIO.year + 1)
+        for feriado in feriados_do_ano(ano)
+    ]
+    eh_dia_util[indices_feriados] = False
+
+    # dias_uteis_acumulados[i] = número de dias úteis de DATA_INICIO_CALENDARIO até o dia i (inclusive)
+    dias_uteis_acumulados = np.cumsum(eh_dia_util, dtype=np.int32)
+    eh_dia_util.setflags(write=False)
+    dias_uteis_acumulados.setflags(write=False)
+    return ordinal_inicio, eh_dia_util, dias_uteis_acumulados
+
+_ORDINAL_INICIO, _EH_DIA_UTIL, _DIAS_UTEIS_ACUMULADOS = _montar_calendario()
+
+def _indice(data):
+    """
+    Converte uma data no índice correspondente dos arrays pré-calculados.
+    """
+    indice = data.toordinal() - _ORDINAL_INICIO
+    if indice < 0 or indice >= len(_EH_DIA_UTIL):
+        raise ValueError(
+            f"A data {data.strftime('%d/%m/%Y')} está fora do calendário suportado "
+            f"({DATA_INICIO_CALENDARIO.strftime('%d/%m/%Y')} a {DATA_FIM_CALENDARIO.strftime('%d/%m/%Y')})."
+        )
+    return indice
+
+def eh_dia_util(data):
+    """
+    Indica se a data é um dia útil (não é fim de semana nem feriado nacional).
+    """
+    return bool(_EH_DIA_UTIL[_indice(data)])
+
+def dias_uteis_entre(data_inicio, data_fim):
+    """
+    Número de dias úteis no intervalo (data_inicio, data_fim], em O(1).
+    Segue a convenção de mercado: o dia da aplicação não rende, o dia do vencimento sim.
+    Retorna valor negativo se data_fim for anterior a data_inicio.
+    """
+    return int(_DIAS_UTEIS_ACUMULADOS[_indice(data_fim)] - _DIAS_UTEIS_ACUMULADOS[_indice(data_inicio)])
+
+def dias_uteis_no_prazo(data_inicio, dias_corridos):
+    """
+    Versão vetorizada de dias_uteis_entre: para cada prazo em dias corridos (int ou array),
+    retorna o número de dias úteis entre data_inicio e data_inicio + prazo.
+    """
+    indice_inicio = _indice(data_inicio)
+    dias_corridos = np.asarray(dias_corridos)
+    indices = indice_inicio + dias_corridos
+    if dias_corridos.size and (indices.min() < 0 or indices.max() >= len(_EH_DIA_UTIL)):
+        raise ValueError("O prazo informado ultrapassa o intervalo do calendário suportado.")
+    return _DIAS_UTEIS_ACUMULADOS[indices] - _DIAS_UTEIS_ACUMULADOS[indice_inicio]
+
+def adicionar_dias_uteis(data, n):
+    """
+    Retorna o n-ésimo dia útil após a data (n >= 0), em O(log n) via busca binária.
+    Para n == 0, retorna a própria data.
+    """
+    if n <= 0:
+        return data
+    alvo = _DIAS_UTEIS_ACUMULADOS[_indice(data)] + n
+    indice = int(np.searchsorted(_DIAS_UTEIS_ACUMULADOS, alvo, side='left'))
+    if indice >= len(_DIAS_UTEIS_ACUMULADOS):
+        raise ValueError("O número de dias úteis informado ultrapassa o intervalo do calendário suportado.")
+    return date.fromordinal(_ORDINAL_INICIO + indice)
+
+def prazo_em_dias_corridos(data_inicio, dias_uteis):
+    """
+    Versão vetorizada do caminho inverso: para cada prazo em dias úteis (int ou array),
+    retorna quantos dias corridos separam data_inicio do n-ésimo dia útil seguinte.
+    """
+    indice_inicio = _indice(data_inicio)
+    dias_uteis = np.maximum(np.asarray(dias_uteis), 0)
+    alvos = _DIAS_UTEIS_ACUMULADOS[indice_inicio] + dias_uteis
+    indices = np.searchsorted(_DIAS_UTEIS_ACUMULADOS, alvos, side='left')
+    if indices.size and np.max(indices) >= len(_DIAS_UTEIS_ACUMULADOS):
+        raise ValueError("O número de dias úteis informado ultrapassa o intervalo do calendário suportado.")
+    return np.where(dias_uteis > 0, indices - indice_inicio, 0)
+
+def proximos_dias_uteis(data_inicio, n):
+    """
+    Retorna, como array datetime64[D], os n dias úteis seguintes a data_inicio
+    (o dia de início não entra, seguindo a convenção de dias_uteis_entre).
+    """
+    if n <= 0:
+        return np.empty(0, dtype='datetime64[D]')
+    indice_inicio = _indice(data_inicio)
+    indice_fim = int(np.searchsorted(_DIAS_UTEIS_ACUMULADOS, _DIAS_UTEIS_ACUMULADOS[indice_inicio] + n, side='left'))
+    if indice_fim >= len(_DIAS_UTEIS_ACUMULADOS):
+        raise ValueError("O número de dias úteis informado ultrapassa o intervalo do calendário suportado.")
+    indices = indice_inicio + 1 + np.flatnonzero(_EH_DIA_UTIL[indice_inicio + 1:indice_fim + 1])
+    return np.datetime64(DATA_INICIO_CALENDARIO, 'D') + indices
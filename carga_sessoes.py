@@ -0,0 +1,248 @@
+# carga_sessoes.py
+# Teste de carga: várias sessões simultâneas do app.py real, rodando no mesmo processo
+# (como num dyno com `streamlit run app.py`) pelo AppTest headless do Streamlit.
+#
+#   python carga_sessoes.py --sessoes 20 --concorrencia 8 --saida carga.json
+#   python carga_sessoes.py --base carga_anterior.json   # compara com outro commit
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from benchmarks import TOLERANCIA_PADRAO, comparar_com_base
+from produtos import TIPOS_PRODUTO
+
+DIRETORIO_APP = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_APP = os.path.join(DIRETORIO_APP, 'app.py')
+TEMPO_LIMITE_RERUN_S = 120
+
+# Faixas das entradas aleatórias (dentro dos limites de render_input_forms)
+FAIXA_VALOR_APLICAR = (100.0, 1_000_000.0)
+FAIXA_TAXA_CDI = (5.0, 20.0)
+FAIXA_TAXA_POR_INDEXADOR = {'cdi': (80.0, 130.0), 'pre': (8.0, 18.0)}
+FAIXA_PRAZO_DIAS = (30, 3650)
+MAXIMO_OFERTAS_CARGA = 5
+PERCENTIS = (50, 90, 99)
+
+def rss_atual_mb():
+    """
+    Memória residente atual do processo (MB); sem /proc, usa o pico informado pelo sistema.
+    """
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return rss_pico_mb()
+
+def rss_pico_mb():
+    """
+    Pico de memória residente do processo (MB).
+    """
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 1024
+
+def entradas_aleatorias(gerador, fracao_padrao):
+    """
+    Sorteia as entradas de uma sessão. Com probabilidade fracao_padrao, retorna None:
+    a sessão compara as entradas padrão do formulário sem editá-las (o caso mais comum).
+    """
+    if gerador.random() < fracao_padrao:
+        return None
+    ofertas = []
+    for indice in range(gerador.randint(1, MAXIMO_OFERTAS_CARGA)):
+        tipo = gerador.choice(list(TIPOS_PRODUTO))
+        taxa_minima, taxa_maxima = FAIXA_TAXA_POR_INDEXADOR[TIPOS_PRODUTO[tipo]['indexador']]
+        ofertas.append({
+            'nome': f'Oferta {indice + 1}',
+            'tipo': tipo,
+            'taxa': round(gerador.uniform(taxa_minima, taxa_maxima), 2),
+            'data_vencimento': date.today() + timedelta(days=gerador.randint(*FAIXA_PRAZO_DIAS))
+        })
+    return {
+        'valor_aplicar': round(gerador.uniform(*FAIXA_VALOR_APLICAR), 2),
+        'taxa_cdi_anual': round(gerador.uniform(*FAIXA_TAXA_CDI), 2),
+        'ofertas': ofertas
+    }
+
+def _preencher_formulario(sessao, entradas):
+    """
+    Preenche os widgets de render_input_forms e reexecuta uma vez por mudança de
+    quantidade de ofertas (os campos de cada oferta só existem depois dela).
+    """
+    sessao.number_input(key='quantidade_ofertas_input').set_value(len(entradas['ofertas'])).run()
+    sessao.number_input(key='valor_aplicar_input').set_value(entradas['valor_aplicar'])
+    sessao.number_input(key='taxa_cdi_anual_input').set_value(entradas['taxa_cdi_anual'])
+    for indice, oferta in enumerate(entradas['ofertas']):
+        sessao.text_input(key=f'oferta_{indice}_nome_input').set_value(oferta['nome'])
+        sessao.selectbox(key=f'oferta_{indice}_tipo_select').set_value(oferta['tipo'])
+        sessao.number_input(key=f'oferta_{indice}_taxa_input').set_value(oferta['taxa'])
+        sessao.date_input(key=f'oferta_{indice}_vencimento_input').set_value(oferta['data_vencimento'])
+
+def executar_sessao(entradas):
+    """
+    Executa uma sessão completa: carga da página, preenchimento do formulário e clique em
+    "Comparar Aplicações". Retorna as latências (s) de cada etapa e os erros exibidos.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    sessao = AppTest.from_file(CAMINHO_APP, default_timeout=TEMPO_LIMITE_RERUN_S)
+    latencias = {}
+
+    inicio = time.perf_counter()
+    sessao.run()
+    latencias['carga_pagina'] = time.perf_counter() - inicio
+
+    if entradas is not None:
+        inicio = time.perf_counter()
+        _preencher_formulario(sessao, entradas)
+        latencias['preenchimento'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    sessao.button(key='comparar_button').click().run()
+    latencias['comparacao'] = time.perf_counter() - inicio
+
+    erros = [str(excecao.value) for excecao in sessao.exception] + [str(erro.value) for erro in sessao.error]
+    return {'latencias': latencias, 'erros': erros, 'entradas_padrao': entradas is None}
+
+def _estatisticas(tempos):
+    """
+    Distribuição das latências de uma etapa (s). 'mediana_s' mantém o formato de
+    benchmarks.py, para reaproveitar a comparação com um relatório de referência.
+    """
+    tempos = np.asarray(tempos)
+    percentis = np.percentile(tempos, PERCENTIS)
+    return {
+        'amostras': int(tempos.size),
+        'mediana_s': float(np.median(tempos)),
+        **{f'p{percentil}_s': float(valor) for percentil, valor in zip(PERCENTIS, percentis)},
+        'maximo_s': float(tempos.max()),
+        'media_s': float(tempos.mean())
+    }
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO_APP, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar_carga(sessoes=20, concorrencia=4, fracao_padrao=0.3, semente=0):
+    """
+    Executa `sessoes` sessões, `concorrencia` de cada vez, e retorna o relatório: distribuição
+    das latências por etapa, vazão de comparações e crescimento da memória residente.
+    """
+    import streamlit
+
+    gerador = random.Random(semente)
+    lista_entradas = [entradas_aleatorias(gerador, fracao_padrao) for _ in range(sessoes)]
+
+    rss_inicial = rss_atual_mb()
+    amostras_rss = [rss_inicial]
+    encerrar_amostragem = threading.Event()
+
+    def amostrar_rss():
+        while not encerrar_amostragem.wait(0.2):
+            amostras_rss.append(rss_atual_mb())
+
+    amostrador = threading.Thread(target=amostrar_rss, name='amostragem-rss', daemon=True)
+    amostrador.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        execucoes = list(executor.map(executar_sessao, lista_entradas))
+    duracao = time.perf_counter() - inicio
+    encerrar_amostragem.set()
+    amostrador.join()
+    rss_final = rss_atual_mb()
+
+    etapas = sorted({etapa for execucao in execucoes for etapa in execucao['latencias']})
+    resultados = {
+        etapa: _estatisticas([execucao['latencias'][etapa] for execucao in execucoes if etapa in execucao['latencias']])
+        for etapa in etapas
+    }
+    erros = [erro for execucao in execucoes for erro in execucao['erros']]
+    return {
+        'metadados': {
+            'data_execucao': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_atual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'streamlit': streamlit.__version__,
+            'numpy': np.__version__
+        },
+        'configuracao': {
+            'sessoes': sessoes, 'concorrencia': concorrencia, 'fracao_padrao': fracao_padrao, 'semente': semente
+        },
+        'resultados': resultados,
+        'vazao': {
+            'duracao_s': duracao,
+            'comparacoes_por_s': sessoes / duracao if duracao else 0.0
+        },
+        'memoria': {
+            'rss_inicial_mb': rss_inicial,
+            'rss_final_mb': rss_final,
+            'rss_pico_mb': max(max(amostras_rss), rss_final),
+            'crescimento_mb': rss_final - rss_inicial,
+            'crescimento_por_sessao_mb': (rss_final - rss_inicial) / sessoes if sessoes else 0.0
+        },
+        'erros': {'quantidade': len(erros), 'exemplos': sorted(set(erros))[:10]}
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas do app.py (AppTest headless).")
+    parser.add_argument('--sessoes', type=int, default=20, help="Total de sessões (padrão: %(default)s)")
+    parser.add_argument('--concorrencia', type=int, default=4, help="Sessões simultâneas (padrão: %(default)s)")
+    parser.add_argument('--fracao-padrao', type=float, default=0.3, help="Fração de sessões que comparam as entradas padrão (padrão: %(default)s)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente das entradas aleatórias (padrão: %(default)s)")
+    parser.add_argument('--saida', help="Grava o relatório em JSON neste arquivo (padrão: stdout)")
+    parser.add_argument('--base', help="Relatório JSON de outro commit para detectar regressões de latência")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO, help="Aumento relativo tolerado na mediana (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    os.chdir(DIRETORIO_APP)
+    relatorio = executar_carga(args.sessoes, args.concorrencia, args.fracao_padrao, args.semente)
+
+    for etapa, estatisticas in relatorio['resultados'].items():
+        print(
+            f"{etapa:<15} p50 {estatisticas['mediana_s'] * 1000:>8.0f} ms  p90 {estatisticas['p90_s'] * 1000:>8.0f} ms"
+            f"  p99 {estatisticas['p99_s'] * 1000:>8.0f} ms  ({estatisticas['amostras']} amostras)",
+            file=sys.stderr
+        )
+    print(
+        f"Vazão: {relatorio['vazao']['comparacoes_por_s']:.2f} comparações/s; "
+        f"RSS: {relatorio['memoria']['rss_inicial_mb']:.0f} -> {relatorio['memoria']['rss_final_mb']:.0f} MB "
+        f"(pico {relatorio['memoria']['rss_pico_mb']:.0f} MB); erros: {relatorio['erros']['quantidade']}",
+        file=sys.stderr
+    )
+
+    codigo_saida = 1 if relatorio['erros']['quantidade'] else 0
+    if args.base:
+        with open(args.base, encoding='utf-8') as arquivo:
+            comparacao = comparar_com_base(relatorio, json.load(arquivo), args.tolerancia)
+        relatorio['comparacao'] = {'base': args.base, 'tolerancia': args.tolerancia, 'casos': comparacao}
+        for caso in comparacao:
+            marcador = 'REGRESSÃO' if caso['regressao'] else 'ok'
+            print(f"{caso['caso']:<15} {caso['razao']:>6.2f}x  {marcador}", file=sys.stderr)
+        if any(caso['regressao'] for caso in comparacao):
+            codigo_saida = 1
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    return codigo_saida
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# carteira.py
+import numpy as np
+
+from calendario import dias_uteis_no_prazo
+from curva_cdi import acumular_fatores_cdi, taxas_cdi_diarias, taxas_cdi_por_dia_util
+from produtos import TIPOS_PRODUTO, validar_tipo_produto
+from tributacao import calcular_tributos, fracao_liquida
+
+COLUNAS_RESULTADO = ['valor_final_liquido', 'rendimento_bruto', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda', 'iof']
+# Derivadas analíticas do valor final líquido (ver calcular_ofertas com com_sensibilidades=True):
+# R$ por 1 p.p. de CDI anual, R$ por 1 unidade da taxa contratada e R$ por R$ 1,00 aplicado
+COLUNAS_SENSIBILIDADE = ['sensibilidade_cdi', 'sensibilidade_taxa', 'sensibilidade_valor']
+
+def caracteristicas_dos_tipos(tipos):
+    """
+    Retorna, para um array de tipos já validados, as máscaras 'indexado ao CDI' e 'isenta de IR'.
+    """
+    tipos = np.asarray(tipos)
+    tipos_cdi = [tipo for tipo, produto in TIPOS_PRODUTO.items() if produto['indexador'] == 'cdi']
+    tipos_isentos = [tipo for tipo, produto in TIPOS_PRODUTO.items() if produto['isenta_ir']]
+    return np.isin(tipos, tipos_cdi), np.isin(tipos, tipos_isentos)
+
+def montar_carteira(ofertas, data_inicio):
+    """
+    Monta a carteira colunar a partir de uma lista de ofertas (dicionários com 'nome',
+    'tipo', 'taxa' e 'data_vencimento'). Os nomes identificam as aplicações nos gráficos
+    e precisam ser únicos.
+    """
+    nomes, tipos, taxas, datas_vencimento = [], [], [], []
+    for posicao, oferta in enumerate(ofertas, start=1):
+        nome = str(oferta.get('nome') or '').strip() or f"Aplicação {posicao}"
+        nomes.append(nome)
+        tipos.append(validar_tipo_produto(oferta.get('tipo'), f"Aplicação '{nome}'"))
+        taxas.append(float(oferta['taxa']))
+        datas_vencimento.append(oferta['data_vencimento'])
+    repetidos = sorted({nome for nome in nomes if nomes.count(nome) > 1})
+    if repetidos:
+        raise ValueError(f"Nomes de aplicação repetidos: {', '.join(repetidos)}.")
+
+    tipos = np.array(tipos, dtype=object)
+    indexado_cdi, isenta_ir = caracteristicas_dos_tipos(tipos)
+    return {
+        'nomes': nomes,
+        'tipos': tipos,
+        'indexado_cdi': indexado_cdi,
+        'isenta_ir': isenta_ir,
+        'taxas': np.array(taxas, dtype=float),
+        'datas_vencimento': datas_vencimento,
+        'dias_corridos': np.array([(data - data_inicio).days for data in datas_vencimento], dtype=np.int64),
+        'data_inicio': data_inicio
+    }
+
+def selecionar_ofertas(carteira, mascara):
+    """
+    Retorna a carteira só com as ofertas selecionadas pela máscara (ou lista de índices), na mesma ordem.
+    """
+    indices = np.flatnonzero(mascara) if np.asarray(mascara).dtype == bool else np.asarray(mascara, dtype=np.int64)
+    selecao = {
+        chave: carteira[chave][indices]
+        for chave in ('tipos', 'indexado_cdi', 'isenta_ir', 'taxas', 'dias_corridos')
+    }
+    selecao['nomes'] = [carteira['nomes'][indice] for indice in indices.tolist()]
+    selecao['datas_vencimento'] = [carteira['datas_vencimento'][indice] for indice in indices.tolist()]
+    selecao['data_inicio'] = carteira['data_inicio']
+    return selecao
+
+def ofertas_sem_rendimento(carteira, taxa_cdi_anual, curva_cdi=None):
+    """
+    Máscara das ofertas que as funções escalares zeram (valor e rendimento): sem curva,
+    CDI <= -100% zera as pós-fixadas (ver calculations.calcular_rendimento_pos_fixado).
+    """
+    return carteira['indexado_cdi'] & (curva_cdi is None and taxa_cdi_anual <= -100)
+
+def _fatores_pos_fixados(taxas_aplicacao_cdi, dias_uteis, taxa_cdi_anual, data_inicio, curva_cdi):
+    """
+    Fatores brutos acumulados das pós-fixadas. dias_uteis pode ter uma dimensão a mais
+    que as taxas (ex.: ofertas x dias da evolução). Sem curva, usa o CDI constante;
+    com curva, acumula os fatores diários uma vez para todas as ofertas e indexa.
+    """
+    if curva_cdi is None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            taxa_cdi_diaria = taxas_cdi_diarias(taxa_cdi_anual)
+        taxas_diarias = taxas_aplicacao_cdi / 100 * taxa_cdi_diaria
+        return np.power(1 + taxas_diarias.reshape(taxas_diarias.shape + (1,) * (dias_uteis.ndim - 1)), dias_uteis)
+
+    total_dias_uteis = int(dias_uteis.max()) if dias_uteis.size else 0
+    taxas_diarias_curva = taxas_cdi_diarias(taxas_cdi_por_dia_util(curva_cdi, data_inicio, total_dias_uteis))
+    # Matriz (dias úteis + 1) x ofertas
+    fatores = acumular_fatores_cdi(taxas_diarias_curva[:, None], taxas_aplicacao_cdi[None, :])
+    colunas = np.arange(len(taxas_aplicacao_cdi)).reshape((-1,) + (1,) * (dias_uteis.ndim - 1))
+    return fatores[dias_uteis, colunas]
+
+def _derivadas_log_pos_fixados(taxas_aplicacao_cdi, dias_uteis, taxa_cdi_anual, data_inicio, curva_cdi):
+    """
+    Derivadas do logaritmo do fator bruto das pós-fixadas em relação à taxa contratada
+    (por 1 p.p. do CDI) e ao CDI anual (por 1 p.p.; com curva, um deslocamento paralelo de
+    todos os vértices). Como ln F = soma de ln(1 + p c_i), ambas são somas por dia útil.
+    """
+    percentuais = taxas_aplicacao_cdi / 100
+    if curva_cdi is None:
+        taxa_cdi_diaria = taxas_cdi_diarias(taxa_cdi_anual)
+        por_taxa = dias_uteis * (taxa_cdi_diaria / 100) / (1 + percentuais * taxa_cdi_diaria)
+        por_cdi = dias_uteis * percentuais * (1 + taxa_cdi_diaria) / (252 * (100 + taxa_cdi_anual)) / (1 + percentuais * taxa_cdi_diaria)
+        return por_taxa, por_cdi
+
+    total_dias_uteis = int(dias_uteis.max()) if dias_uteis.size else 0
+    taxas_anuais = taxas_cdi_por_dia_util(curva_cdi, data_inicio, total_dias_uteis)[:, None]
+    taxas_diarias = taxas_cdi_diarias(taxas_anuais)
+    denominadores = 1 + taxas_diarias * percentuais[None, :]
+    colunas = np.arange(len(taxas_aplicacao_cdi))
+    derivadas = []
+    for termos in (
+        (taxas_diarias / 100) / denominadores,
+        percentuais[None, :] * (1 + taxas_diarias) / (252 * (100 + taxas_anuais)) / denominadores
+    ):
+        # Matriz (dias úteis + 1) x ofertas com as somas acumuladas; o elemento 0 vale 0
+        acumuladas = np.vstack((np.zeros((1, len(colunas))), np.cumsum(termos, axis=0)))
+        derivadas.append(acumuladas[dias_uteis, colunas])
+    return tuple(derivadas)
+
+def calcular_ofertas(valores_iniciais, tipos, taxas, dias_corridos, taxa_cdi_anual, data_inicio, curva_cdi=None, com_sensibilidades=False):
+    """
+    Calcula, numa única passada vetorizada, o resultado de ofertas de tipos quaisquer do registro
+    (produtos.TIPOS_PRODUTO) com os prazos em dias corridos informados.
+    Retorna um dicionário de arrays com as colunas de COLUNAS_RESULTADO e, com com_sensibilidades,
+    também as de COLUNAS_SENSIBILIDADE, derivadas analíticas obtidas dos mesmos fatores
+    (o valor líquido é P (1 + (F - 1) x fração líquida), então dV/dx = P x fração líquida x dF/dx).
+    Mantém os casos especiais das funções escalares: prazo nulo devolve o valor aplicado e,
+    sem curva, CDI <= -100% zera as pós-fixadas.
+    """
+    valores_iniciais = np.broadcast_to(np.asarray(valores_iniciais, dtype=float), np.shape(taxas))
+    taxas = np.asarray(taxas, dtype=float)
+    dias_corridos = np.asarray(dias_corridos)
+    indexado_cdi, isenta_ir = caracteristicas_dos_tipos(tipos)
+
+    fatores = np.ones(len(taxas))
+    derivadas_taxa = np.zeros(len(taxas))
+    derivadas_cdi = np.zeros(len(taxas))
+    prazo_valido = dias_corridos > 0
+    if indexado_cdi.any():
+        dias_uteis = dias_uteis_no_prazo(data_inicio, np.maximum(dias_corridos[indexado_cdi], 0))
+        fatores[indexado_cdi] = _fatores_pos_fixados(taxas[indexado_cdi], dias_uteis, taxa_cdi_anual, data_inicio, curva_cdi)
+        prazo_valido[indexado_cdi] = dias_uteis > 0
+        if com_sensibilidades:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                derivadas_taxa[indexado_cdi], derivadas_cdi[indexado_cdi] = _derivadas_log_pos_fixados(
+                    taxas[indexado_cdi], dias_uteis, taxa_cdi_anual, data_inicio, curva_cdi
+                )
+    prefixadas = ~indexado_cdi
+    fatores[prefixadas] = np.power(1 + taxas[prefixadas] / 100, np.maximum(dias_corridos[prefixadas], 0) / 365)
+    if com_sensibilidades:
+        derivadas_taxa[prefixadas] = np.maximum(dias_corridos[prefixadas], 0) / 365 / (100 + taxas[prefixadas])
+
+    rendimento_bruto = np.where(prazo_valido, valores_iniciais * (fatores - 1), 0.0)
+    tributos = calcular_tributos(rendimento_bruto, dias_corridos, isenta_ir)
+    rendimento_liquido = tributos['rendimento_liquido']
+    resultado = {
+        'valor_final_liquido': valores_iniciais + rendimento_liquido,
+        'rendimento_bruto': rendimento_bruto,
+        'rendimento_liquido': rendimento_liquido,
+        'aliquota_ir': np.where(prazo_valido, tributos['aliquota_ir'], 0.0),
+        'imposto_renda': tributos['imposto_renda'],
+        'iof': tributos['iof']
+    }
+    if com_sensibilidades:
+        fracoes_liquidas = np.where(prazo_valido, fracao_liquida(dias_corridos, isenta_ir), 0.0)
+        derivada_fator_liquido = fracoes_liquidas * fatores
+        resultado['sensibilidade_cdi'] = valores_iniciais * derivada_fator_liquido * derivadas_cdi
+        resultado['sensibilidade_taxa'] = valores_iniciais * derivada_fator_liquido * derivadas_taxa
+        resultado['sensibilidade_valor'] = 1 + (fatores - 1) * fracoes_liquidas
+    colunas_zeradas = COLUNAS_RESULTADO + (COLUNAS_SENSIBILIDADE if com_sensibilidades else [])
+    if curva_cdi is None and taxa_cdi_anual <= -100:
+        for coluna in colunas_zeradas:
+            resultado[coluna] = np.where(indexado_cdi, 0.0, resultado[coluna])
+    return resultado
+
+def calcular_carteira(carteira, valor_inicial, taxa_cdi_anual, dias_corridos=None, curva_cdi=None, com_sensibilidades=False):
+    """
+    Resultado de todas as ofertas da carteira no vencimento de cada uma ou, se dias_corridos
+    for informado, todas no mesmo prazo (comparação equivalente). Inclui 'dias_uteis' e,
+    com com_sensibilidades, as colunas de COLUNAS_SENSIBILIDADE.
+    """
+    if dias_corridos is None:
+        dias_corridos = carteira['dias_corridos']
+    else:
+        dias_corridos = np.full(len(carteira['nomes']), dias_corridos, dtype=np.int64)
+    resultado = calcular_ofertas(
+        valor_inicial, carteira['tipos'], carteira['taxas'], dias_corridos,
+        taxa_cdi_anual, carteira['data_inicio'], curva_cdi, com_sensibilidades
+    )
+    resultado['dias_corridos'] = dias_corridos
+    resultado['dias_uteis'] = dias_uteis_no_prazo(carteira['data_inicio'], np.maximum(dias_corridos, 0))
+    return resultado
+
+def fatores_acumulados(indexado_cdi, taxas, dias, taxa_cdi_anual, data_inicio, curva_cdi=None):
+    """
+    Matriz ofertas x dias com o fator bruto acumulado de cada oferta desde data_inicio
+    até cada um dos dias corridos informados (eixo compartilhado por todas as ofertas).
+    """
+    fatores = np.ones((len(taxas), len(dias)))
+    if indexado_cdi.any():
+        dias_uteis = np.broadcast_to(dias_uteis_no_prazo(data_inicio, dias), (int(indexado_cdi.sum()), len(dias)))
+        fatores[indexado_cdi] = _fatores_pos_fixados(taxas[indexado_cdi], dias_uteis, taxa_cdi_anual, data_inicio, curva_cdi)
+        if curva_cdi is None and taxa_cdi_anual <= -100:
+            fatores[indexado_cdi] = 0.0
+    prefixadas = ~indexado_cdi
+    fatores[prefixadas] = np.power(1 + taxas[prefixadas, None] / 100, dias[None, :] / 365)
+    return fatores
+
+def calcular_evolucao_carteira(carteira, valor_inicial, taxa_cdi_anual, curva_cdi=None):
+    """
+    Evolução diária de todas as ofertas sobre um eixo de datas compartilhado, em uma passada.
+    Retorna 'dias' (linha inicial do dia 0 seguida de um ponto por dia até o maior vencimento)
+    e matrizes ofertas x dias 'valor_bruto', 'aliquota_ir', 'imposto_renda', 'iof' e 'valor_liquido'.
+    Depois do vencimento de cada oferta os valores continuam a ser projetados; use
+    evolucoes_por_oferta para obter cada série só até o vencimento.
+    """
+    total_dias = int(carteira['dias_corridos'].max(initial=0))
+    dias = np.concatenate(([0], np.arange(0, total_dias + 1))).astype(np.int32)
+    fatores = fatores_acumulados(
+        carteira['indexado_cdi'], carteira['taxas'], dias, taxa_cdi_anual, carteira['data_inicio'], curva_cdi
+    )
+
+    valor_bruto = valor_inicial * fatores
+    rendimento_bruto = valor_bruto - valor_inicial
+    tributos = calcular_tributos(rendimento_bruto, dias[None, :], carteira['isenta_ir'][:, None])
+    # Como nas funções escalares, sem dia útil decorrido uma pós-fixada não tem alíquota de IR
+    sem_dias_uteis = carteira['indexado_cdi'][:, None] & (dias_uteis_no_prazo(carteira['data_inicio'], dias)[None, :] <= 0)
+    aliquota_ir = np.where((dias[None, :] <= 0) | sem_dias_uteis, 0.0, tributos['aliquota_ir'])
+    imposto_renda = tributos['imposto_renda']
+    iof = tributos['iof']
+    valor_liquido = valor_inicial + tributos['rendimento_liquido']
+    if curva_cdi is None and taxa_cdi_anual <= -100:
+        # Mesmo comportamento de calcular_rendimento_pos_fixado: pós-fixadas zeradas, exceto a linha inicial
+        for matriz in (valor_bruto, aliquota_ir, imposto_renda, iof, valor_liquido):
+            matriz[carteira['indexado_cdi'], 1:] = 0
+
+    # A linha inicial representa apenas o valor aplicado
+    valor_bruto[:, 0] = valor_inicial
+    imposto_renda[:, 0] = 0
+    iof[:, 0] = 0
+    valor_liquido[:, 0] = valor_inicial
+    return {
+        'dias': dias,
+        'valor_bruto': valor_bruto,
+        'aliquota_ir': aliquota_ir,
+        'imposto_renda': imposto_renda,
+        'iof': iof,
+        'valor_liquido': valor_liquido
+    }
+
+def evolucoes_por_oferta(evolucao_carteira, carteira):
+    """
+    Separa a evolução da carteira em {nome: evolução colunar} (visões, sem cópia), cada
+    uma até o vencimento da oferta, no formato de calculations.calcular_evolucao_pos_fixada.
+    """
+    evolucoes = {}
+    for indice, (nome, dias_corridos) in enumerate(zip(carteira['nomes'], carteira['dias_corridos'].tolist())):
+        fim = max(dias_corridos, 0) + 2
+        evolucoes[nome] = {'dias': evolucao_carteira['dias'][:fim]}
+        for coluna in ('valor_bruto', 'aliquota_ir', 'imposto_renda', 'iof', 'valor_liquido'):
+            evolucoes[nome][coluna] = evolucao_carteira[coluna][indice, :fim]
+    return evolucoes
@@ -0,0 +1,3 @@
+# conftest.py
+# Os módulos do app ficam na raiz do repositório, sem pacote: este arquivo marca a raiz para o
+# pytest, que a coloca no sys.path e deixa os testes de tests/ importarem os módulos direto.
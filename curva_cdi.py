@@ -0,0 +1,151 @@
+# curva_cdi.py
+import csv
+import hashlib
+import io
+from datetime import date, datetime
+
+import numpy as np
+
+from calendario import proximos_dias_uteis
+
+INTERPOLACOES = ('degrau', 'linear')
+
+def _converter_data(texto):
+    """
+    Aceita datas no formato AAAA-MM-DD ou DD/MM/AAAA.
+    """
+    texto = texto.strip()
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida na curva de CDI: '{texto}' (use AAAA-MM-DD ou DD/MM/AAAA).")
+
+def _converter_taxa(texto):
+    """
+    Aceita taxas com ponto ou vírgula decimal (ex.: 14.65 ou 14,65).
+    """
+    try:
+        taxa = float(str(texto).strip().replace(',', '.'))
+    except ValueError:
+        taxa = float('nan')
+    if texto is None or not np.isfinite(taxa):
+        raise ValueError(f"Taxa inválida na curva de CDI: '{texto or ''}' (use um número, ex.: 14.65 ou 14,65).")
+    return taxa
+
+def montar_curva_cdi(datas, taxas_cdi_anual, interpolacao='degrau'):
+    """
+    Monta uma curva de CDI a partir de vértices (data, taxa anual em %).
+    Com interpolação 'degrau', cada taxa vale da sua data até o vértice seguinte
+    (cronograma por período); com 'linear', interpola entre os vértices (curva a termo).
+    Fora do intervalo, as taxas das pontas são mantidas constantes.
+    """
+    if interpolacao not in INTERPOLACOES:
+        raise ValueError(f"Interpolação desconhecida: '{interpolacao}' (use {', '.join(INTERPOLACOES)}).")
+    if len(datas) == 0:
+        raise ValueError("A curva de CDI precisa de pelo menos um vértice.")
+    datas = np.array(datas, dtype='datetime64[D]')
+    taxas_cdi_anual = np.asarray(taxas_cdi_anual, dtype=float)
+    if np.any(taxas_cdi_anual <= -100):
+        raise ValueError("A curva de CDI não pode ter taxas menores ou iguais a -100%.")
+    ordem = np.argsort(datas, kind='stable')
+    datas, taxas_cdi_anual = datas[ordem], taxas_cdi_anual[ordem]
+    if np.any(np.diff(datas.astype(np.int64)) == 0):
+        raise ValueError("A curva de CDI tem datas repetidas.")
+
+    identificador = hashlib.sha1(
+        datas.tobytes() + taxas_cdi_anual.tobytes() + interpolacao.encode()
+    ).hexdigest()[:16]
+    datas.setflags(write=False)
+    taxas_cdi_anual.setflags(write=False)
+    return {
+        'datas': datas,
+        'taxas_cdi_anual': taxas_cdi_anual,
+        'interpolacao': interpolacao,
+        'identificador': identificador
+    }
+
+def carregar_curva_cdi(arquivo, interpolacao='degrau'):
+    """
+    Lê uma curva de CDI de um CSV local (caminho ou arquivo aberto/enviado) com as
+    colunas 'data' e 'taxa_cdi_anual'. Separador vírgula, ponto e vírgula ou tabulação
+    (sem nenhum deles no cabeçalho, vale a vírgula). Levanta ValueError se o arquivo for inválido.
+    """
+    if isinstance(arquivo, str):
+        with open(arquivo, encoding='utf-8-sig') as arquivo_aberto:
+            conteudo = arquivo_aberto.read()
+    else:
+        conteudo = arquivo.read()
+        if isinstance(conteudo, bytes):
+            conteudo = conteudo.decode('utf-8-sig')
+
+    try:
+        dialeto = csv.Sniffer().sniff(conteudo.splitlines()[0] if conteudo.strip() else ',', delimiters=',;\t')
+    except csv.Error:
+        # Cabeçalho sem separador (ex.: só a coluna 'data'): a checagem das colunas abaixo explica o erro
+        dialeto = csv.excel
+    leitor = csv.DictReader(io.StringIO(conteudo), dialect=dialeto)
+    if not leitor.fieldnames or not {'data', 'taxa_cdi_anual'} <= {campo.strip() for campo in leitor.fieldnames}:
+        raise ValueError("O CSV da curva de CDI precisa das colunas 'data' e 'taxa_cdi_anual'.")
+
+    datas, taxas = [], []
+    for linha in leitor:
+        # Campos além do cabeçalho ficam na chave None e são ignorados
+        linha = {chave.strip(): valor for chave, valor in linha.items() if chave is not None}
+        if not (linha.get('data') or '').strip():
+            continue
+        datas.append(_converter_data(linha['data']))
+        taxas.append(_converter_taxa(linha['taxa_cdi_anual']))
+    return montar_curva_cdi(datas, taxas, interpolacao)
+
+def curva_cdi_constante(taxa_cdi_anual, data_referencia=None):
+    """
+    Curva com uma única taxa (equivale ao CDI constante usado no restante do app).
+    """
+    return montar_curva_cdi([data_referencia or date.today()], [taxa_cdi_anual])
+
+def taxas_cdi_por_dia_util(curva_cdi, data_inicio, total_dias_uteis):
+    """
+    Taxa anual do CDI (%) vigente em cada um dos total_dias_uteis dias úteis após data_inicio.
+    """
+    datas = proximos_dias_uteis(data_inicio, total_dias_uteis)
+    if curva_cdi['interpolacao'] == 'linear':
+        return np.interp(
+            datas.astype(np.int64), curva_cdi['datas'].astype(np.int64), curva_cdi['taxas_cdi_anual']
+        )
+    indices = np.searchsorted(curva_cdi['datas'], datas, side='right') - 1
+    return curva_cdi['taxas_cdi_anual'][np.clip(indices, 0, None)]
+
+def taxas_cdi_diarias(taxas_cdi_anual):
+    """
+    Converte taxas anuais do CDI (%) em taxas diárias (decimais), base 252 dias úteis.
+    """
+    return np.expm1(np.log1p(np.asarray(taxas_cdi_anual, dtype=float) / 100) / 252)
+
+def acumular_fatores_cdi(taxas_diarias, taxa_aplicacao_cdi):
+    """
+    Núcleo de acúmulo: produto acumulado, ao longo do primeiro eixo (dias úteis), dos fatores
+    diários (1 + %CDI x CDI diário). Aceita um vetor de taxas diárias (ver taxas_cdi_diarias)
+    ou uma matriz dias x trajetórias; taxa_aplicacao_cdi pode ser um array combinável
+    por broadcasting (ex.: taxas[:, None] x percentuais[None, :]). O elemento i é o fator após i dias úteis (o elemento 0
+    vale 1), então qualquer vencimento ou dia da evolução é respondido por indexação.
+    """
+    taxas_aplicacao_cdi = np.asarray(taxa_aplicacao_cdi, dtype=float) / 100
+    formato = np.broadcast_shapes(np.shape(taxas_diarias), taxas_aplicacao_cdi.shape)
+    fatores = np.empty((formato[0] + 1,) + formato[1:])
+    fatores[0] = 1.0
+    np.multiply(taxas_diarias, taxas_aplicacao_cdi, out=fatores[1:])
+    fatores[1:] += 1
+    np.cumprod(fatores[1:], axis=0, out=fatores[1:])
+    return fatores
+
+def fatores_acumulados_cdi(curva_cdi, data_inicio, taxa_aplicacao_cdi, total_dias_uteis):
+    """
+    Fatores acumulados (ver acumular_fatores_cdi) da curva para os total_dias_uteis
+    dias úteis após data_inicio, calculados uma única vez.
+    """
+    total_dias_uteis = max(int(total_dias_uteis), 0)
+    return acumular_fatores_cdi(
+        taxas_cdi_diarias(taxas_cdi_por_dia_util(curva_cdi, data_inicio, total_dias_uteis)), taxa_aplicacao_cdi
+    )
@@ -0,0 +1,101 @@
+# equivalencia.py
+import numpy as np
+
+from calculations import calcular_grade_pos_fixada
+from calendario import dias_uteis_no_prazo
+from tributacao import fracao_liquida
+
+# Intervalo de busca (em % a.a.) para o CDI de equilíbrio
+CDI_MINIMO_BUSCA = 0.01
+CDI_MAXIMO_BUSCA = 100.0
+ITERACOES_BISSECAO = 60
+
+def _fator_isenta(taxa_isenta_cdi, dias_uteis, taxa_cdi_anual):
+    """
+    Fator de valor final (por R$ 1,00) de uma aplicação pós-fixada isenta.
+    """
+    taxa_cdi_diaria = (1 + np.asarray(taxa_cdi_anual, dtype=float) / 100)**(1/252) - 1
+    return (1 + np.asarray(taxa_isenta_cdi, dtype=float) / 100 * taxa_cdi_diaria)**dias_uteis
+
+def taxa_tributada_equivalente(taxa_isenta_cdi, prazos_dias_corridos, taxa_cdi_anual, data_inicio):
+    """
+    Taxa (% do CDI) que uma aplicação pós-fixada tributada precisa pagar para empatar,
+    no mesmo prazo, com a aplicação isenta informada. Vetorizada nos prazos (e nas taxas).
+    Como as alíquotas (IOF e IR) são fixas para cada prazo, a solução é fechada:
+    (1 + p_t * d)^du = 1 + (F_isenta - 1) / fração líquida.
+    """
+    prazos_dias_corridos = np.asarray(prazos_dias_corridos)
+    dias_uteis = dias_uteis_no_prazo(data_inicio, prazos_dias_corridos)
+    fracao_liquida_prazo = fracao_liquida(prazos_dias_corridos)
+    taxa_cdi_diaria = (1 + taxa_cdi_anual / 100)**(1/252) - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fator_bruto_necessario = 1 + (_fator_isenta(taxa_isenta_cdi, dias_uteis, taxa_cdi_anual) - 1) / fracao_liquida_prazo
+        taxa_diaria_necessaria = fator_bruto_necessario**(1 / dias_uteis) - 1
+        taxa_equivalente = taxa_diaria_necessaria / taxa_cdi_diaria * 100
+    return np.where(dias_uteis > 0, taxa_equivalente, np.nan)
+
+def taxa_prefixada_equivalente(taxa_isenta_cdi, prazos_dias_corridos, taxa_cdi_anual, data_inicio):
+    """
+    Taxa pré-fixada (% a.a.) que empata, no mesmo prazo, com a aplicação isenta informada.
+    Solução fechada: (1 + r)^(dc/365) = 1 + (F_isenta - 1) / fração líquida.
+    """
+    prazos_dias_corridos = np.asarray(prazos_dias_corridos)
+    dias_uteis = dias_uteis_no_prazo(data_inicio, prazos_dias_corridos)
+    fracao_liquida_prazo = fracao_liquida(prazos_dias_corridos)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fator_bruto_necessario = 1 + (_fator_isenta(taxa_isenta_cdi, dias_uteis, taxa_cdi_anual) - 1) / fracao_liquida_prazo
+        taxa_equivalente = (fator_bruto_necessario**(365 / prazos_dias_corridos) - 1) * 100
+    return np.where(prazos_dias_corridos > 0, taxa_equivalente, np.nan)
+
+def cdi_equilibrio_prefixada(taxa_isenta_cdi, taxa_prefixada_anual, prazos_dias_corridos, data_inicio):
+    """
+    CDI anual (%) a partir do qual a aplicação isenta supera a pré-fixada no mesmo prazo.
+    Solução fechada: o fator líquido da pré-fixada define a taxa diária que a isenta precisa.
+    """
+    prazos_dias_corridos = np.asarray(prazos_dias_corridos)
+    dias_uteis = dias_uteis_no_prazo(data_inicio, prazos_dias_corridos)
+    fracao_liquida_prazo = fracao_liquida(prazos_dias_corridos)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fator_bruto_prefixada = (1 + taxa_prefixada_anual / 100)**(prazos_dias_corridos / 365)
+        fator_liquido_prefixada = 1 + (fator_bruto_prefixada - 1) * fracao_liquida_prazo
+        taxa_isenta_diaria = fator_liquido_prefixada**(1 / dias_uteis) - 1
+        taxa_cdi_diaria = taxa_isenta_diaria / (np.asarray(taxa_isenta_cdi, dtype=float) / 100)
+        cdi_equilibrio = ((1 + taxa_cdi_diaria)**252 - 1) * 100
+    return np.where(dias_uteis > 0, cdi_equilibrio, np.nan)
+
+def cdi_equilibrio_tributada(taxa_isenta_cdi, taxa_tributada_cdi, prazos_dias_corridos, data_inicio):
+    """
+    CDI anual (%) em que a aplicação isenta e a tributada empatam no mesmo prazo.
+    Não há solução fechada (as duas pernas dependem do CDI), então usa bisseção
+    vetorizada sobre todos os prazos de uma vez, com calcular_grade_pos_fixada.
+    Retorna NaN nos prazos em que não há troca de vencedor no intervalo de busca.
+    """
+    prazos_dias_corridos = np.asarray(prazos_dias_corridos)
+    dias_uteis = dias_uteis_no_prazo(data_inicio, prazos_dias_corridos)
+
+    def diferenca(taxa_cdi_anual):
+        isenta = calcular_grade_pos_fixada(1.0, taxa_isenta_cdi, dias_uteis, taxa_cdi_anual, isenta_ir=True)
+        tributada = calcular_grade_pos_fixada(
+            1.0, taxa_tributada_cdi, dias_uteis, taxa_cdi_anual,
+            isenta_ir=False, prazo_dias_corridos_para_ir=prazos_dias_corridos
+        )
+        return isenta['valor_final_liquido'] - tributada['valor_final_liquido']
+
+    formato = np.broadcast(np.asarray(taxa_isenta_cdi), np.asarray(taxa_tributada_cdi), prazos_dias_corridos).shape
+    cdi_minimo = np.full(formato, CDI_MINIMO_BUSCA)
+    cdi_maximo = np.full(formato, CDI_MAXIMO_BUSCA)
+    diferenca_minimo = diferenca(cdi_minimo)
+    tem_raiz = np.sign(diferenca_minimo) != np.sign(diferenca(cdi_maximo))
+
+    for _ in range(ITERACOES_BISSECAO):
+        cdi_medio = (cdi_minimo + cdi_maximo) / 2
+        diferenca_medio = diferenca(cdi_medio)
+        mesmo_sinal = np.sign(diferenca_medio) == np.sign(diferenca_minimo)
+        cdi_minimo = np.where(mesmo_sinal, cdi_medio, cdi_minimo)
+        diferenca_minimo = np.where(mesmo_sinal, diferenca_medio, diferenca_minimo)
+        cdi_maximo = np.where(mesmo_sinal, cdi_maximo, cdi_medio)
+
+    return np.where(tem_raiz & (dias_uteis > 0), (cdi_minimo + cdi_maximo) / 2, np.nan)
@@ -0,0 +1,196 @@
+# exportacao.py
+# Exportação em massa (CSV ou Parquet) da evolução diária e do resumo de cada aplicação,
+# para um ou vários cenários. Os arquivos são escritos em blocos de linhas tirados direto
+# das matrizes colunares (fatias, sem lista de dicionários nem DataFrame intermediário),
+# então a memória não cresce com o horizonte nem com o número de cenários.
+import io
+
+import numpy as np
+
+from calendario import dias_uteis_no_prazo
+from carteira import COLUNAS_RESULTADO, calcular_evolucao_carteira
+from reinvestimento import COLUNAS_EVOLUCAO, calcular_evolucao_reinvestida
+
+FORMATOS_EXPORTACAO = {
+    'csv': {'extensao': 'csv', 'mime': 'text/csv'},
+    'parquet': {'extensao': 'parquet', 'mime': 'application/vnd.apache.parquet'}
+}
+# Linhas por bloco escrito: limita a memória da exportação (e o tamanho dos row groups do Parquet)
+LINHAS_POR_BLOCO = 65_536
+
+def cenario_da_carteira(rotulo, carteira, valor_inicial, taxa_cdi_anual, curva_cdi=None, reinvestimento=None, calcular_evolucao=calcular_evolucao_carteira):
+    """
+    Monta um cenário exportável: a evolução diária de todas as ofertas da carteira.
+    reinvestimento segue o formato de ui_elements.render_reinvestment_controls (None: cada
+    oferta até o seu vencimento; senão, todas reaplicadas até o vencimento mais longo).
+    O padrão de calcular_evolucao não passa pelo cache (numa exportação em massa, guardar
+    cada cenário no cache manteria todos em memória); o app usa a versão de cache_calculos.
+    """
+    if reinvestimento is None:
+        evolucao = calcular_evolucao(carteira, valor_inicial, taxa_cdi_anual, curva_cdi)
+        fins = carteira['dias_corridos']
+    else:
+        reaplicacao = None if reinvestimento['mesmas_condicoes'] else reinvestimento
+        evolucao = calcular_evolucao_reinvestida(carteira, valor_inicial, taxa_cdi_anual, reaplicacao, curva_cdi)
+        fins = np.full(len(carteira['nomes']), evolucao['dias'][-1])
+    return {
+        'rotulo': rotulo,
+        'data_inicio': carteira['data_inicio'],
+        'nomes': carteira['nomes'],
+        'tipos': carteira['tipos'],
+        'taxas': carteira['taxas'],
+        'evolucao': evolucao,
+        'fins': np.maximum(fins, 0)
+    }
+
+def _esquemas():
+    import pyarrow as pa
+
+    rotulo = pa.dictionary(pa.int32(), pa.string())
+    evolucao = pa.schema(
+        [('cenario', rotulo), ('data', pa.date32()), ('aplicacao', rotulo)]
+        + [(coluna, pa.float64()) for coluna in COLUNAS_EVOLUCAO]
+    )
+    resumo = pa.schema(
+        [('cenario', rotulo), ('aplicacao', pa.string()), ('tipo', pa.string()), ('taxa', pa.float64()),
+         ('data_vencimento', pa.date32()), ('dias_corridos', pa.int64()), ('dias_uteis', pa.int64())]
+        + [(coluna, pa.float64()) for coluna in COLUNAS_RESULTADO]
+    )
+    return evolucao, resumo
+
+def _rotulo_repetido(pa, rotulo, quantidade):
+    """
+    Coluna com o mesmo texto em todas as linhas, codificada como dicionário (sem repetir a string).
+    """
+    return pa.DictionaryArray.from_arrays(np.zeros(quantidade, dtype=np.int32), pa.array([rotulo], pa.string()))
+
+def blocos_evolucao(cenario, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera a evolução diária de um cenário em pyarrow.RecordBatch de até linhas_por_bloco linhas
+    (colunas 'cenario', 'data', 'aplicacao' e COLUNAS_EVOLUCAO), oferta a oferta, do dia 0 ao
+    vencimento (ou ao horizonte, com reinvestimento). A linha inicial repetida das evoluções
+    (o valor aplicado, ver carteira.calcular_evolucao_carteira) não é exportada.
+    As colunas numéricas são fatias das matrizes da evolução, sem cópia.
+    """
+    import pyarrow as pa
+
+    esquema, _ = _esquemas()
+    evolucao = cenario['evolucao']
+    datas = np.datetime64(cenario['data_inicio'], 'D') + evolucao['dias']
+    for indice, (nome, fim) in enumerate(zip(cenario['nomes'], cenario['fins'].tolist())):
+        # Colunas 1..fim+1: do dia 0 ao último dia, sem a linha inicial repetida
+        for inicio in range(1, fim + 2, linhas_por_bloco):
+            fatia = slice(inicio, min(inicio + linhas_por_bloco, fim + 2))
+            quantidade = fatia.stop - fatia.start
+            yield pa.RecordBatch.from_arrays(
+                [
+                    _rotulo_repetido(pa, cenario['rotulo'], quantidade),
+                    pa.array(datas[fatia], pa.date32()),
+                    _rotulo_repetido(pa, nome, quantidade)
+                ] + [pa.array(evolucao[coluna][indice, fatia]) for coluna in COLUNAS_EVOLUCAO],
+                schema=esquema
+            )
+
+def bloco_resumo(cenario):
+    """
+    Resumo de um cenário num pyarrow.RecordBatch (uma linha por aplicação): o resultado no
+    último dia de cada oferta, lido das mesmas matrizes da evolução, com as colunas de
+    carteira.COLUNAS_RESULTADO.
+    """
+    import pyarrow as pa
+
+    _, esquema = _esquemas()
+    evolucao = cenario['evolucao']
+    linhas = np.arange(len(cenario['nomes']))
+    colunas = cenario['fins'] + 1
+    valor_inicial = evolucao['valor_liquido'][:, 0]
+    valor_bruto = evolucao['valor_bruto'][linhas, colunas]
+    valor_liquido = evolucao['valor_liquido'][linhas, colunas]
+    resultado = {
+        'valor_final_liquido': valor_liquido,
+        'rendimento_bruto': valor_bruto - valor_inicial,
+        'rendimento_liquido': valor_liquido - valor_inicial,
+        'aliquota_ir': evolucao['aliquota_ir'][linhas, colunas],
+        'imposto_renda': evolucao['imposto_renda'][linhas, colunas],
+        'iof': evolucao['iof'][linhas, colunas]
+    }
+    return pa.RecordBatch.from_arrays(
+        [
+            _rotulo_repetido(pa, cenario['rotulo'], len(linhas)),
+            pa.array(cenario['nomes'], pa.string()),
+            pa.array(cenario['tipos'].tolist(), pa.string()),
+            pa.array(cenario['taxas']),
+            pa.array(np.datetime64(cenario['data_inicio'], 'D') + cenario['fins'], pa.date32()),
+            pa.array(cenario['fins'].astype(np.int64)),
+            pa.array(dias_uteis_no_prazo(cenario['data_inicio'], cenario['fins']).astype(np.int64))
+        ] + [pa.array(resultado[coluna]) for coluna in COLUNAS_RESULTADO],
+        schema=esquema
+    )
+
+class _Escritor:
+    """
+    Escritor incremental de RecordBatch num destino (caminho ou arquivo binário) em CSV ou Parquet.
+    """
+
+    def __init__(self, destino, esquema, formato):
+        import pyarrow as pa
+
+        self._esquema_texto = None
+        if formato == 'csv':
+            import pyarrow.csv as pa_csv
+            # O CSV não tem tipo dicionário: os rótulos viram texto bloco a bloco
+            self._esquema_texto = pa.schema([
+                campo.with_type(campo.type.value_type) if pa.types.is_dictionary(campo.type) else campo
+                for campo in esquema
+            ])
+            self._escritor = pa_csv.CSVWriter(destino, self._esquema_texto)
+        else:
+            import pyarrow.parquet as pq
+            self._escritor = pq.ParquetWriter(destino, esquema, compression='zstd')
+
+    def escrever(self, bloco):
+        if self._esquema_texto is not None:
+            bloco = bloco.cast(self._esquema_texto)
+        self._escritor.write_batch(bloco)
+
+    def fechar(self):
+        self._escritor.close()
+
+def exportar_cenarios(cenarios, destino_evolucao, destino_resumo=None, formato='csv', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Escreve a evolução diária (e, com destino_resumo, o resumo por aplicação) de vários
+    cenários, numa só passada. cenarios é um iterável de cenario_da_carteira; passe um
+    gerador para que só um cenário por vez fique em memória. Os destinos são caminhos ou
+    arquivos binários abertos. Retorna as quantidades de linhas e de blocos escritos.
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação inválido: '{formato}'. Use um de: {', '.join(FORMATOS_EXPORTACAO)}.")
+    esquema_evolucao, esquema_resumo = _esquemas()
+    escritor_evolucao = _Escritor(destino_evolucao, esquema_evolucao, formato)
+    escritor_resumo = None if destino_resumo is None else _Escritor(destino_resumo, esquema_resumo, formato)
+    totais = {'cenarios': 0, 'linhas_evolucao': 0, 'linhas_resumo': 0, 'blocos': 0}
+    try:
+        for cenario in cenarios:
+            for bloco in blocos_evolucao(cenario, linhas_por_bloco):
+                escritor_evolucao.escrever(bloco)
+                totais['linhas_evolucao'] += bloco.num_rows
+                totais['blocos'] += 1
+            if escritor_resumo is not None:
+                bloco = bloco_resumo(cenario)
+                escritor_resumo.escrever(bloco)
+                totais['linhas_resumo'] += bloco.num_rows
+            totais['cenarios'] += 1
+    finally:
+        escritor_evolucao.fechar()
+        if escritor_resumo is not None:
+            escritor_resumo.fechar()
+    return totais
+
+def exportar_para_bytes(cenarios, formato='csv', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Exporta os cenários para a memória (para um botão de download).
+    Retorna {'evolucao': bytes, 'resumo': bytes}.
+    """
+    evolucao, resumo = io.BytesIO(), io.BytesIO()
+    exportar_cenarios(cenarios, evolucao, resumo, formato, linhas_por_bloco)
+    return {'evolucao': evolucao.getvalue(), 'resumo': resumo.getvalue()}
@@ -0,0 +1,83 @@
+# incremental.py
+import numpy as np
+
+from amostragem import reduzir_evolucao
+from carteira import calcular_carteira, calcular_evolucao_carteira, evolucoes_por_oferta, selecionar_ofertas
+from resgate import series_de_resgate
+
+# Colunas guardadas por oferta (prazo total), com as sensibilidades de carteira.COLUNAS_SENSIBILIDADE
+COLUNAS_UNIDADE = (
+    'dias_corridos', 'dias_uteis', 'rendimento_bruto', 'aliquota_ir', 'imposto_renda',
+    'iof', 'valor_final_liquido', 'rendimento_liquido',
+    'sensibilidade_cdi', 'sensibilidade_taxa', 'sensibilidade_valor'
+)
+
+# Os armazenamentos são dicionários comuns (no app, guardados em st.session_state):
+# cada unidade de cálculo guarda a chave das entradas de que depende e o resultado.
+
+def reutilizar_ou_calcular(armazenamento, nome, chave, calcular):
+    """
+    Retorna o resultado guardado da unidade nome se a chave das entradas não mudou;
+    caso contrário, recalcula, guarda e retorna.
+    """
+    unidade = armazenamento.get(nome)
+    if unidade is not None and unidade['chave'] == chave:
+        return unidade['valor']
+    valor = calcular()
+    armazenamento[nome] = {'chave': chave, 'valor': valor}
+    return valor
+
+def _linhas_por_oferta(resultado, nomes_calculados):
+    """
+    Converte o resultado colunar de calcular_carteira em {nome: {coluna: valor}}.
+    """
+    colunas = {coluna: resultado[coluna].tolist() for coluna in COLUNAS_UNIDADE}
+    return {
+        nome: {coluna: colunas[coluna][posicao] for coluna in COLUNAS_UNIDADE}
+        for posicao, nome in enumerate(nomes_calculados)
+    }
+
+def atualizar_unidades(armazenamento, carteira_ofertas, valor_inicial, taxa_cdi_anual, curva_cdi=None, calcular=calcular_carteira, calcular_evolucao=calcular_evolucao_carteira):
+    """
+    Mantém uma unidade de cálculo por oferta em armazenamento ({nome: unidade}), com
+    'prazo_total', 'evolucao' (reduzida para o gráfico) e 'resgate' (séries diárias completas,
+    ver resgate.series_de_resgate). Todas dependem da própria oferta (tipo, taxa, vencimento)
+    e das entradas compartilhadas (data, valor, CDI e curva).
+    Só as unidades com entradas alteradas são recalculadas, todas numa única passada vetorizada;
+    as demais são servidas dos arrays guardados. Ofertas removidas são descartadas.
+    Retorna a lista de nomes recalculados.
+    """
+    nomes = carteira_ofertas['nomes']
+    for nome in [nome for nome in armazenamento if nome not in nomes]:
+        del armazenamento[nome]
+
+    compartilhadas = (
+        carteira_ofertas['data_inicio'], float(valor_inicial), float(taxa_cdi_anual),
+        None if curva_cdi is None else curva_cdi['identificador']
+    )
+    chaves = [
+        (tipo, taxa, dias) + compartilhadas
+        for tipo, taxa, dias in zip(
+            carteira_ofertas['tipos'].tolist(), carteira_ofertas['taxas'].tolist(), carteira_ofertas['dias_corridos'].tolist()
+        )
+    ]
+
+    desatualizadas = [
+        indice for indice, nome in enumerate(nomes)
+        if armazenamento.get(nome, {}).get('chave') != chaves[indice]
+    ]
+    if desatualizadas:
+        selecao = selecionar_ofertas(carteira_ofertas, desatualizadas)
+        linhas = _linhas_por_oferta(calcular(selecao, valor_inicial, taxa_cdi_anual, curva_cdi=curva_cdi, com_sensibilidades=True), selecao['nomes'])
+        evolucoes = evolucoes_por_oferta(calcular_evolucao(selecao, valor_inicial, taxa_cdi_anual, curva_cdi), selecao)
+        for indice, nome in zip(desatualizadas, selecao['nomes']):
+            evolucao_grafico = reduzir_evolucao(evolucoes[nome])
+            armazenamento[nome] = {
+                'chave': chaves[indice],
+                'prazo_total': linhas[nome],
+                # Cópias: não mantêm viva a matriz da carteira inteira
+                'evolucao': {coluna: np.array(evolucao_grafico[coluna]) for coluna in ('dias', 'valor_liquido')},
+                'resgate': series_de_resgate(evolucoes[nome])
+            }
+
+    return [nomes[indice] for indice in desatualizadas]
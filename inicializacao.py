@@ -0,0 +1,93 @@
+# inicializacao.py
+import importlib
+import threading
+from datetime import date
+
+# Módulos pesados que só são necessários depois do clique em "Comparar Aplicações".
+# O formulário de entrada não depende de nenhum deles.
+MODULOS_PESADOS = (
+    'numpy',
+    'pandas',
+    'plotly.express',
+    'calendario',
+    'calculations',
+    'carteira',
+    'cache_calculos',
+    'incremental',
+    'resgate',
+    'reinvestimento',
+    'equivalencia',
+    'amostragem',
+    'resultados',
+    'exportacao',
+)
+
+_trava = threading.Lock()
+_thread_aquecimento = None
+_modulos_importados = threading.Event()
+
+def _importar_modulos_pesados():
+    """
+    Importa os módulos pesados; falhas são ignoradas aqui e reaparecem no import real.
+    """
+    for nome_modulo in MODULOS_PESADOS:
+        try:
+            importlib.import_module(nome_modulo)
+        except Exception:
+            pass
+
+def _montar_pacote_padrao():
+    """
+    Monta e guarda no cache entre sessões (cache_resultados) o pacote de resultados das
+    entradas padrão do formulário, as que a maioria dos visitantes compara sem editar.
+    Falhas são ignoradas aqui: o clique no botão refaz o cálculo e as mostra.
+    """
+    try:
+        from cache_resultados import buscar_ou_montar_pacote, chave_entradas
+        from carteira import montar_carteira
+        from resultados import montar_analises, montar_pacote
+        from ui_elements import entradas_padrao
+
+        hoje = date.today()
+        valor_aplicar, ofertas, taxa_cdi_anual = entradas_padrao(hoje)
+        carteira_ofertas = montar_carteira(ofertas, hoje)
+        chave = chave_entradas(valor_aplicar, ofertas, taxa_cdi_anual, data_inicio=hoje)
+        buscar_ou_montar_pacote(chave, lambda: montar_pacote(carteira_ofertas, valor_aplicar, taxa_cdi_anual, None, {}, {}))
+        # O clique em "Comparar Aplicações" também busca as análises (mapa de cenários)
+        buscar_ou_montar_pacote(chave + ('analises',), lambda: montar_analises(carteira_ofertas, valor_aplicar, taxa_cdi_anual, None, {}))
+    except Exception:
+        pass
+
+def _aquecer():
+    """
+    Importa os módulos pesados e, em seguida, monta o pacote das entradas padrão.
+    """
+    try:
+        _importar_modulos_pesados()
+    finally:
+        _modulos_importados.set()
+    _montar_pacote_padrao()
+
+def aguardar_modulos_pesados():
+    """
+    Espera a thread de aquecimento terminar os imports (se ela foi disparada).
+    A trava de import do Python não basta: bibliotecas como o plotly consultam
+    sys.modules e podem encontrar o pandas ainda pela metade.
+    """
+    if _thread_aquecimento is not None:
+        _modulos_importados.wait()
+
+def aquecer_modulos_em_segundo_plano():
+    """
+    Dispara (uma única vez por processo) uma thread que importa os módulos pesados
+    e monta o pacote de resultados das entradas padrão, para que a primeira comparação
+    não pague esse custo. O clique no botão aguarda o que faltar (aguardar_modulos_pesados).
+    """
+    global _thread_aquecimento
+    with _trava:
+        if _thread_aquecimento is None:
+            _thread_aquecimento = threading.Thread(
+                target=_aquecer, name='aquecimento-imports', daemon=True
+            )
+            _thread_aquecimento.start()
+    return _thread_aquecimento
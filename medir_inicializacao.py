@@ -0,0 +1,82 @@
+# medir_inicializacao.py
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DIRETORIO_APP = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_APP = os.path.join(DIRETORIO_APP, 'app.py')
+
+# Orçamento padrão (ms) para os imports de nível de módulo do app.py
+ORCAMENTO_PADRAO_MS = float(os.environ.get('ORCAMENTO_INICIALIZACAO_MS', 1500))
+
+# Módulos que não podem ser carregados antes do clique em "Comparar Aplicações"
+MODULOS_PROIBIDOS_NA_INICIALIZACAO = ('pandas', 'plotly.express')
+
+def imports_de_nivel_de_modulo(caminho_app=CAMINHO_APP):
+    """
+    Extrai do app.py apenas os imports executados ao carregar a página
+    (os que estão diretamente no corpo do módulo, fora de blocos condicionais).
+    """
+    with open(caminho_app, encoding='utf-8') as arquivo:
+        arvore = ast.parse(arquivo.read())
+    return [
+        ast.unparse(no) for no in arvore.body
+        if isinstance(no, (ast.Import, ast.ImportFrom))
+    ]
+
+def medir_uma_vez(imports):
+    """
+    Executa os imports num interpretador novo e retorna o tempo (ms) e os módulos proibidos carregados.
+    """
+    script = "\n".join([
+        "import json, sys, time",
+        "inicio = time.perf_counter()",
+        *imports,
+        "tempo_ms = (time.perf_counter() - inicio) * 1000",
+        f"proibidos = [m for m in {list(MODULOS_PROIBIDOS_NA_INICIALIZACAO)!r} if m in sys.modules]",
+        "print(json.dumps({'tempo_ms': tempo_ms, 'proibidos': proibidos}))",
+    ])
+    resultado = subprocess.run(
+        [sys.executable, '-c', script], cwd=DIRETORIO_APP, capture_output=True, text=True, check=True
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+def medir_inicializacao(repeticoes=5, caminho_app=CAMINHO_APP):
+    """
+    Mede o tempo de import da página (mediana de várias execuções a frio).
+    """
+    imports = imports_de_nivel_de_modulo(caminho_app)
+    medicoes = [medir_uma_vez(imports) for _ in range(repeticoes)]
+    return {
+        'imports': imports,
+        'tempos_ms': [medicao['tempo_ms'] for medicao in medicoes],
+        'mediana_ms': statistics.median(medicao['tempo_ms'] for medicao in medicoes),
+        'modulos_proibidos': sorted({modulo for medicao in medicoes for modulo in medicao['proibidos']})
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização (imports) do app e falha se passar do orçamento.")
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_PADRAO_MS, help="Tempo máximo permitido, em ms (padrão: %(default)s ou ORCAMENTO_INICIALIZACAO_MS)")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções a frio (usa a mediana)")
+    parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    resultado = medir_inicializacao(args.repeticoes)
+    resultado['orcamento_ms'] = args.orcamento_ms
+    resultado['aprovado'] = resultado['mediana_ms'] <= args.orcamento_ms and not resultado['modulos_proibidos']
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        print(f"Imports da página: mediana de {resultado['mediana_ms']:.0f} ms (orçamento: {args.orcamento_ms:.0f} ms)")
+        if resultado['modulos_proibidos']:
+            print(f"Módulos pesados carregados na inicialização: {', '.join(resultado['modulos_proibidos'])}")
+        print("OK" if resultado['aprovado'] else "FALHOU")
+    return 0 if resultado['aprovado'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
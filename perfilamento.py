@@ -0,0 +1,159 @@
+# perfilamento.py
+import cProfile
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+# Linhas de log em JSON (uma por etapa). Handler, formato e nível ficam com a configuração
+# de logging do processo hospedeiro (ex.: logging.basicConfig(level=logging.INFO)).
+logger = logging.getLogger('comparador.perfilamento')
+
+# O Streamlit executa o script de cada sessão numa thread própria:
+# as medições da execução atual ficam em armazenamento local da thread.
+_estado = threading.local()
+
+# O tracemalloc é global ao processo: cada sessão medindo memória conta uma referência, e
+# só a última a terminar desliga o rastreamento (e só se foi este módulo que o ligou)
+_trava_memoria = threading.Lock()
+_sessoes_medindo_memoria = 0
+_tracemalloc_ligado_aqui = False
+
+def _reservar_memoria():
+    """
+    Conta mais uma sessão medindo memória, ligando o tracemalloc se for a primeira.
+    """
+    global _sessoes_medindo_memoria, _tracemalloc_ligado_aqui
+    with _trava_memoria:
+        if _sessoes_medindo_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_ligado_aqui = True
+        _sessoes_medindo_memoria += 1
+
+def _liberar_memoria():
+    """
+    Devolve a referência de uma sessão; a última desliga o tracemalloc que este módulo ligou.
+    """
+    global _sessoes_medindo_memoria, _tracemalloc_ligado_aqui
+    with _trava_memoria:
+        _sessoes_medindo_memoria -= 1
+        if _sessoes_medindo_memoria == 0 and _tracemalloc_ligado_aqui:
+            tracemalloc.stop()
+            _tracemalloc_ligado_aqui = False
+
+def iniciar_medicao(medir_memoria=False, gerar_cprofile=False, medir_figuras=False):
+    """
+    Inicia a coleta de medições da execução (rerun) atual.
+    Com medir_memoria=True, liga o tracemalloc (mais lento; use só no modo diagnóstico), que
+    fica ligado enquanto alguma sessão estiver medindo. Como ele é global ao processo, a
+    memória alocada por sessões simultâneas se mistura.
+    Com gerar_cprofile=True, a execução inteira também roda sob cProfile.
+    Com medir_figuras=True, as figuras montadas também são serializadas para medir o tamanho
+    do JSON enviado ao navegador (ver medindo_figuras).
+    """
+    # Uma execução interrompida (ex.: rerun do Streamlit) não chega a finalizar_medicao:
+    # a referência que ela deixou é devolvida aqui, na mesma thread
+    if getattr(_estado, 'medir_memoria', False):
+        _liberar_memoria()
+    if medir_memoria:
+        _reservar_memoria()
+    _estado.medicoes = []
+    _estado.medir_memoria = medir_memoria
+    _estado.medir_figuras = medir_figuras
+    _estado.id_execucao = uuid.uuid4().hex[:12]
+    _estado.perfil = None
+    if gerar_cprofile:
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+            _estado.perfil = perfil
+        except ValueError:
+            # Outro perfilador já está ativo no processo (ex.: outra sessão perfilando)
+            logger.warning(json.dumps({'evento': 'cprofile_indisponivel', 'execucao': _estado.id_execucao}))
+    return _estado.id_execucao
+
+def medindo_figuras():
+    """
+    Indica se a execução atual pediu a medição do tamanho das figuras (serialização extra).
+    """
+    return getattr(_estado, 'medicoes', None) is not None and getattr(_estado, 'medir_figuras', False)
+
+def medicoes_atuais():
+    """
+    Retorna as medições registradas na execução atual (lista de dicionários).
+    """
+    return list(getattr(_estado, 'medicoes', None) or [])
+
+def finalizar_medicao():
+    """
+    Encerra a coleta, devolvendo a referência ao tracemalloc (desligado quando nenhuma outra
+    sessão está medindo memória) e desligando o cProfile se foi ligado.
+    Retorna as medições e o caminho do arquivo pstats gravado (ou None).
+    """
+    medicoes = medicoes_atuais()
+    if getattr(_estado, 'medir_memoria', False):
+        _liberar_memoria()
+
+    caminho_pstats = None
+    perfil = getattr(_estado, 'perfil', None)
+    if perfil is not None:
+        perfil.disable()
+        descritor, caminho_pstats = tempfile.mkstemp(prefix='comparador_', suffix='.pstats')
+        os.close(descritor)
+        perfil.dump_stats(caminho_pstats)
+
+    _estado.medicoes = None
+    _estado.medir_memoria = False
+    _estado.medir_figuras = False
+    _estado.perfil = None
+    return medicoes, caminho_pstats
+
+@contextmanager
+def medir_etapa(nome):
+    """
+    Mede o tempo de parede (e, se ativado, a memória alocada) de um bloco de código,
+    registrando o resultado na execução atual e numa linha de log em JSON.
+    Entrega um dicionário em que o bloco pode acrescentar campos à medição (ex.: tamanhos).
+    Fora de uma medição iniciada, apenas executa o bloco.
+    """
+    extras = {}
+    medicoes = getattr(_estado, 'medicoes', None)
+    if medicoes is None:
+        yield extras
+        return
+
+    medir_memoria = _estado.medir_memoria and tracemalloc.is_tracing()
+    if medir_memoria:
+        memoria_inicial, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    try:
+        yield extras
+    finally:
+        medicao = {
+            'etapa': nome,
+            'duracao_ms': round((time.perf_counter() - inicio) * 1000, 3),
+            **extras
+        }
+        if medir_memoria:
+            memoria_final, pico = tracemalloc.get_traced_memory()
+            medicao['memoria_alocada_kb'] = round((memoria_final - memoria_inicial) / 1024, 1)
+            medicao['pico_memoria_kb'] = round((pico - memoria_inicial) / 1024, 1)
+        medicoes.append(medicao)
+        logger.info(json.dumps({'evento': 'etapa', 'execucao': _estado.id_execucao, **medicao}, ensure_ascii=False))
+
+def etapa_medida(funcao):
+    """
+    Decorador que mede cada chamada da função como uma etapa com o nome dela.
+    """
+    @functools.wraps(funcao)
+    def funcao_medida(*args, **kwargs):
+        with medir_etapa(funcao.__name__):
+            return funcao(*args, **kwargs)
+    return funcao_medida
@@ -0,0 +1,223 @@
+# processar_ofertas.py
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from carteira import calcular_ofertas
+from produtos import TIPOS_PRODUTO, validar_tipo_produto
+
+COLUNAS_RESULTADO = [
+    'valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda', 'iof',
+    'rentabilidade_liquida_anual'
+]
+TAMANHO_LOTE_PADRAO = 50_000
+
+def _formato_arquivo(caminho):
+    """
+    Identifica o formato (csv ou jsonl) pela extensão do arquivo.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        return 'csv'
+    if extensao in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Formato de arquivo não suportado: '{caminho}' (use .csv ou .jsonl).")
+
+def ler_ofertas(caminho, tamanho_lote):
+    """
+    Lê o arquivo de ofertas em fluxo, entregando listas de no máximo tamanho_lote linhas.
+    """
+    formato = _formato_arquivo(caminho)
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        linhas = csv.DictReader(arquivo) if formato == 'csv' else (json.loads(linha) for linha in arquivo if linha.strip())
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+def _prazo_da_oferta(oferta, data_base):
+    """
+    Prazo em dias corridos: usa 'prazo_dias' ou, na falta dele, 'vencimento' (AAAA-MM-DD).
+    """
+    if oferta.get('prazo_dias') not in (None, ''):
+        return int(float(oferta['prazo_dias']))
+    return (date.fromisoformat(oferta['vencimento']) - data_base).days
+
+def calcular_lote(ofertas, taxa_cdi_anual, data_base, linha_inicial=1):
+    """
+    Calcula, de forma vetorizada, o resultado de um lote de ofertas.
+    Retorna um dicionário de arrays com as colunas de COLUNAS_RESULTADO.
+    """
+    tipos = np.array([
+        validar_tipo_produto(oferta.get('tipo'), f"Linha {numero_linha}")
+        for numero_linha, oferta in enumerate(ofertas, start=linha_inicial)
+    ], dtype=object)
+    taxas = np.array([float(oferta['taxa']) for oferta in ofertas])
+    valores = np.array([float(oferta['valor']) for oferta in ofertas])
+    prazos = np.array([_prazo_da_oferta(oferta, data_base) for oferta in ofertas])
+
+    resultado = calcular_ofertas(valores, tipos, taxas, prazos, taxa_cdi_anual, data_base)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rentabilidade = (resultado['valor_final_liquido'] / valores)**(365 / prazos) - 1
+    resultado['rentabilidade_liquida_anual'] = np.where(prazos > 0, rentabilidade * 100, np.nan)
+    return resultado
+
+def _finito_ou_vazio(valor):
+    """
+    Troca NaN e ±Infinity por None (null no JSONL, célula vazia no CSV): JSON estrito não
+    tem esses valores. Os demais valores passam sem alteração.
+    """
+    return None if isinstance(valor, float) and not math.isfinite(valor) else valor
+
+def _processar_lote(argumentos):
+    """
+    Ponto de entrada dos processos do pool: calcula o lote e devolve as linhas enriquecidas.
+    Resultados indefinidos (ex.: prazo inválido ou valor zero) saem vazios; o array de
+    rentabilidades devolvido mantém o NaN para o ranking.
+    """
+    ofertas, taxa_cdi_anual, data_base, linha_inicial = argumentos
+    resultado = calcular_lote(ofertas, taxa_cdi_anual, data_base, linha_inicial)
+    colunas = {coluna: resultado[coluna].tolist() for coluna in COLUNAS_RESULTADO}
+    for i, oferta in enumerate(ofertas):
+        for chave, valor in oferta.items():
+            oferta[chave] = _finito_ou_vazio(valor)
+        for coluna in COLUNAS_RESULTADO:
+            oferta[coluna] = _finito_ou_vazio(round(colunas[coluna][i], 6))
+    return ofertas, resultado['rentabilidade_liquida_anual']
+
+def _lotes_processados(caminho_entrada, taxa_cdi_anual, data_base, tamanho_lote, processos):
+    """
+    Processa os lotes em ordem. Com processos > 1, mantém no máximo 2 lotes por processo
+    em andamento, para que a memória continue limitada mesmo com arquivos muito grandes.
+    """
+    argumentos = (
+        (lote, taxa_cdi_anual, data_base, indice * tamanho_lote + 1)
+        for indice, lote in enumerate(ler_ofertas(caminho_entrada, tamanho_lote))
+    )
+    if processos <= 1:
+        for argumento in argumentos:
+            yield _processar_lote(argumento)
+        return
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        em_andamento = deque()
+        for argumento in argumentos:
+            em_andamento.append(executor.submit(_processar_lote, argumento))
+            if len(em_andamento) >= 2 * processos:
+                yield em_andamento.popleft().result()
+        while em_andamento:
+            yield em_andamento.popleft().result()
+
+def _escrever_linhas(arquivo, formato, linhas, escritor=None):
+    """
+    Escreve linhas no arquivo de saída (csv ou jsonl) e devolve o escritor CSV usado.
+    """
+    if formato == 'jsonl':
+        for linha in linhas:
+            arquivo.write(json.dumps(linha, ensure_ascii=False, allow_nan=False) + '\n')
+        return escritor
+    if linhas:
+        if escritor is None:
+            escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0].keys()))
+            escritor.writeheader()
+        escritor.writerows(linhas)
+    return escritor
+
+def processar_ofertas(caminho_entrada, caminho_saida, taxa_cdi_anual, data_base=None, tamanho_lote=TAMANHO_LOTE_PADRAO, processos=1):
+    """
+    Processa um arquivo de ofertas em fluxo e grava o resultado com as colunas de cálculo
+    e o 'ranking' (1 = maior rentabilidade líquida anualizada).
+
+    O ranking é global, então o processamento ocorre em duas passadas: a primeira grava
+    os resultados num arquivo temporário e guarda só a rentabilidade de cada linha; a
+    segunda acrescenta o ranking. A memória fica limitada ao lote, mais 8 bytes por linha.
+    Retorna um dicionário com o total de linhas, o tempo e a vazão (linhas/s).
+    """
+    data_base = data_base or date.today()
+    formato_saida = _formato_arquivo(caminho_saida)
+    inicio = time.perf_counter()
+
+    rentabilidades = []
+    diretorio_saida = os.path.dirname(os.path.abspath(caminho_saida))
+    descritor, caminho_temporario = tempfile.mkstemp(suffix='.jsonl', dir=diretorio_saida)
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as temporario:
+            for linhas, rentabilidade_lote in _lotes_processados(caminho_entrada, taxa_cdi_anual, data_base, tamanho_lote, processos):
+                _escrever_linhas(temporario, 'jsonl', linhas)
+                rentabilidades.append(rentabilidade_lote)
+
+        rentabilidades = np.concatenate(rentabilidades) if rentabilidades else np.empty(0)
+        # Prazos inválidos (NaN) ficam no fim do ranking
+        ordem = np.argsort(-np.nan_to_num(rentabilidades, nan=-np.inf), kind='stable')
+        ranking = np.empty(len(ordem), dtype=np.int64)
+        ranking[ordem] = np.arange(1, len(ordem) + 1)
+
+        with open(caminho_temporario, encoding='utf-8') as temporario, open(caminho_saida, 'w', newline='', encoding='utf-8') as saida:
+            escritor = None
+            lote = []
+            for posicao, linha in enumerate(temporario):
+                registro = json.loads(linha)
+                registro['ranking'] = int(ranking[posicao])
+                lote.append(registro)
+                if len(lote) >= tamanho_lote:
+                    escritor = _escrever_linhas(saida, formato_saida, lote, escritor)
+                    lote = []
+            _escrever_linhas(saida, formato_saida, lote, escritor)
+    finally:
+        os.remove(caminho_temporario)
+
+    tempo = time.perf_counter() - inicio
+    total_linhas = len(rentabilidades)
+    return {
+        'linhas': total_linhas,
+        'segundos': tempo,
+        'linhas_por_segundo': total_linhas / tempo if tempo > 0 else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Calcula e classifica, sem a interface, um arquivo de ofertas de renda fixa (CSV ou JSONL). "
+                    f"Colunas esperadas: tipo ({', '.join(TIPOS_PRODUTO)}), taxa (% do CDI ou % a.a.), "
+                    "prazo_dias ou vencimento (AAAA-MM-DD) e valor."
+    )
+    parser.add_argument('entrada', help="Arquivo de ofertas (.csv ou .jsonl)")
+    parser.add_argument('saida', help="Arquivo de saída (.csv ou .jsonl)")
+    parser.add_argument('--cdi', type=float, default=14.65, help="Taxa do CDI anual (%%). Padrão: 14.65")
+    parser.add_argument('--data-base', type=date.fromisoformat, default=None, help="Data da aplicação (AAAA-MM-DD). Padrão: hoje")
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por lote vetorizado")
+    parser.add_argument('--processos', type=int, default=1, help="Número de processos (1 = sem pool)")
+    args = parser.parse_args(argv)
+
+    try:
+        relatorio = processar_ofertas(
+            args.entrada, args.saida, args.cdi,
+            data_base=args.data_base, tamanho_lote=args.tamanho_lote, processos=args.processos
+        )
+    except (OSError, ValueError, KeyError) as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{relatorio['linhas']} ofertas processadas em {relatorio['segundos']:.2f} s "
+        f"({relatorio['linhas_por_segundo']:,.0f} linhas/s)",
+        file=sys.stderr
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# produtos.py
+# Registro dos tipos de produto. Módulo leve (sem NumPy): o formulário de entrada
+# o usa antes de os módulos de cálculo serem carregados.
+
+# indexador 'cdi': taxa em % do CDI; indexador 'pre': taxa em % a.a.
+TIPOS_PRODUTO = {
+    'pos_tributada': {'rotulo': 'Pós-Fixada Tributada', 'indexador': 'cdi', 'isenta_ir': False},
+    'pos_isenta': {'rotulo': 'Pós-Fixada Isenta', 'indexador': 'cdi', 'isenta_ir': True},
+    'pre': {'rotulo': 'Pré-fixada', 'indexador': 'pre', 'isenta_ir': False},
+    'pre_isenta': {'rotulo': 'Pré-fixada Isenta', 'indexador': 'pre', 'isenta_ir': True},
+}
+INDEXADORES = ('cdi', 'pre')
+
+def registrar_tipo_produto(tipo, rotulo, indexador, isenta_ir):
+    """
+    Registra (ou substitui) um tipo de produto.
+    """
+    if indexador not in INDEXADORES:
+        raise ValueError(f"Indexador desconhecido: '{indexador}' (use {', '.join(INDEXADORES)}).")
+    TIPOS_PRODUTO[tipo] = {'rotulo': rotulo, 'indexador': indexador, 'isenta_ir': bool(isenta_ir)}
+
+def validar_tipo_produto(tipo, descricao=''):
+    """
+    Normaliza o tipo ('Pos_Isenta ' -> 'pos_isenta') e levanta ValueError se não estiver registrado.
+    """
+    tipo_normalizado = str(tipo or '').strip().lower()
+    if tipo_normalizado not in TIPOS_PRODUTO:
+        prefixo = f"{descricao}: " if descricao else ''
+        raise ValueError(f"{prefixo}tipo de produto desconhecido '{tipo}' (use {', '.join(TIPOS_PRODUTO)}).")
+    return tipo_normalizado
+
+def unidade_da_taxa(tipo):
+    """
+    Unidade da taxa de um tipo de produto, para exibição.
+    """
+    return '% do CDI' if TIPOS_PRODUTO[tipo]['indexador'] == 'cdi' else '% a.a.'
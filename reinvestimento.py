@@ -0,0 +1,137 @@
+# reinvestimento.py
+# Reinvestimento até um horizonte comum: quando os vencimentos diferem, o líquido de cada
+# aplicação mais curta é reaplicado (nas mesmas condições ou numa aplicação escolhida) até
+# o vencimento mais longo, e o IR/IOF recomeça a cada perna.
+import numpy as np
+
+from calendario import dias_uteis_no_prazo
+from carteira import caracteristicas_dos_tipos, fatores_acumulados
+from produtos import validar_tipo_produto
+from tributacao import calcular_tributos, fracao_liquida
+
+COLUNAS_EVOLUCAO = ('valor_bruto', 'aliquota_ir', 'imposto_renda', 'iof', 'valor_liquido')
+
+def limites_das_pernas(dias_vencimento, prazo_reaplicacao, horizonte):
+    """
+    Início e fim (dias corridos desde a aplicação) de cada perna: a aplicação original até o
+    vencimento e, depois, uma reaplicação a cada prazo_reaplicacao dias; a última perna é
+    resgatada no horizonte, mesmo antes do seu vencimento.
+    """
+    inicios = np.concatenate(([0], np.arange(dias_vencimento, horizonte, prazo_reaplicacao))).astype(np.int64)
+    fins = np.append(inicios[1:], max(horizonte, dias_vencimento))
+    return inicios, fins
+
+def encadear_pernas(fatores_original, fatores_reaplicacao, isenta_original, isenta_reaplicacao, inicios, fins, valor_inicial):
+    """
+    Costura as pernas de uma aplicação numa série diária contínua, sem laço por dia.
+    fatores_* são os fatores brutos acumulados desde o dia 0 (um por dia corrido), de modo que
+    o fator de uma perna entre os dias s e d é fatores[d] / fatores[s]. O valor reaplicado no
+    início de cada perna é o líquido da anterior (produto acumulado dos multiplicadores líquidos).
+    Retorna as séries de COLUNAS_EVOLUCAO por dia corrido (sem a linha inicial repetida).
+    """
+    dias = np.arange(len(fatores_original))
+    # O dia de um vencimento pertence à perna que vence nele; a seguinte rende a partir do dia seguinte
+    perna = np.searchsorted(fins, dias, side='left')
+    primeira_perna = np.arange(len(inicios)) == 0
+    isentas = np.where(primeira_perna, isenta_original, isenta_reaplicacao)
+    fatores_inicio = np.where(primeira_perna, fatores_original[inicios], fatores_reaplicacao[inicios])
+    fatores_fim = np.where(primeira_perna, fatores_original[fins], fatores_reaplicacao[fins])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        multiplicadores = 1 + (fatores_fim / fatores_inicio - 1) * fracao_liquida(fins - inicios, isentas)
+        valores_inicio = valor_inicial * np.concatenate(([1.0], np.cumprod(multiplicadores[:-1])))
+        fatores_perna = np.where(perna == 0, fatores_original, fatores_reaplicacao) / fatores_inicio[perna]
+    fatores_perna = np.nan_to_num(fatores_perna)
+
+    dias_na_perna = dias - inicios[perna]
+    valor_bruto = valores_inicio[perna] * fatores_perna
+    tributos = calcular_tributos(valor_bruto - valores_inicio[perna], dias_na_perna, isentas[perna])
+    return {
+        'valor_bruto': valor_bruto,
+        'aliquota_ir': np.where(dias_na_perna <= 0, 0.0, tributos['aliquota_ir']),
+        'imposto_renda': tributos['imposto_renda'],
+        'iof': tributos['iof'],
+        'valor_liquido': valores_inicio[perna] + tributos['rendimento_liquido']
+    }
+
+def calcular_evolucao_reinvestida(carteira, valor_inicial, taxa_cdi_anual, reaplicacao=None, curva_cdi=None):
+    """
+    Evolução diária de todas as ofertas até o maior vencimento, reinvestindo as mais curtas.
+    reaplicacao é None (cada oferta é reaplicada nas mesmas condições: tipo, taxa e prazo) ou um
+    dicionário com 'tipo', 'taxa' e 'prazo_dias' da aplicação em que todas são reaplicadas.
+    Os fatores acumulados de todas as ofertas (e da reaplicação) são calculados uma vez, no eixo
+    de dias compartilhado, e cada perna é uma razão entre eles.
+    Retorna o formato de carteira.calcular_evolucao_carteira (todas as séries até o horizonte),
+    mais 'pernas' ({nome: (inícios, fins)}).
+    """
+    horizonte = int(carteira['dias_corridos'].max(initial=0))
+    eixo = np.arange(horizonte + 1)
+    fatores = fatores_acumulados(
+        carteira['indexado_cdi'], carteira['taxas'], eixo, taxa_cdi_anual, carteira['data_inicio'], curva_cdi
+    )
+    if reaplicacao is not None:
+        tipo_reaplicacao = np.array([validar_tipo_produto(reaplicacao['tipo'], 'Reaplicação')], dtype=object)
+        prazo_reaplicacao = int(reaplicacao['prazo_dias'])
+        if prazo_reaplicacao <= 0:
+            raise ValueError("O prazo da reaplicação deve ser positivo.")
+        indexado_reaplicacao, isenta_reaplicacao = caracteristicas_dos_tipos(tipo_reaplicacao)
+        fatores_reaplicacao = fatores_acumulados(
+            indexado_reaplicacao, np.array([float(reaplicacao['taxa'])]), eixo,
+            taxa_cdi_anual, carteira['data_inicio'], curva_cdi
+        )[0]
+
+    # Sem curva, CDI <= -100% zera as pernas pós-fixadas, como calcular_rendimento_pos_fixado
+    cdi_invalido = curva_cdi is None and taxa_cdi_anual <= -100
+    dias_uteis = dias_uteis_no_prazo(carteira['data_inicio'], eixo)
+    series = {coluna: np.empty((len(carteira['nomes']), horizonte + 2)) for coluna in COLUNAS_EVOLUCAO}
+    pernas = {}
+    for indice, (nome, dias_vencimento) in enumerate(zip(carteira['nomes'], carteira['dias_corridos'].tolist())):
+        isenta_original = bool(carteira['isenta_ir'][indice])
+        indexada_original = bool(carteira['indexado_cdi'][indice])
+        if reaplicacao is None:
+            inicios, fins = limites_das_pernas(dias_vencimento, dias_vencimento, horizonte)
+            indexada_reaplicacao = indexada_original
+            evolucao = encadear_pernas(
+                fatores[indice], fatores[indice], isenta_original, isenta_original, inicios, fins, valor_inicial
+            )
+        else:
+            inicios, fins = limites_das_pernas(dias_vencimento, prazo_reaplicacao, horizonte)
+            indexada_reaplicacao = bool(indexado_reaplicacao[0])
+            evolucao = encadear_pernas(
+                fatores[indice], fatores_reaplicacao, isenta_original, bool(isenta_reaplicacao[0]),
+                inicios, fins, valor_inicial
+            )
+        # Sem dia útil decorrido na perna, uma pós-fixada não tem alíquota de IR (como nas funções escalares)
+        perna = np.searchsorted(fins, eixo, side='left')
+        indexadas = np.where(np.arange(len(inicios)) == 0, indexada_original, indexada_reaplicacao)
+        evolucao['aliquota_ir'][indexadas[perna] & (dias_uteis - dias_uteis[inicios[perna]] <= 0)] = 0.0
+        if cdi_invalido and (indexada_original or (indexada_reaplicacao and len(inicios) > 1)):
+            # Da primeira perna pós-fixada em diante, o valor reaplicado é zero
+            zerados = eixo >= 0 if indexada_original else eixo > inicios[1]
+            for coluna in COLUNAS_EVOLUCAO:
+                evolucao[coluna][zerados] = 0.0
+        pernas[nome] = (inicios, fins)
+        for coluna in COLUNAS_EVOLUCAO:
+            series[coluna][indice, 1:] = evolucao[coluna]
+
+    # Linha inicial repetida (dia 0), como nas demais evoluções: apenas o valor aplicado
+    for coluna in COLUNAS_EVOLUCAO:
+        series[coluna][:, 0] = valor_inicial if coluna in ('valor_bruto', 'valor_liquido') else 0.0
+
+    return {
+        'dias': np.concatenate(([0], eixo)).astype(np.int32),
+        **series,
+        'pernas': pernas
+    }
+
+def evolucoes_reinvestidas_por_oferta(evolucao_reinvestida, nomes):
+    """
+    Separa a evolução reinvestida em {nome: evolução colunar} (visões, sem cópia), todas até o horizonte.
+    """
+    return {
+        nome: {
+            'dias': evolucao_reinvestida['dias'],
+            **{coluna: evolucao_reinvestida[coluna][indice] for coluna in COLUNAS_EVOLUCAO}
+        }
+        for indice, nome in enumerate(nomes)
+    }
@@ -0,0 +1,68 @@
+# resgate.py
+import numpy as np
+
+COLUNAS_RESGATE = ('valor_liquido', 'imposto_renda', 'iof')
+
+def series_de_resgate(evolucao):
+    """
+    Séries diárias de resgate de uma aplicação a partir da sua evolução colunar (formato de
+    calculations.calcular_evolucao_pos_fixada): a posição d é o resgate no dia corrido d.
+    Retorna cópias, sem a linha inicial duplicada.
+    """
+    return {coluna: np.array(evolucao[coluna][1:]) for coluna in COLUNAS_RESGATE}
+
+def montar_indice_resgate(series_por_oferta, valor_inicial, sem_rendimento=None):
+    """
+    Monta, uma vez por comparação, o índice de resgate antecipado a partir de
+    {nome: séries de resgate} (ver series_de_resgate). Cada série vai até o vencimento;
+    depois dele o valor fica parado (resgatado no vencimento).
+    sem_rendimento marca, por oferta, as que as funções escalares zeram (ver
+    carteira.ofertas_sem_rendimento): o rendimento delas é zero em qualquer data.
+    Guarda matrizes ofertas x dias com o valor líquido, os impostos e a posição de cada
+    oferta no ranking do dia, para que consultar_resgate não precise recalcular nada.
+    """
+    nomes = list(series_por_oferta)
+    dias_vencimento = np.array([len(series['valor_liquido']) - 1 for series in series_por_oferta.values()], dtype=np.int64)
+    total_dias = int(dias_vencimento.max(initial=0))
+    # Após o vencimento, cada oferta repete o último dia da sua série
+    colunas = np.minimum(np.arange(total_dias + 1)[None, :], dias_vencimento[:, None])
+
+    indice = {
+        'nomes': nomes,
+        'valor_inicial': float(valor_inicial),
+        'dias_vencimento': dias_vencimento,
+        'sem_rendimento': np.zeros(len(nomes), dtype=bool) if sem_rendimento is None else np.asarray(sem_rendimento, dtype=bool)
+    }
+    for coluna in COLUNAS_RESGATE:
+        matriz = np.empty((len(nomes), total_dias + 1))
+        for posicao, series in enumerate(series_por_oferta.values()):
+            matriz[posicao] = series[coluna][colunas[posicao]]
+        indice[coluna] = matriz
+
+    # posicao[i, d]: colocação (1 = maior valor líquido) da oferta i no resgate do dia d
+    ordem = np.argsort(-indice['valor_liquido'], axis=0, kind='stable')
+    posicoes = np.empty_like(ordem)
+    np.put_along_axis(posicoes, ordem, np.arange(1, len(nomes) + 1)[:, None], axis=0)
+    indice['ordem'] = ordem
+    indice['posicao'] = posicoes
+    return indice
+
+def consultar_resgate(indice, dias_corridos):
+    """
+    Resultado de todas as ofertas no resgate após dias_corridos (limitado ao maior vencimento),
+    lido diretamente das matrizes do índice. Retorna um dicionário com 'dias_corridos',
+    arrays por oferta ('valor_liquido', 'rendimento_liquido', 'imposto_renda', 'iof',
+    'posicao', 'vencida') e 'ranking' (nomes do maior para o menor valor líquido).
+    """
+    dia = int(np.clip(dias_corridos, 0, indice['valor_liquido'].shape[1] - 1))
+    valor_liquido = indice['valor_liquido'][:, dia]
+    return {
+        'dias_corridos': dia,
+        'valor_liquido': valor_liquido,
+        'rendimento_liquido': np.where(indice['sem_rendimento'], 0.0, valor_liquido - indice['valor_inicial']),
+        'imposto_renda': indice['imposto_renda'][:, dia],
+        'iof': indice['iof'][:, dia],
+        'posicao': indice['posicao'][:, dia],
+        'vencida': indice['dias_vencimento'] <= dia,
+        'ranking': [indice['nomes'][posicao] for posicao in indice['ordem'][:, dia].tolist()]
+    }
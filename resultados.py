@@ -0,0 +1,325 @@
+# resultados.py
+import numpy as np
+
+from amostragem import reduzir_evolucao
+from cache_calculos import calcular_carteira, calcular_evolucao_carteira, calcular_rendimento_pos_fixado
+from calculations import calcular_grade_pos_fixada
+from calendario import dias_uteis_no_prazo
+from carteira import ofertas_sem_rendimento
+from equivalencia import (
+    cdi_equilibrio_prefixada,
+    cdi_equilibrio_tributada,
+    taxa_prefixada_equivalente,
+    taxa_tributada_equivalente
+)
+from incremental import atualizar_unidades, reutilizar_ou_calcular
+from perfilamento import medindo_figuras, medir_etapa
+from produtos import TIPOS_PRODUTO, unidade_da_taxa
+from reinvestimento import calcular_evolucao_reinvestida, evolucoes_reinvestidas_por_oferta
+from resgate import consultar_resgate, montar_indice_resgate
+from sensibilidades import analisar_sensibilidades
+from ui_elements import (
+    build_breakeven_figure,
+    build_evolution_figure,
+    build_fan_chart_figure,
+    build_rentability_figure,
+    build_scenario_heatmap_figure,
+    cores_das_aplicacoes
+)
+
+# Faixas de taxas (% do CDI) do mapa de cenários
+TAXAS_ISENTA_GRADE = np.arange(70, 121)
+TAXAS_TRIBUTADA_GRADE = np.arange(80, 131)
+
+def _medir_figuras(figuras):
+    """
+    No modo diagnóstico (perfilamento.medindo_figuras), serializa cada figura como o
+    st.plotly_chart fará a cada renderização e registra o tempo e o tamanho do JSON (KB).
+    """
+    if not medindo_figuras():
+        return
+    import plotly.io as pio
+
+    for nome, figura in figuras.items():
+        with medir_etapa(f'serializacao_figura[{nome}]') as medicao:
+            medicao['payload_kb'] = round(len(pio.to_json(figura, validate=False)) / 1024, 1)
+
+def _calcular_reinvestimento(carteira_ofertas, valor_aplicar, taxa_cdi_anual, curva_cdi, parametros_reinvestimento):
+    """
+    Evolução com reinvestimento até o vencimento mais longo, reduzida para o gráfico, e o
+    rendimento líquido de cada aplicação nessa data.
+    """
+    if parametros_reinvestimento['mesmas_condicoes']:
+        reaplicacao = None
+        descricao = 'cada uma nas mesmas condições'
+    else:
+        reaplicacao = parametros_reinvestimento
+        descricao = (
+            f"em {TIPOS_PRODUTO[reaplicacao['tipo']]['rotulo']} a {reaplicacao['taxa']:.2f} "
+            f"{unidade_da_taxa(reaplicacao['tipo'])} por {reaplicacao['prazo_dias']} dias"
+        )
+    evolucao = calcular_evolucao_reinvestida(carteira_ofertas, valor_aplicar, taxa_cdi_anual, reaplicacao, curva_cdi)
+    nomes = carteira_ofertas['nomes']
+    evolucoes = evolucoes_reinvestidas_por_oferta(evolucao, nomes)
+    return {
+        'data_horizonte': max(carteira_ofertas['datas_vencimento']),
+        'descricao': descricao,
+        'rendimentos': dict(zip(nomes, (evolucao['valor_liquido'][:, -1] - valor_aplicar).tolist())),
+        'reaplicacoes': {nome: len(evolucao['pernas'][nome][0]) - 1 for nome in nomes},
+        # Cópias reduzidas: não mantêm vivas as matrizes diárias completas
+        'evolucoes': {
+            nome: {coluna: np.array(valores) for coluna, valores in reduzir_evolucao(evolucoes[nome]).items() if coluna in ('dias', 'valor_liquido')}
+            for nome in nomes
+        }
+    }
+
+def _taxas_para_equilibrio(carteira_ofertas):
+    """
+    Taxas da primeira isenta e da primeira tributada indexadas ao CDI e da primeira
+    pré-fixada (None quando não há): o mapa de cenários e o ponto de equilíbrio as comparam.
+    """
+    tipos_lista = carteira_ofertas['tipos'].tolist()
+    taxas_lista = carteira_ofertas['taxas'].tolist()
+    return tuple(
+        next((taxa for tipo, taxa in zip(tipos_lista, taxas_lista) if tipo == tipo_procurado), None)
+        for tipo_procurado in ('pos_isenta', 'pos_tributada', 'pre')
+    )
+
+def _detalhe_da_oferta(carteira_ofertas, indice, unidades_ofertas):
+    """
+    Entradas e resultados no prazo total (unidade de incremental.py) da oferta de posição indice.
+    """
+    nome = carteira_ofertas['nomes'][indice]
+    return {
+        'nome': nome,
+        'tipo': carteira_ofertas['tipos'].tolist()[indice],
+        'taxa': carteira_ofertas['taxas'].tolist()[indice],
+        'data_vencimento': carteira_ofertas['datas_vencimento'][indice],
+        **unidades_ofertas[nome]['prazo_total']
+    }
+
+def montar_oferta(carteira_ofertas, indice, valor_aplicar, taxa_cdi_anual, curva_cdi, unidades_ofertas):
+    """
+    Detalhamento e figura da série de evolução de uma única oferta (a de posição indice), para
+    o fragmento dela no app. Só recalcula as unidades desatualizadas (normalmente nenhuma, pois
+    montar_pacote já as atualizou; ou só a desta oferta, se o pacote veio do cache entre sessões).
+    """
+    atualizar_unidades(
+        unidades_ofertas, carteira_ofertas, valor_aplicar, taxa_cdi_anual,
+        curva_cdi, calcular=calcular_carteira, calcular_evolucao=calcular_evolucao_carteira
+    )
+    nome = carteira_ofertas['nomes'][indice]
+    figura = build_evolution_figure(
+        {nome: unidades_ofertas[nome]['evolucao']}, carteira_ofertas['data_inicio'],
+        cores_das_aplicacoes(carteira_ofertas['nomes'])
+    )
+    figura.update_layout(title_text=f'Evolução do Valor Líquido: {nome}', showlegend=False)
+    return {'detalhe': _detalhe_da_oferta(carteira_ofertas, indice, unidades_ofertas), 'figura': figura}
+
+def montar_pacote(carteira_ofertas, valor_aplicar, taxa_cdi_anual, curva_cdi, unidades_ofertas, unidades_analises, parametros_reinvestimento=None):
+    """
+    Calcula o que a comparação exibe a cada mudança das entradas e monta as figuras, sem
+    renderizar nada. As análises caras (simulação de Monte Carlo e mapa de cenários) ficam
+    em montar_analises, calculadas só a pedido.
+    Retorna o pacote {'dados': {...}, 'figuras': {nome: go.Figure}} que o app renderiza e
+    que cache_resultados compartilha entre sessões (guardado serializado, ver
+    cache_resultados._guardar). As figuras já validadas vão direto para st.plotly_chart.
+    unidades_ofertas e unidades_analises são os armazenamentos de incremental.py (no app,
+    os da sessão; sem sessão, dicionários vazios).
+    Com parametros_reinvestimento (ver ui_elements.render_reinvestment_controls) e vencimentos
+    diferentes, a evolução mostra as aplicações reaplicadas até o vencimento mais longo.
+    """
+    hoje = carteira_ofertas['data_inicio']
+    nomes = carteira_ofertas['nomes']
+    taxas = carteira_ofertas['taxas']
+    data_vencimento_comparativa = min(carteira_ofertas['datas_vencimento'])
+    dias_corridos_comparativos = (data_vencimento_comparativa - hoje).days
+
+    # --- Prazo total e evolução, recalculados só para as ofertas cujas entradas mudaram ---
+    with medir_etapa('calculos_ofertas'):
+        atualizar_unidades(
+            unidades_ofertas, carteira_ofertas, valor_aplicar, taxa_cdi_anual,
+            curva_cdi, calcular=calcular_carteira, calcular_evolucao=calcular_evolucao_carteira
+        )
+
+    # --- Índice de resgate: resultado de todas as ofertas em qualquer data, montado uma vez.
+    # A comparação equivalente (até o vencimento mais curto) é uma consulta a ele ---
+    with medir_etapa('indice_resgate'):
+        indice_resgate = montar_indice_resgate(
+            {nome: unidades_ofertas[nome]['resgate'] for nome in nomes}, valor_aplicar,
+            sem_rendimento=ofertas_sem_rendimento(carteira_ofertas, taxa_cdi_anual, curva_cdi)
+        )
+        resgate_comparativo = consultar_resgate(indice_resgate, dias_corridos_comparativos)
+        rendimentos_comparativos = resgate_comparativo['rendimento_liquido']
+        dias_uteis_comparativos = int(dias_uteis_no_prazo(hoje, dias_corridos_comparativos))
+        if dias_uteis_comparativos < 1:
+            # Horizonte sem dia útil (ex.: vencimento no fim de semana seguinte): como na
+            # comparação original, as pós-fixadas rendem 1 dia útil, e não o zero do índice
+            dias_uteis_comparativos = 1
+            rendimentos_comparativos = np.array([
+                calcular_rendimento_pos_fixado(
+                    valor_aplicar, taxa, 1, taxa_cdi_anual, isenta_ir=isenta_ir,
+                    prazo_dias_corridos_para_ir=dias_corridos_comparativos, data_inicio=hoje, curva_cdi=curva_cdi
+                )[1] if indexado_cdi else rendimento
+                for taxa, isenta_ir, indexado_cdi, rendimento in zip(
+                    taxas.tolist(), carteira_ofertas['isenta_ir'].tolist(),
+                    carteira_ofertas['indexado_cdi'].tolist(), rendimentos_comparativos.tolist()
+                )
+            ])
+
+    cores_aplicacoes = cores_das_aplicacoes(nomes)
+    rendimentos_full = {nome: unidades_ofertas[nome]['prazo_total']['rendimento_liquido'] for nome in nomes}
+    rendimentos_comp = dict(zip(nomes, rendimentos_comparativos.tolist()))
+    detalhes = [_detalhe_da_oferta(carteira_ofertas, indice, unidades_ofertas) for indice in range(len(nomes))]
+    dados = {
+        'rendimentos_full': rendimentos_full,
+        'rendimentos_comp': rendimentos_comp,
+        'detalhes': detalhes,
+        'data_vencimento_comparativa': data_vencimento_comparativa,
+        'dias_uteis_comparativos': dias_uteis_comparativos,
+        'indice_resgate': indice_resgate,
+        'equilibrio': None,
+        'reinvestimento': None,
+        # Derivadas já vêm da mesma passada do prazo total; aqui só se estima a virada
+        'sensibilidade': analisar_sensibilidades(detalhes, taxa_cdi_anual if curva_cdi is None else None)
+    }
+    figuras = {}
+
+    with medir_etapa('figuras_rentabilidade'):
+        figuras['rentabilidade_total'] = build_rentability_figure(
+            nomes, [rendimentos_full[nome] for nome in nomes],
+            'Rendimento Líquido Comparativo (Prazos Originais)', cores_aplicacoes
+        )
+        figuras['rentabilidade_comparativa'] = build_rentability_figure(
+            nomes, rendimentos_comparativos,
+            f'Rendimento Líquido Comparativo (até {data_vencimento_comparativa.strftime("%d/%m/%Y")})',
+            cores_aplicacoes
+        )
+
+    evolucoes_grafico = {nome: unidades_ofertas[nome]['evolucao'] for nome in nomes}
+    if parametros_reinvestimento is not None and len(set(carteira_ofertas['dias_corridos'].tolist())) > 1:
+        with medir_etapa('reinvestimento'):
+            reinvestimento = reutilizar_ou_calcular(
+                unidades_analises, 'reinvestimento',
+                (tuple(unidades_ofertas[nome]['chave'] for nome in nomes), tuple(nomes), tuple(sorted(parametros_reinvestimento.items()))),
+                lambda: _calcular_reinvestimento(carteira_ofertas, valor_aplicar, taxa_cdi_anual, curva_cdi, parametros_reinvestimento)
+            )
+            evolucoes_grafico = reinvestimento['evolucoes']
+            dados['reinvestimento'] = {chave: valor for chave, valor in reinvestimento.items() if chave != 'evolucoes'}
+            figuras['rentabilidade_reinvestida'] = build_rentability_figure(
+                nomes, [reinvestimento['rendimentos'][nome] for nome in nomes],
+                f'Rendimento Líquido com Reinvestimento (até {reinvestimento["data_horizonte"].strftime("%d/%m/%Y")})',
+                cores_aplicacoes
+            )
+
+    # Traços montados direto das séries guardadas (já reduzidas a ~1 ponto por pixel)
+    with medir_etapa('figura_evolucao'):
+        figuras['evolucao'] = build_evolution_figure(evolucoes_grafico, hoje, cores_aplicacoes)
+
+    # O ponto de equilíbrio compara a primeira isenta com a primeira tributada indexadas
+    # ao CDI (e, se houver, a primeira pré-fixada)
+    taxa_aplicacao_isenta_cdi, taxa_aplicacao_tributada_cdi, taxa_aplicacao_prefixada_anual = _taxas_para_equilibrio(carteira_ofertas)
+
+    if taxa_aplicacao_isenta_cdi is not None and taxa_aplicacao_tributada_cdi is not None:
+        # --- Ponto de equilíbrio (taxa equivalente por prazo, incluindo os saltos de IR) ---
+        with medir_etapa('equilibrio'):
+            prazo_maximo_curva = max(800, int(carteira_ofertas['dias_corridos'].max()))
+            prazos_curva = np.arange(1, prazo_maximo_curva + 1)
+            taxas_tributada_equivalentes = reutilizar_ou_calcular(
+                unidades_analises, 'curva_equilibrio',
+                (taxa_aplicacao_isenta_cdi, prazo_maximo_curva, float(taxa_cdi_anual), hoje),
+                lambda: taxa_tributada_equivalente(taxa_aplicacao_isenta_cdi, prazos_curva, taxa_cdi_anual, hoje)
+            )
+            equilibrio_comparativo = {
+                'taxa_tributada': float(taxas_tributada_equivalentes[dias_corridos_comparativos - 1]),
+                'taxa_prefixada': float(taxa_prefixada_equivalente(
+                    taxa_aplicacao_isenta_cdi, dias_corridos_comparativos, taxa_cdi_anual, hoje
+                ))
+            }
+            cdi_tributada = float(cdi_equilibrio_tributada(
+                taxa_aplicacao_isenta_cdi, taxa_aplicacao_tributada_cdi, dias_corridos_comparativos, hoje
+            ))
+            if not np.isnan(cdi_tributada):
+                equilibrio_comparativo['cdi_tributada'] = cdi_tributada
+            if taxa_aplicacao_prefixada_anual is not None:
+                cdi_prefixada = float(cdi_equilibrio_prefixada(
+                    taxa_aplicacao_isenta_cdi, taxa_aplicacao_prefixada_anual, dias_corridos_comparativos, hoje
+                ))
+                if not np.isnan(cdi_prefixada):
+                    equilibrio_comparativo['cdi_prefixada'] = cdi_prefixada
+            dados['equilibrio'] = {
+                'taxa_isenta_cdi': taxa_aplicacao_isenta_cdi,
+                'taxa_tributada_cdi': taxa_aplicacao_tributada_cdi,
+                'comparativo': equilibrio_comparativo
+            }
+            figuras['equilibrio'] = build_breakeven_figure(
+                prazos_curva, taxas_tributada_equivalentes, taxa_aplicacao_tributada_cdi
+            )
+
+    _medir_figuras(figuras)
+    return {'dados': dados, 'figuras': figuras}
+
+def montar_analises(carteira_ofertas, valor_aplicar, taxa_cdi_anual, parametros_simulacao, unidades_analises):
+    """
+    Análises caras, calculadas só a pedido (no app, no clique em "Comparar Aplicações", e
+    não a cada mudança das entradas): a simulação de Monte Carlo do CDI (com
+    parametros_simulacao, ver ui_elements.render_simulation_controls) e o mapa de cenários
+    (com uma isenta e uma tributada indexadas ao CDI). Retorna {'dados': {'simulacao',
+    'cenarios'}, 'figuras': {...}}, no formato de montar_pacote; o que não se aplica fica None.
+    """
+    hoje = carteira_ofertas['data_inicio']
+    nomes = carteira_ofertas['nomes']
+    data_vencimento_comparativa = min(carteira_ofertas['datas_vencimento'])
+    dias_corridos_comparativos = (data_vencimento_comparativa - hoje).days
+    dias_uteis_comparativos = max(int(dias_uteis_no_prazo(hoje, dias_corridos_comparativos)), 1)
+    dados = {'simulacao': None, 'cenarios': None}
+    figuras = {}
+
+    if parametros_simulacao is not None:
+        with medir_etapa('simulacao_cdi'):
+            from simulacao_cdi import simular_cenarios_cdi
+            dados['simulacao'] = reutilizar_ou_calcular(
+                unidades_analises, 'simulacao_cdi',
+                (
+                    hoje, float(valor_aplicar), float(taxa_cdi_anual), tuple(nomes), tuple(carteira_ofertas['tipos'].tolist()),
+                    tuple(carteira_ofertas['taxas'].tolist()), tuple(carteira_ofertas['dias_corridos'].tolist()),
+                    tuple(parametros_simulacao.items())
+                ),
+                lambda: simular_cenarios_cdi(
+                    carteira_ofertas, valor_aplicar, data_vencimento_comparativa,
+                    taxa_cdi_anual,
+                    parametros_simulacao['taxa_cdi_longo_prazo'],
+                    parametros_simulacao['velocidade_reversao'],
+                    parametros_simulacao['volatilidade'],
+                    numero_trajetorias=parametros_simulacao['numero_trajetorias'],
+                    semente=0
+                )
+            )
+            figuras['leque'] = build_fan_chart_figure(dados['simulacao'], hoje, cores_das_aplicacoes(nomes))
+
+    taxa_aplicacao_isenta_cdi, taxa_aplicacao_tributada_cdi, _ = _taxas_para_equilibrio(carteira_ofertas)
+    if taxa_aplicacao_isenta_cdi is not None and taxa_aplicacao_tributada_cdi is not None:
+        # --- Grade de cenários (todas as combinações de taxas, em uma única passada) ---
+        # (depende só do valor, do CDI e do prazo da comparação, não das taxas das ofertas)
+        with medir_etapa('grade_cenarios'):
+            def calcular_diferencas_grade():
+                grade_isenta = calcular_grade_pos_fixada(
+                    valor_aplicar, TAXAS_ISENTA_GRADE[:, None], dias_uteis_comparativos, taxa_cdi_anual,
+                    isenta_ir=True
+                )
+                grade_tributada = calcular_grade_pos_fixada(
+                    valor_aplicar, TAXAS_TRIBUTADA_GRADE[None, :], dias_uteis_comparativos, taxa_cdi_anual,
+                    isenta_ir=False, prazo_dias_corridos_para_ir=dias_corridos_comparativos
+                )
+                return grade_isenta['valor_final_liquido'] - grade_tributada['valor_final_liquido']
+
+            diferencas_grade = reutilizar_ou_calcular(
+                unidades_analises, 'grade_cenarios',
+                (float(valor_aplicar), float(taxa_cdi_anual), dias_uteis_comparativos, dias_corridos_comparativos),
+                calcular_diferencas_grade
+            )
+            dados['cenarios'] = {'data_vencimento_comparativa': data_vencimento_comparativa}
+            figuras['cenarios'] = build_scenario_heatmap_figure(TAXAS_ISENTA_GRADE, TAXAS_TRIBUTADA_GRADE, diferencas_grade)
+
+    _medir_figuras(figuras)
+    return {'dados': dados, 'figuras': figuras}
@@ -0,0 +1,64 @@
+# sensibilidades.py
+# Quão frágil é o veredito: a partir das derivadas analíticas do valor líquido (ver
+# carteira.calcular_ofertas com com_sensibilidades=True), estima quanto o CDI ou a taxa
+# contratada precisam mudar para que a aplicação vencedora troque.
+
+def _variacao_para_empate(diferenca, inclinacao):
+    """
+    Variação (linear, de primeira ordem) que zera uma diferença de rendimento que muda à
+    razão 'inclinacao' por unidade; None se a diferença não depende dessa variável.
+    """
+    if abs(inclinacao) < 1e-12:
+        return None
+    return -diferenca / inclinacao
+
+def analisar_sensibilidades(detalhes, taxa_cdi_anual):
+    """
+    Monta o relatório de sensibilidade a partir dos detalhes por aplicação (com
+    'rendimento_liquido' e as colunas de carteira.COLUNAS_SENSIBILIDADE), no prazo original.
+    Retorna 'vencedora', 'linhas' (uma por aplicação, com as derivadas e o ajuste da taxa
+    que empata com a vencedora; para a vencedora, a variação, negativa, que empata com a segunda)
+    e a virada pelo CDI: 'variacao_cdi_virada' (p.p., com sinal), 'cdi_virada' e
+    'desafiante', ou None nas três se nenhuma variação de CDI positiva troca a vencedora.
+    Com curva de CDI, informe taxa_cdi_anual=None: a variação é um deslocamento paralelo da
+    curva e 'cdi_virada' fica None.
+    As distâncias são estimativas de primeira ordem (o valor líquido é quase linear no CDI
+    e na taxa em horizontes usuais).
+    """
+    por_nome = {detalhe['nome']: detalhe for detalhe in detalhes}
+    vencedora = max(por_nome, key=lambda nome: por_nome[nome]['rendimento_liquido'])
+    melhor = por_nome[vencedora]
+    segunda = max(
+        (nome for nome in por_nome if nome != vencedora),
+        key=lambda nome: por_nome[nome]['rendimento_liquido'], default=None
+    )
+
+    linhas = []
+    virada = {'variacao_cdi_virada': None, 'cdi_virada': None, 'desafiante': None}
+    for nome, detalhe in por_nome.items():
+        if nome == vencedora:
+            ajuste_taxa = None if segunda is None else _variacao_para_empate(
+                melhor['rendimento_liquido'] - por_nome[segunda]['rendimento_liquido'], melhor['sensibilidade_taxa']
+            )
+        else:
+            diferenca = melhor['rendimento_liquido'] - detalhe['rendimento_liquido']
+            ajuste_taxa = _variacao_para_empate(-diferenca, detalhe['sensibilidade_taxa'])
+            variacao_cdi = _variacao_para_empate(diferenca, melhor['sensibilidade_cdi'] - detalhe['sensibilidade_cdi'])
+            if (
+                variacao_cdi is not None and (taxa_cdi_anual is None or taxa_cdi_anual + variacao_cdi > 0)
+                and (virada['variacao_cdi_virada'] is None or abs(variacao_cdi) < abs(virada['variacao_cdi_virada']))
+            ):
+                virada = {
+                    'variacao_cdi_virada': variacao_cdi,
+                    'cdi_virada': None if taxa_cdi_anual is None else taxa_cdi_anual + variacao_cdi,
+                    'desafiante': nome
+                }
+        linhas.append({
+            'nome': nome,
+            'tipo': detalhe['tipo'],
+            'sensibilidade_cdi': detalhe['sensibilidade_cdi'],
+            'sensibilidade_taxa': detalhe['sensibilidade_taxa'],
+            'sensibilidade_valor': detalhe['sensibilidade_valor'],
+            'ajuste_taxa_empate': ajuste_taxa
+        })
+    return {'vencedora': vencedora, 'linhas': linhas, **virada}
@@ -0,0 +1,266 @@
+# simulacao_cdi.py
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculations import calcular_valor_liquido_por_fatores
+from carteira import calcular_evolucao_carteira, selecionar_ofertas
+from calendario import dias_uteis_no_prazo
+from curva_cdi import acumular_fatores_cdi, taxas_cdi_diarias
+
+PERCENTIS = (5, 50, 95)
+# Trajetórias por lote: limita a memória a poucas matrizes dias úteis x lote
+# (~40 MB por matriz para 10 anos com 2.000 trajetórias)
+TAMANHO_LOTE_PADRAO = 2_000
+PONTOS_GRADE_PADRAO = 120
+# Classes dos histogramas por ponto da grade de onde saem os percentis (a memória não
+# depende do número de trajetórias: ofertas x pontos x classes contagens)
+CLASSES_HISTOGRAMA = 1024
+# Limites de tamanho: valores de um lote (ofertas x trajetórias x pontos, float32, ~200 MB)
+# e valores simulados no total (ofertas x trajetórias x pontos, tempo de processamento)
+MAXIMO_VALORES_POR_LOTE = 50_000_000
+MAXIMO_VALORES_SIMULADOS = 2_000_000_000
+
+def _grade_da_simulacao(dias_vencimentos, dias_comparacao, pontos):
+    """
+    Dias corridos em que os valores são guardados: pontos igualmente espaçados até o maior
+    vencimento, mais cada vencimento, o dia da comparação e os marcos da tabela de IR.
+    """
+    dias_maximo = max(dias_vencimentos)
+    marcos_ir = [dia for dia in (180, 181, 360, 361, 720, 721) if dia <= dias_maximo]
+    return np.unique(np.concatenate((
+        np.linspace(0, dias_maximo, pontos).round(),
+        dias_vencimentos, [dias_comparacao], marcos_ir
+    ))).astype(np.int32)
+
+def simular_taxas_cdi(taxa_cdi_inicial, taxa_cdi_longo_prazo, velocidade_reversao, volatilidade, total_dias_uteis, numero_trajetorias, gerador, taxa_cdi_minima=0.0):
+    """
+    Gera trajetórias do CDI anual (%) por um modelo de reversão à média (Vasicek),
+    com a discretização exata por dia útil. velocidade_reversao é anual e volatilidade
+    é em pontos percentuais ao ano. Retorna uma matriz dias úteis x trajetórias,
+    limitada inferiormente por taxa_cdi_minima.
+    """
+    dt = 1 / 252
+    persistencia = np.exp(-velocidade_reversao * dt)
+    if velocidade_reversao > 0:
+        desvio = volatilidade * np.sqrt((1 - persistencia**2) / (2 * velocidade_reversao))
+    else:
+        desvio = volatilidade * np.sqrt(dt)
+
+    # Os choques viram, no próprio array, o desvio em relação à taxa de longo prazo:
+    # x[t] = persistencia * x[t-1] + desvio * z[t] (linhas de dias úteis contíguas na memória)
+    taxas = gerador.standard_normal((total_dias_uteis, numero_trajetorias))
+    taxas *= desvio
+    if total_dias_uteis:
+        taxas[0] += (taxa_cdi_inicial - taxa_cdi_longo_prazo) * persistencia
+    anterior = np.empty(numero_trajetorias)
+    for dia in range(1, total_dias_uteis):
+        np.multiply(taxas[dia - 1], persistencia, out=anterior)
+        taxas[dia] += anterior
+    taxas += taxa_cdi_longo_prazo
+    return np.maximum(taxas, taxa_cdi_minima, out=taxas)
+
+def _simular_lote(argumentos):
+    """
+    Ponto de entrada dos processos do pool: simula um lote de trajetórias e devolve os
+    valores líquidos das pós-fixadas na grade (ofertas x trajetórias x dias, float32) e
+    quantas vezes cada oferta vence na data da comparação.
+    """
+    semente, numero_trajetorias, modelo, valor_inicial, taxas_pos, isentas_pos, dias_grade, dias_uteis_grade, indice_comparacao, valores_prefixadas_comparacao = argumentos
+    gerador = np.random.default_rng(semente)
+    taxas_diarias = taxas_cdi_diarias(simular_taxas_cdi(
+        total_dias_uteis=int(dias_uteis_grade.max()), numero_trajetorias=numero_trajetorias, gerador=gerador, **modelo
+    ))
+
+    valores = np.empty((len(taxas_pos), numero_trajetorias, len(dias_grade)), dtype=np.float32)
+    na_comparacao = np.empty((len(taxas_pos) + len(valores_prefixadas_comparacao), numero_trajetorias))
+    for indice, (taxa_aplicacao_cdi, isenta_ir) in enumerate(zip(taxas_pos, isentas_pos)):
+        fatores = acumular_fatores_cdi(taxas_diarias, taxa_aplicacao_cdi)[dias_uteis_grade]
+        valores_oferta = calcular_valor_liquido_por_fatores(valor_inicial, fatores, dias_grade[:, None], isenta_ir)
+        # Vencedor calculado em float64, antes da conversão
+        na_comparacao[indice] = valores_oferta[indice_comparacao]
+        valores[indice] = valores_oferta.T
+    na_comparacao[len(taxas_pos):] = np.asarray(valores_prefixadas_comparacao)[:, None]
+    vitorias = np.bincount(np.argmax(na_comparacao, axis=0), minlength=len(na_comparacao))
+    return valores, vitorias
+
+def _validar_tamanho(numero_trajetorias, tamanho_lote, pontos_grade, ofertas_pos):
+    """
+    Confere o tamanho da simulação antes de gerar qualquer trajetória: o lote
+    (ofertas x trajetórias x pontos da grade) e o total de valores simulados.
+    """
+    if numero_trajetorias < 1 or tamanho_lote < 1:
+        raise ValueError("O número de trajetórias e o tamanho do lote devem ser positivos.")
+    valores_por_trajetoria = max(ofertas_pos, 1) * pontos_grade
+    if min(tamanho_lote, numero_trajetorias) * valores_por_trajetoria > MAXIMO_VALORES_POR_LOTE:
+        raise ValueError(
+            f"Lote grande demais: {min(tamanho_lote, numero_trajetorias):,} trajetórias x {pontos_grade} pontos x "
+            f"{ofertas_pos} ofertas. Reduza o tamanho do lote.".replace(',', '.')
+        )
+    if numero_trajetorias * valores_por_trajetoria > MAXIMO_VALORES_SIMULADOS:
+        raise ValueError(
+            f"Simulação grande demais: {numero_trajetorias:,} trajetórias x {pontos_grade} pontos x "
+            f"{ofertas_pos} ofertas. Reduza o número de trajetórias ou de ofertas.".replace(',', '.')
+        )
+
+def _iniciar_histogramas(valores_lote):
+    """
+    Histogramas das pós-fixadas por ponto da grade, com as faixas tiradas do primeiro lote
+    (ofertas x trajetórias x pontos): a amplitude observada, alargada de metade para cada
+    lado e dividida em CLASSES_HISTOGRAMA classes, mais uma classe abaixo e outra acima da
+    faixa. O mínimo e o máximo de cada ponto são guardados para limitar essas duas classes.
+    """
+    minimo = valores_lote.min(axis=1).astype(np.float64)
+    maximo = valores_lote.max(axis=1).astype(np.float64)
+    amplitude = maximo - minimo
+    # Pontos sem dispersão (o dia 0): qualquer largura positiva serve
+    largura = np.where(amplitude > 0, 2 * amplitude / CLASSES_HISTOGRAMA, np.maximum(np.abs(minimo), 1.0) * 1e-9)
+    return {
+        'inicio': minimo - amplitude / 2,
+        'largura': largura,
+        'minimo': minimo,
+        'maximo': maximo,
+        'contagens': np.zeros(minimo.shape + (CLASSES_HISTOGRAMA + 2,), dtype=np.int64)
+    }
+
+def _acumular_histogramas(histogramas, valores_lote):
+    """
+    Soma aos histogramas os valores de um lote (ofertas x trajetórias x pontos).
+    """
+    ofertas, _, pontos = valores_lote.shape
+    # Classe 0: abaixo da faixa; 1..CLASSES_HISTOGRAMA: dentro; CLASSES_HISTOGRAMA + 1: acima
+    classes = np.floor((valores_lote - histogramas['inicio'][:, None, :]) / histogramas['largura'][:, None, :])
+    classes = np.clip(classes, -1, CLASSES_HISTOGRAMA).astype(np.int64) + 1
+    celulas = np.arange(ofertas)[:, None, None] * pontos + np.arange(pontos)[None, None, :]
+    contagens = histogramas['contagens']
+    contagens += np.bincount(
+        (celulas * contagens.shape[-1] + classes).ravel(), minlength=contagens.size
+    ).reshape(contagens.shape)
+    np.minimum(histogramas['minimo'], valores_lote.min(axis=1), out=histogramas['minimo'])
+    np.maximum(histogramas['maximo'], valores_lote.max(axis=1), out=histogramas['maximo'])
+
+def _percentis_dos_histogramas(histogramas, percentis, total):
+    """
+    Percentis (matriz len(percentis) x ofertas x pontos) dos histogramas acumulados, pela
+    mesma posição de np.percentile (interpolação linear), interpolando dentro da classe.
+    """
+    contagens = histogramas['contagens']
+    acumuladas = np.cumsum(contagens, axis=-1)
+    inicio, largura = histogramas['inicio'], histogramas['largura']
+    resultado = np.empty((len(percentis),) + contagens.shape[:-1])
+    for posicao, percentil in enumerate(percentis):
+        posto = percentil / 100 * (total - 1)
+        classe = np.count_nonzero(acumuladas <= posto, axis=-1)
+        na_classe = np.take_along_axis(contagens, classe[..., None], axis=-1)[..., 0]
+        antes = np.take_along_axis(acumuladas, classe[..., None], axis=-1)[..., 0] - na_classe
+        fracao = np.clip((posto - antes + 0.5) / na_classe, 0.0, 1.0)
+        borda_inferior = np.where(classe == 0, histogramas['minimo'], inicio + (classe - 1) * largura)
+        borda_superior = np.where(classe == CLASSES_HISTOGRAMA + 1, histogramas['maximo'], inicio + classe * largura)
+        resultado[posicao] = borda_inferior + fracao * (borda_superior - borda_inferior)
+    return np.clip(resultado, histogramas['minimo'], histogramas['maximo'])
+
+def _lotes_simulados(argumentos, processos):
+    """
+    Simula os lotes em ordem; com processos > 1, mantém no máximo 2 lotes por processo em andamento.
+    """
+    if processos <= 1:
+        for argumento in argumentos:
+            yield _simular_lote(argumento)
+        return
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        em_andamento = deque()
+        for argumento in argumentos:
+            em_andamento.append(executor.submit(_simular_lote, argumento))
+            if len(em_andamento) >= 2 * processos:
+                yield em_andamento.popleft().result()
+        while em_andamento:
+            yield em_andamento.popleft().result()
+
+def simular_cenarios_cdi(
+    carteira_ofertas, valor_inicial, data_vencimento_comparativa,
+    taxa_cdi_inicial, taxa_cdi_longo_prazo, velocidade_reversao, volatilidade, taxa_cdi_minima=0.0,
+    numero_trajetorias=10_000, semente=None, tamanho_lote=TAMANHO_LOTE_PADRAO, processos=1,
+    pontos=PONTOS_GRADE_PADRAO
+):
+    """
+    Simulação de Monte Carlo do CDI: roda todas as ofertas da carteira (carteira.montar_carteira)
+    em todas as trajetórias e retorna um dicionário com:
+    - 'probabilidade_vitoria': {nome: probabilidade de ter o maior valor líquido na data comparativa};
+    - 'bandas': {nome: {'dias': dias corridos, 'percentis': matriz len(PERCENTIS) x dias}}, até o vencimento de cada aplicação;
+    - 'percentis', 'dias_comparacao' e 'numero_trajetorias'.
+
+    As trajetórias são processadas em lotes de tamanho_lote e podem ser distribuídas em
+    processos. Cada lote é reduzido assim que chega (contagem de vitórias e histogramas por
+    ponto da grade, ver _iniciar_histogramas), então a memória não cresce com
+    numero_trajetorias; os percentis saem dos histogramas, com erro menor que a largura de
+    uma classe. Cada lote tem sua própria semente derivada de semente, então o resultado é
+    o mesmo com qualquer número de processos.
+    Levanta ValueError se o lote ou o total de valores simulados passar dos limites
+    (MAXIMO_VALORES_POR_LOTE e MAXIMO_VALORES_SIMULADOS).
+    """
+    data_inicio = carteira_ofertas['data_inicio']
+    nomes = carteira_ofertas['nomes']
+    dias_vencimentos = carteira_ofertas['dias_corridos']
+    dias_comparacao = (data_vencimento_comparativa - data_inicio).days
+
+    dias_grade = _grade_da_simulacao(dias_vencimentos.tolist(), dias_comparacao, pontos)
+    _validar_tamanho(numero_trajetorias, tamanho_lote, len(dias_grade), int(np.count_nonzero(carteira_ofertas['indexado_cdi'])))
+    dias_uteis_grade = dias_uteis_no_prazo(data_inicio, dias_grade)
+    indice_comparacao = int(np.searchsorted(dias_grade, dias_comparacao))
+
+    indexado_cdi = carteira_ofertas['indexado_cdi']
+    indices_pos = np.flatnonzero(indexado_cdi)
+    indices_pre = np.flatnonzero(~indexado_cdi)
+    # As pré-fixadas não dependem do CDI: um único cálculo vale para todas as trajetórias
+    # (a evolução diária tem a linha inicial duplicada, daí o deslocamento de 1)
+    evolucao_prefixadas = calcular_evolucao_carteira(selecionar_ofertas(carteira_ofertas, ~indexado_cdi), valor_inicial, taxa_cdi_inicial)
+    valores_prefixadas = evolucao_prefixadas['valor_liquido'][:, np.minimum(dias_grade, evolucao_prefixadas['dias'][-1]) + 1]
+
+    modelo = {
+        'taxa_cdi_inicial': taxa_cdi_inicial,
+        'taxa_cdi_longo_prazo': taxa_cdi_longo_prazo,
+        'velocidade_reversao': velocidade_reversao,
+        'volatilidade': volatilidade,
+        'taxa_cdi_minima': taxa_cdi_minima
+    }
+    tamanhos_lotes = [min(tamanho_lote, numero_trajetorias - inicio) for inicio in range(0, numero_trajetorias, tamanho_lote)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos_lotes))
+    argumentos = (
+        (
+            semente_lote, tamanho, modelo, valor_inicial,
+            carteira_ofertas['taxas'][indices_pos], carteira_ofertas['isenta_ir'][indices_pos],
+            dias_grade, dias_uteis_grade, indice_comparacao, valores_prefixadas[:, indice_comparacao]
+        )
+        for semente_lote, tamanho in zip(sementes, tamanhos_lotes)
+    )
+
+    vitorias = np.zeros(len(nomes), dtype=np.int64)
+    ordem_ofertas = np.concatenate((indices_pos, indices_pre))
+    histogramas = None
+    for valores_lote, vitorias_lote in _lotes_simulados(argumentos, processos):
+        # Cada lote é reduzido assim que chega (vitórias e histogramas) e descartado
+        if histogramas is None:
+            histogramas = _iniciar_histogramas(valores_lote)
+        _acumular_histogramas(histogramas, valores_lote)
+        vitorias[ordem_ofertas] += vitorias_lote
+    if histogramas is not None:
+        percentis_pos = _percentis_dos_histogramas(histogramas, PERCENTIS, numero_trajetorias)
+
+    bandas = {}
+    for posicao, indice in enumerate(ordem_ofertas.tolist()):
+        ate_vencimento = dias_grade <= dias_vencimentos[indice]
+        if posicao < len(indices_pos):
+            percentis = percentis_pos[:, posicao, ate_vencimento]
+        else:
+            percentis = np.tile(valores_prefixadas[posicao - len(indices_pos), ate_vencimento], (len(PERCENTIS), 1))
+        bandas[nomes[indice]] = {'dias': dias_grade[ate_vencimento], 'percentis': percentis}
+
+    return {
+        'probabilidade_vitoria': dict(zip(nomes, (vitorias / max(numero_trajetorias, 1)).tolist())),
+        'bandas': {nome: bandas[nome] for nome in nomes},
+        'percentis': PERCENTIS,
+        'dias_comparacao': dias_comparacao,
+        'numero_trajetorias': numero_trajetorias
+    }
@@ -0,0 +1,127 @@
+# tests/test_api_comparacao.py
+import json
+import math
+import socket
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+import calculations
+from api_comparacao import _sem_nao_finitos, comparar_lote, iniciar_servidor
+from calendario import dias_uteis_entre
+
+
+def test_estouro_numerico_vira_null():
+    resultado, = comparar_lote([{
+        'taxa_cdi_anual': 1e308, 'data_inicio': '2025-01-02',
+        'ofertas': [{'tipo': 'pos_tributada', 'taxa': 100, 'prazo_dias': 365}, {'tipo': 'pre', 'taxa': 12, 'prazo_dias': 30}]
+    }])
+    assert resultado['ofertas'][0]['rendimento_liquido'] is None
+    assert resultado['melhor_prazo_total'] == 'Aplicação 2'
+    json.dumps(resultado, allow_nan=False)
+
+
+@pytest.mark.parametrize('campo', ['valor', 'taxa_cdi_anual'])
+@pytest.mark.parametrize('numero', [math.nan, math.inf])
+def test_entradas_nao_finitas_sao_rejeitadas(campo, numero):
+    with pytest.raises(ValueError, match='finitos'):
+        comparar_lote([{campo: numero, 'ofertas': [{'tipo': 'pre', 'taxa': 12, 'prazo_dias': 30}]}])
+
+
+def test_sem_nao_finitos_percorre_o_corpo():
+    assert _sem_nao_finitos({'a': [1.0, math.nan, (math.inf, 'x')], 'b': -math.inf}) == {'a': [1.0, None, [None, 'x']], 'b': None}
+
+
+# --- Servidor real em localhost ---
+
+INICIO = date(2025, 1, 2)
+
+
+@pytest.fixture
+def servidor():
+    servidor = iniciar_servidor(porta=0)
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(url, corpo=None):
+    dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+    with urllib.request.urlopen(urllib.request.Request(url, data=dados), timeout=10) as resposta:
+        return resposta.status, json.loads(resposta.read())
+
+
+def _comparacao(taxa_cdi_anual, prazo_dias):
+    return {
+        'valor': 10_000, 'taxa_cdi_anual': taxa_cdi_anual, 'data_inicio': INICIO.isoformat(),
+        'ofertas': [
+            {'nome': 'CDB', 'tipo': 'pos_tributada', 'taxa': 105, 'prazo_dias': prazo_dias},
+            {'nome': 'Pré', 'tipo': 'pre', 'taxa': 13.5, 'prazo_dias': prazo_dias + 90},
+        ]
+    }
+
+
+def _conferir_com_calculations(resultado, taxa_cdi_anual, prazo_dias):
+    cdb, pre = resultado['ofertas']
+    esperado_cdb = calculations.calcular_rendimento_pos_fixado(
+        10_000, 105, dias_uteis_entre(INICIO, INICIO + timedelta(days=prazo_dias)), taxa_cdi_anual,
+        prazo_dias_corridos_para_ir=prazo_dias, data_inicio=INICIO
+    )
+    esperado_pre = calculations.calcular_rendimento_prefixado(10_000, 13.5, prazo_dias + 90)
+    for oferta, esperado in ((cdb, esperado_cdb), (pre, esperado_pre)):
+        assert oferta['valor_final_liquido'] == pytest.approx(esperado[0], abs=0.01)
+        assert oferta['rendimento_liquido'] == pytest.approx(esperado[1], abs=0.01)
+        assert oferta['aliquota_ir'] == pytest.approx(esperado[2])
+
+
+def test_requisicoes_paralelas_conferem_com_calculations(servidor):
+    casos = [(taxa_cdi_anual, prazo_dias) for taxa_cdi_anual in (10.0, 14.65) for prazo_dias in (30, 181, 400, 721)]
+    lote = {'comparacoes': [_comparacao(*caso) for caso in casos]}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        individuais = [executor.submit(_pedir, servidor + '/comparar', _comparacao(*caso)) for caso in casos]
+        lotes = [executor.submit(_pedir, servidor + '/comparar/lote', lote) for _ in range(4)]
+        for caso, futuro in zip(casos, individuais):
+            status, resultado = futuro.result()
+            assert status == 200
+            _conferir_com_calculations(resultado, *caso)
+        for futuro in lotes:
+            status, corpo = futuro.result()
+            assert status == 200
+            for caso, resultado in zip(casos, corpo['resultados']):
+                _conferir_com_calculations(resultado, *caso)
+
+    status, metricas = _pedir(servidor + '/metricas')
+    assert status == 200
+    assert metricas['/comparar']['requisicoes'] == len(casos)
+    assert metricas['/comparar/lote']['requisicoes'] == 4
+    for rota in ('/comparar', '/comparar/lote'):
+        assert {'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'} <= set(metricas[rota])
+        assert 0 <= metricas[rota]['p50_ms'] <= metricas[rota]['p95_ms'] <= metricas[rota]['p99_ms'] <= metricas[rota]['max_ms']
+
+
+def test_cliente_lento_nao_bloqueia_os_demais(servidor):
+    # Um cliente anuncia o corpo e envia só o começo: a thread dele fica esperando,
+    # mas as outras requisições continuam sendo atendidas
+    corpo = json.dumps(_comparacao(14.65, 365)).encode('utf-8')
+    host, porta = servidor.removeprefix('http://').split(':')
+    with socket.create_connection((host, int(porta)), timeout=10) as lento:
+        lento.sendall(b'POST /comparar HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n' % len(corpo) + corpo[:10])
+        status, resultado = _pedir(servidor + '/comparar', _comparacao(14.65, 365))
+        assert status == 200
+        _conferir_com_calculations(resultado, 14.65, 365)
+        assert _pedir(servidor + '/saude') == (200, {'status': 'ok'})
+
+        lento.sendall(corpo[10:])
+        assert lento.makefile('rb').readline().startswith(b'HTTP/1.1 200')
+
+
+def test_encerramento_libera_a_porta():
+    servidor = iniciar_servidor(porta=0)
+    porta = servidor.server_address[1]
+    assert _pedir(f"http://127.0.0.1:{porta}/saude")[0] == 200
+    servidor.shutdown()
+    servidor.server_close()
+    with pytest.raises(OSError):
+        socket.create_connection(('127.0.0.1', porta), timeout=2).close()
@@ -0,0 +1,76 @@
+# tests/test_calendario.py
+from datetime import date
+
+import pytest
+
+from calendario import (
+    adicionar_dias_uteis,
+    calcular_pascoa,
+    dias_uteis_entre,
+    dias_uteis_no_prazo,
+    eh_dia_util,
+    feriados_do_ano,
+)
+
+
+@pytest.mark.parametrize('ano, pascoa', [
+    (2000, date(2000, 4, 23)),
+    (2024, date(2024, 3, 31)),
+    (2025, date(2025, 4, 20)),
+    (2026, date(2026, 4, 5)),
+    (2038, date(2038, 4, 25)),
+])
+def test_pascoa(ano, pascoa):
+    assert calcular_pascoa(ano) == pascoa
+
+
+def test_feriados_moveis_de_2025():
+    feriados = feriados_do_ano(2025)
+    for feriado in (date(2025, 3, 3), date(2025, 3, 4), date(2025, 4, 18), date(2025, 6, 19)):
+        assert feriado in feriados
+
+
+def test_consciencia_negra_so_a_partir_de_2024():
+    assert date(2023, 11, 20) not in feriados_do_ano(2023)
+    assert date(2024, 11, 20) in feriados_do_ano(2024)
+    assert eh_dia_util(date(2023, 11, 20))
+    assert not eh_dia_util(date(2025, 11, 20))
+
+
+def test_natal_e_fim_de_semana_nao_sao_dias_uteis():
+    assert not eh_dia_util(date(2025, 12, 25))
+    assert not eh_dia_util(date(2025, 12, 27))
+    assert eh_dia_util(date(2025, 12, 24))
+
+
+def test_prazo_conta_dias_depois_do_inicio():
+    # Sexta-feira: sábado e domingo não contam, a segunda conta
+    sexta = date(2025, 10, 17)
+    assert dias_uteis_no_prazo(sexta, 1) == 0
+    assert dias_uteis_no_prazo(sexta, 2) == 0
+    assert dias_uteis_no_prazo(sexta, 3) == 1
+    # Véspera de Natal numa quarta: 25 é feriado, 26 é útil
+    assert dias_uteis_no_prazo(date(2024, 12, 24), 1) == 0
+    assert dias_uteis_no_prazo(date(2024, 12, 24), 2) == 1
+
+
+def test_ano_inteiro_desconta_feriados_em_dias_de_semana():
+    inicio, fim = date(2024, 12, 31), date(2025, 12, 31)
+    dias_semana = sum(1 for n in range(1, (fim - inicio).days + 1) if date.fromordinal(inicio.toordinal() + n).weekday() < 5)
+    feriados_semana = sum(1 for feriado in feriados_do_ano(2025) if feriado.weekday() < 5)
+    assert dias_uteis_entre(inicio, fim) == dias_semana - feriados_semana
+
+
+def test_adicionar_dias_uteis_pula_feriados():
+    assert adicionar_dias_uteis(date(2025, 12, 24), 1) == date(2025, 12, 26)
+
+
+@pytest.mark.parametrize('chamada', [
+    lambda: eh_dia_util(date(2100, 1, 4)),
+    lambda: dias_uteis_entre(date(1999, 12, 31), date(2000, 1, 3)),
+    lambda: dias_uteis_no_prazo(date(2099, 12, 1), 60),
+    lambda: adicionar_dias_uteis(date(2099, 12, 1), 100),
+])
+def test_fora_do_intervalo_do_calendario(chamada):
+    with pytest.raises(ValueError):
+        chamada()
@@ -0,0 +1,41 @@
+# tests/test_curva_cdi.py
+import io
+from datetime import date
+
+import pytest
+
+from curva_cdi import carregar_curva_cdi
+
+
+def _carregar(conteudo):
+    return carregar_curva_cdi(io.BytesIO(conteudo.encode('utf-8')))
+
+
+@pytest.mark.parametrize('conteudo', [
+    'data,taxa_cdi_anual\n2025-01-02,14.65\n2025-07-01,14.90\n',
+    'data;taxa_cdi_anual\n02/01/2025;14,65\n01/07/2025;14,90\n',
+    'data\ttaxa_cdi_anual\n2025-01-02\t14.65\n2025-07-01\t14.90\n',
+    '\ufeffdata,taxa_cdi_anual\n2025-01-02,14.65\n\n2025-07-01,14.90,sobra\n',
+])
+def test_formatos_aceitos(conteudo):
+    curva = _carregar(conteudo)
+    assert list(curva['datas']) == [date(2025, 1, 2), date(2025, 7, 1)]
+    assert list(curva['taxas_cdi_anual']) == pytest.approx([14.65, 14.90])
+
+
+@pytest.mark.parametrize('conteudo, mensagem', [
+    ('', 'colunas'),
+    ('data\n2025-01-02\n', 'colunas'),
+    ('data,taxa_cdi_anual\n', 'pelo menos um vértice'),
+    ('data,taxa_cdi_anual\n2025-01-02,abc\n', "Taxa inválida na curva de CDI: 'abc'"),
+    ('data,taxa_cdi_anual\n2025-01-02\n', 'Taxa inválida'),
+    ('data,taxa_cdi_anual\n2025-01-02,\n', 'Taxa inválida'),
+    ('data,taxa_cdi_anual\n2025-01-02,nan\n', 'Taxa inválida'),
+    ('data,taxa_cdi_anual\n2025-01-02,inf\n', 'Taxa inválida'),
+    ('data,taxa_cdi_anual\n2025-13-02,14.65\n', 'Data inválida'),
+    ('data,taxa_cdi_anual\n2025-01-02,-100\n', '-100%'),
+    ('data,taxa_cdi_anual\n2025-01-02,14.65\n2025-01-02,14.70\n', 'repetidas'),
+])
+def test_csv_invalido_vira_value_error(conteudo, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        _carregar(conteudo)
@@ -0,0 +1,25 @@
+# tests/test_processar_ofertas.py
+import json
+from datetime import date
+
+from processar_ofertas import processar_ofertas
+
+
+def test_resultados_indefinidos_saem_como_null(tmp_path):
+    entrada, saida = tmp_path / 'ofertas.jsonl', tmp_path / 'resultado.jsonl'
+    entrada.write_text(
+        '{"tipo": "pre", "taxa": 12, "prazo_dias": 365, "valor": 1000}\n'
+        '{"tipo": "pre", "taxa": 12, "prazo_dias": 365, "valor": 0}\n'
+        '{"tipo": "pre", "taxa": NaN, "prazo_dias": 365, "valor": 1000}\n'
+        '{"tipo": "pos_tributada", "taxa": 100, "prazo_dias": 0, "valor": 1000}\n',
+        encoding='utf-8'
+    )
+    processar_ofertas(str(entrada), str(saida), 14.65, data_base=date(2025, 1, 2))
+
+    texto = saida.read_text(encoding='utf-8')
+    assert 'NaN' not in texto and 'Infinity' not in texto
+    linhas = [json.loads(linha) for linha in texto.splitlines()]
+    assert [linha['ranking'] for linha in linhas] == [1, 2, 3, 4]
+    assert linhas[0]['rentabilidade_liquida_anual'] is not None
+    assert all(linha['rentabilidade_liquida_anual'] is None for linha in linhas[1:])
+    assert linhas[2]['taxa'] is None and linhas[2]['valor_final_liquido'] is None
@@ -0,0 +1,37 @@
+# tests/test_tributacao.py
+import numpy as np
+import pytest
+
+from tributacao import aliquota_iof, aliquota_ir, calcular_tributos
+
+
+@pytest.mark.parametrize('dias, aliquota', [
+    (1, 0.225), (180, 0.225), (181, 0.20), (360, 0.20),
+    (361, 0.175), (720, 0.175), (721, 0.15), (10_000, 0.15),
+])
+def test_faixas_do_ir(dias, aliquota):
+    assert aliquota_ir(dias) == pytest.approx(aliquota)
+
+
+@pytest.mark.parametrize('dias, aliquota', [(1, 0.96), (15, 0.50), (29, 0.03), (30, 0.0), (31, 0.0)])
+def test_iof_regressivo(dias, aliquota):
+    assert aliquota_iof(dias) == pytest.approx(aliquota)
+
+
+def test_isento_nao_paga_nada():
+    dias = np.array([1, 29, 30, 180, 721])
+    assert not aliquota_ir(dias, isenta_ir=True).any()
+    assert not aliquota_iof(dias, isenta_ir=True).any()
+    tributos = calcular_tributos(100.0, dias, isenta_ir=True)
+    np.testing.assert_array_equal(tributos['rendimento_liquido'], 100.0)
+
+
+def test_ir_incide_sobre_o_rendimento_sem_iof():
+    tributos = calcular_tributos(100.0, 29)
+    assert tributos['iof'] == pytest.approx(3.0)
+    assert tributos['imposto_renda'] == pytest.approx(97.0 * 0.225)
+    assert tributos['rendimento_liquido'] == pytest.approx(97.0 * 0.775)
+
+
+def test_perfil_por_elemento():
+    np.testing.assert_allclose(aliquota_ir([200, 200], isenta_ir=np.array([True, False])), [0.0, 0.20])
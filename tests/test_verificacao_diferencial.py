@@ -0,0 +1,60 @@
+# tests/test_verificacao_diferencial.py
+from datetime import date
+
+import numpy as np
+import pytest
+
+import carteira
+from verificacao_diferencial import FAIXA_INICIO, executar, reduzir_caso
+
+
+@pytest.mark.parametrize('semente', [0, 1])
+def test_caminhos_rapidos_iguais_a_referencia(semente):
+    relatorio = executar(grupos=30, grupos_evolucao=3, semente=semente, repeticoes=1)
+    assert relatorio['caminhos']
+    divergentes = {
+        nome: caminho['exemplos'] for nome, caminho in relatorio['caminhos'].items()
+        if caminho['divergencias']
+    }
+    assert not divergentes
+    assert all(caminho['casos'] > 0 for caminho in relatorio['caminhos'].values())
+
+
+def test_simulacao_equivalencia_e_evolucoes_em_cache_sao_verificadas():
+    caminhos = executar(grupos=5, grupos_evolucao=3, semente=0, repeticoes=1)['caminhos']
+    for nome in (
+        'simulacao_cdi.simular_cenarios_cdi[bandas]', 'simulacao_cdi.simular_cenarios_cdi[vitorias]',
+        'equivalencia.taxa_tributada_equivalente', 'equivalencia.taxa_prefixada_equivalente',
+        'equivalencia.cdi_equilibrio_prefixada', 'equivalencia.cdi_equilibrio_tributada',
+        'cache_calculos.calcular_evolucao_carteira', 'cache_calculos.calcular_evolucao_*',
+    ):
+        assert caminhos[nome]['casos'] > 0
+        assert caminhos[nome]['divergencias'] == 0
+
+
+def test_reducao_chega_ao_caso_mais_simples():
+    caso = {
+        'valor': 123456.78, 'taxa_cdi_anual': 14.6532, 'data_inicio': date(2041, 7, 9),
+        'tipo': 'pos_tributada', 'taxa': 103.25, 'dias': 3000
+    }
+    reduzido = reduzir_caso(caso, lambda candidato: candidato['dias'] >= 181 and candidato['taxa_cdi_anual'] > 10)
+    assert reduzido['dias'] == 181
+    assert reduzido['taxa_cdi_anual'] > 10 and reduzido['taxa_cdi_anual'] == round(reduzido['taxa_cdi_anual'])
+    assert reduzido['valor'] == 0.0 and reduzido['taxa'] == 0.0
+    assert reduzido['data_inicio'] == FAIXA_INICIO[0]
+
+
+def test_divergencia_injetada_e_reduzida(monkeypatch):
+    calcular_ofertas = carteira.calcular_ofertas
+
+    def com_erro_depois_de_400_dias(valores, tipos, taxas, prazos, *args, **kwargs):
+        resultado = calcular_ofertas(valores, tipos, taxas, prazos, *args, **kwargs)
+        resultado['valor_final_liquido'] = resultado['valor_final_liquido'] + np.where(np.asarray(prazos) > 400, 0.01, 0.0)
+        return resultado
+    monkeypatch.setattr(carteira, 'calcular_ofertas', com_erro_depois_de_400_dias)
+
+    caminho = executar(grupos=30, grupos_evolucao=1, semente=0, repeticoes=1, filtro='carteira.calcular_ofertas')['caminhos']['carteira.calcular_ofertas']
+    assert caminho['divergencias'] > 0
+    for exemplo in caminho['exemplos']:
+        assert exemplo['caso_reduzido']['dias'] == 401
+        assert exemplo['caso_reduzido']['valor'] == 0.0
@@ -0,0 +1,106 @@
+# tributacao.py
+# Tabelas de tributação declarativas. Mudar uma regra é editar uma tabela: os vetores
+# de alíquota por dia corrido são derivados delas e guardados na primeira consulta.
+from functools import lru_cache
+
+import numpy as np
+
+# Cada tabela é uma sequência de faixas (último dia corrido da faixa, alíquota);
+# a última faixa (None) vale para todos os prazos seguintes.
+TABELA_IR_REGRESSIVA = (
+    (180, 0.225),
+    (360, 0.20),
+    (720, 0.175),
+    (None, 0.15),
+)
+# IOF regressivo sobre o rendimento de resgates antes de 30 dias (dia 1: 96% ... dia 29: 3%)
+TABELA_IOF = tuple(
+    (dia, aliquota / 100) for dia, aliquota in enumerate((
+        96, 93, 90, 86, 83, 80, 76, 73, 70, 66, 63, 60, 56, 53, 50,
+        46, 43, 40, 36, 33, 30, 26, 23, 20, 16, 13, 10, 6, 3
+    ), start=1)
+) + ((None, 0.0),)
+TABELA_ISENTA = ((None, 0.0),)
+
+# Perfis de tributação: o IOF é cobrado primeiro e o IR incide sobre o rendimento já sem o IOF
+PERFIS_TRIBUTACAO = {
+    'tributado': {'ir': TABELA_IR_REGRESSIVA, 'iof': TABELA_IOF},
+    'isento': {'ir': TABELA_ISENTA, 'iof': TABELA_ISENTA},
+}
+
+def perfil_tributacao(isenta_ir):
+    """
+    Nome do perfil de tributação de um produto a partir do indicador de isenção.
+    """
+    return 'isento' if isenta_ir else 'tributado'
+
+@lru_cache(maxsize=None)
+def aliquotas_por_dia(tabela):
+    """
+    Vetor (somente leitura) com a alíquota de cada dia corrido, do dia 0 até o dia seguinte
+    ao último limite da tabela; dali em diante vale o último elemento.
+    """
+    limites = [limite for limite, _ in tabela if limite is not None]
+    dias = np.arange(max(limites, default=-1) + 2)
+    aliquotas = np.full(len(dias), tabela[-1][1], dtype=float)
+    # Percorre as faixas da última para a primeira: cada uma sobrescreve os dias até o seu limite
+    for limite, aliquota in reversed(tabela):
+        if limite is not None:
+            aliquotas[dias <= limite] = aliquota
+    aliquotas.setflags(write=False)
+    return aliquotas
+
+def aplicar_tabela(tabela, dias_corridos):
+    """
+    Alíquotas da tabela para um array de dias corridos (leitura por índice no vetor pré-calculado).
+    """
+    vetor = aliquotas_por_dia(tabela)
+    return vetor[np.clip(np.asarray(dias_corridos), 0, len(vetor) - 1)]
+
+def _por_perfil(chave, dias_corridos, isenta_ir):
+    """
+    Alíquotas do imposto chave ('ir' ou 'iof'), escolhendo o perfil por elemento quando
+    isenta_ir é um array (combinado com dias_corridos por broadcasting).
+    """
+    return np.where(
+        np.asarray(isenta_ir, dtype=bool),
+        aplicar_tabela(PERFIS_TRIBUTACAO['isento'][chave], dias_corridos),
+        aplicar_tabela(PERFIS_TRIBUTACAO['tributado'][chave], dias_corridos)
+    )
+
+def aliquota_ir(dias_corridos, isenta_ir=False):
+    """
+    Alíquota de IR por prazo em dias corridos (vetorizada).
+    """
+    return _por_perfil('ir', dias_corridos, isenta_ir)
+
+def aliquota_iof(dias_corridos, isenta_ir=False):
+    """
+    Alíquota de IOF por prazo em dias corridos (vetorizada).
+    """
+    return _por_perfil('iof', dias_corridos, isenta_ir)
+
+def fracao_liquida(dias_corridos, isenta_ir=False):
+    """
+    Fração do rendimento bruto que fica com o investidor depois de IOF e IR.
+    """
+    return (1 - aliquota_iof(dias_corridos, isenta_ir)) * (1 - aliquota_ir(dias_corridos, isenta_ir))
+
+def calcular_tributos(rendimento_bruto, dias_corridos, isenta_ir=False):
+    """
+    Aplica IOF e IR ao rendimento bruto (arrays combináveis por broadcasting).
+    Retorna um dicionário com 'aliquota_iof', 'iof', 'aliquota_ir', 'imposto_renda'
+    e 'rendimento_liquido'.
+    """
+    rendimento_bruto = np.asarray(rendimento_bruto, dtype=float)
+    aliquota_iof_dias = aliquota_iof(dias_corridos, isenta_ir)
+    aliquota_ir_dias = aliquota_ir(dias_corridos, isenta_ir)
+    iof = rendimento_bruto * aliquota_iof_dias
+    imposto_renda = (rendimento_bruto - iof) * aliquota_ir_dias
+    return {
+        'aliquota_iof': aliquota_iof_dias,
+        'iof': iof,
+        'aliquota_ir': aliquota_ir_dias,
+        'imposto_renda': imposto_renda,
+        'rendimento_liquido': rendimento_bruto - iof - imposto_renda
+    }
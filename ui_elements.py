@@ -1,16 +1,38 @@
 # ui_elements.py
+import functools
+import os
 import streamlit as st
 from datetime import date, timedelta
-import pandas as pd
-import plotly.express as px
 
-# Importar as funções de cálculo necessárias
-from calculations import (
-    calcular_rendimento_pos_fixado, 
-    calcular_rendimento_prefixado,
-    gerar_evolucao_pos_fixada,
-    gerar_evolucao_prefixada
-)
+from perfilamento import etapa_medida
+from produtos import TIPOS_PRODUTO, unidade_da_taxa
+
+# pandas e plotly.express são importados dentro das funções de gráfico: o formulário
+# de entrada é renderizado sem eles (ver inicializacao.py).
+
+# Acima deste número de pontos, o gráfico de evolução usa traços WebGL (scattergl)
+LIMITE_PONTOS_WEBGL = 1500
+
+# Aplicações pré-preenchidas no formulário (as duas primeiras aparecem por padrão)
+OFERTAS_PADRAO = [
+    {'nome': 'Pós-Fixada Tributada', 'tipo': 'pos_tributada', 'taxa': 100.0},
+    {'nome': 'Pós-Fixada Isenta', 'tipo': 'pos_isenta', 'taxa': 95.0},
+    {'nome': 'Pré-fixada', 'tipo': 'pre', 'taxa': 15.0},
+]
+QUANTIDADE_OFERTAS_PADRAO = 2
+VALOR_APLICAR_PADRAO = 10000.00
+TAXA_CDI_PADRAO = 14.65
+PRAZO_PADRAO_DIAS = 365
+MAXIMO_OFERTAS = 30
+CORES_APLICACOES_PADRAO = {
+    'Pós-Fixada Tributada': 'lightseagreen',
+    'Pós-Fixada Isenta': 'darkorange',
+    'Pré-fixada': 'cornflowerblue'
+}
+PALETA_CORES = [
+    'crimson', 'mediumpurple', 'goldenrod', 'seagreen', 'hotpink', 'steelblue', 'sienna',
+    'olivedrab', 'slateblue', 'tomato', 'teal', 'orchid', 'darkkhaki', 'royalblue', 'peru'
+]
 
 def apply_custom_css():
     """Aplica estilos CSS personalizados para o layout do Streamlit."""
@@ -38,6 +60,7 @@ def apply_custom_css():
         unsafe_allow_html=True
     )
 
+@etapa_medida
 def render_logo_and_separator():
     """Renderiza o logo da empresa e uma linha separadora."""
     #col_left, col_center, col_right = st.columns([0.33, 0.66, 0.33])
@@ -46,119 +69,251 @@ def render_logo_and_separator():
     #st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
 
 
+@etapa_medida
 def render_main_title_and_intro():
     """Renderiza o título principal e a introdução."""
     st.title("💰 Comparador de Renda Fixa:")
     st.markdown("Compare o rendimento líquido de aplicações tributadas (IR regressivo) e isentas (LCI, LCA, CRI, CRA).")
 
-def render_input_forms():
+def _oferta_padrao(indice):
+    """Valores iniciais do formulário para a aplicação de posição indice."""
+    if indice < len(OFERTAS_PADRAO):
+        return OFERTAS_PADRAO[indice]
+    return {'nome': f"Aplicação {indice + 1}", 'tipo': 'pos_tributada', 'taxa': 100.0}
+
+def entradas_padrao(data_inicio=None):
+    """
+    Entradas que o formulário mostra sem nenhuma edição, no formato de render_input_forms:
+    (valor_aplicar, ofertas, taxa_cdi_anual_atual).
+    """
+    data_vencimento = (data_inicio or date.today()) + timedelta(days=PRAZO_PADRAO_DIAS)
+    ofertas = [
+        {**_oferta_padrao(indice), 'data_vencimento': data_vencimento}
+        for indice in range(QUANTIDADE_OFERTAS_PADRAO)
+    ]
+    return VALOR_APLICAR_PADRAO, ofertas, TAXA_CDI_PADRAO
+
+@etapa_medida
+def render_input_forms(ao_alterar_oferta=None):
     """
-    Renderiza os formulários de entrada de dados e retorna os valores inseridos pelo usuário.
+    Renderiza os formulários de entrada de dados e retorna os valores inseridos pelo usuário:
+    o valor aplicado, a lista de ofertas (dicionários com 'nome', 'tipo', 'taxa' e
+    'data_vencimento') e a taxa do CDI.
+    ao_alterar_oferta(indice), se informado, é o callback da taxa e do vencimento de cada
+    oferta (no app, reexecuta só os fragmentos afetados, ver app.redesenhar_oferta).
     """
     st.header("Dados da Aplicação")
 
     valor_aplicar = st.number_input(
         "Valor a ser aplicado (R$)", 
         min_value=1.0, 
-        value=10000.00, 
+        value=VALOR_APLICAR_PADRAO, 
         step=100.0, 
         format="%.2f",
         key="valor_aplicar_input"
     )
 
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("Aplicação Pós-Fixada Tributada")
-        taxa_aplicacao_tributada_cdi = st.slider(
-            "Taxa (% do CDI)", 
-            min_value=80, 
-            max_value=130, 
-            value=100, 
-            step=1,
-            key="taxa_tributada_slider"
-        )
-        data_vencimento_tributada = st.date_input(
-            "Data de Vencimento", 
-            date.today() + timedelta(days=365),
-            min_value=date.today(),
-            format="DD/MM/YYYY",
-            key="data_vencimento_tributada_input"
-        )
-
-    with col2:
-        st.subheader("Aplicação Pós-Fixada Isenta")
-        taxa_aplicacao_isenta_cdi = st.slider(
-            "Taxa (% do CDI)", 
-            min_value=70, 
-            max_value=120, 
-            value=95, 
-            step=1,
-            key="taxa_isenta_slider"
-        )
-        data_vencimento_isenta = st.date_input(
-            "Data de Vencimento", 
-            date.today() + timedelta(days=365),
-            min_value=date.today(),
-            format="DD/MM/YYYY",
-            key="data_vencimento_isenta_input"
-        )
-
-    st.markdown("---")
-    st.subheader("Aplicação Pré-Fixada (Opcional)")
-    enable_prefixada = st.checkbox("Incluir Aplicação Pré-Fixada na Comparação", value=False)
-
-    taxa_aplicacao_prefixada_anual = 0.0
-    data_vencimento_prefixada = None
-
-    if enable_prefixada:
-        taxa_aplicacao_prefixada_anual = st.number_input(
-            "Taxa Anual Acordada (% a.a.)",
-            min_value=0.01,
-            value=15.00,
-            step=0.01,
-            format="%.2f",
-            key="taxa_prefixada_input"
-        )
-        data_vencimento_prefixada = st.date_input(
-            "Data de Vencimento Pré-Fixada",
-            date.today() + timedelta(days=365),
-            min_value=date.today(),
-            format="DD/MM/YYYY",
-            key="data_vencimento_prefixada_input"
-        )
+    st.subheader("Aplicações a Comparar")
+    quantidade_ofertas = st.number_input(
+        "Quantidade de aplicações",
+        min_value=1,
+        max_value=MAXIMO_OFERTAS,
+        value=QUANTIDADE_OFERTAS_PADRAO,
+        step=1,
+        key="quantidade_ofertas_input"
+    )
+    tipos = list(TIPOS_PRODUTO)
+    ofertas = []
+    for indice in range(int(quantidade_ofertas)):
+        padrao = _oferta_padrao(indice)
+        col_nome, col_tipo, col_taxa, col_vencimento = st.columns([3, 3, 2, 2])
+        with col_nome:
+            nome = st.text_input("Nome", value=padrao['nome'], key=f"oferta_{indice}_nome_input")
+        with col_tipo:
+            tipo = st.selectbox(
+                "Tipo",
+                tipos,
+                index=tipos.index(padrao['tipo']),
+                format_func=lambda tipo: TIPOS_PRODUTO[tipo]['rotulo'],
+                key=f"oferta_{indice}_tipo_select"
+            )
+        with col_taxa:
+            taxa = st.number_input(
+                f"Taxa ({unidade_da_taxa(tipo)})",
+                min_value=0.01,
+                value=float(padrao['taxa']),
+                step=1.0 if TIPOS_PRODUTO[tipo]['indexador'] == 'cdi' else 0.01,
+                format="%.2f",
+                key=f"oferta_{indice}_taxa_input",
+                on_change=ao_alterar_oferta,
+                args=(indice,)
+            )
+        with col_vencimento:
+            data_vencimento = st.date_input(
+                "Vencimento",
+                date.today() + timedelta(days=PRAZO_PADRAO_DIAS),
+                min_value=date.today(),
+                format="DD/MM/YYYY",
+                key=f"oferta_{indice}_vencimento_input",
+                on_change=ao_alterar_oferta,
+                args=(indice,)
+            )
+        ofertas.append({'nome': nome, 'tipo': tipo, 'taxa': taxa, 'data_vencimento': data_vencimento})
 
     st.markdown("---")
     st.subheader("Parâmetros Gerais")
     taxa_cdi_anual_atual = st.number_input(
         "Taxa do CDI anual atual (%)", 
         min_value=0.01, 
-        value=14.65,
+        value=TAXA_CDI_PADRAO,
         step=0.01, 
         format="%.2f",
         key="taxa_cdi_anual_input"
     )
     
-    return (
-        valor_aplicar, 
-        taxa_aplicacao_tributada_cdi, 
-        data_vencimento_tributada, 
-        taxa_aplicacao_isenta_cdi, 
-        data_vencimento_isenta,
-        enable_prefixada,
-        taxa_aplicacao_prefixada_anual,
-        data_vencimento_prefixada,
-        taxa_cdi_anual_atual
-    )
+    return valor_aplicar, ofertas, taxa_cdi_anual_atual
+
+def ofertas_informadas():
+    """
+    Ofertas como estão agora nos widgets de render_input_forms, lidas do session_state.
+    Num fragmento reexecutado sozinho, os argumentos são os da última execução completa,
+    então as ofertas atuais vêm daqui.
+    """
+    return [
+        {
+            'nome': st.session_state[f"oferta_{indice}_nome_input"],
+            'tipo': st.session_state[f"oferta_{indice}_tipo_select"],
+            'taxa': st.session_state[f"oferta_{indice}_taxa_input"],
+            'data_vencimento': st.session_state[f"oferta_{indice}_vencimento_input"]
+        }
+        for indice in range(int(st.session_state["quantidade_ofertas_input"]))
+    ]
+
+def cores_das_aplicacoes(nomes):
+    """
+    Associa uma cor a cada aplicação: as três aplicações padrão mantêm suas cores
+    e as demais recebem, em ordem, as cores da paleta.
+    """
+    cores = {}
+    paleta = (cor for cor in PALETA_CORES if cor not in CORES_APLICACOES_PADRAO.values())
+    for nome in nomes:
+        cores[nome] = CORES_APLICACOES_PADRAO.get(nome) or next(paleta, 'gray')
+    return cores
 
-def render_results_summary(valor_aplicar, taxa_cdi_anual_atual):
+def render_cdi_curve_input():
+    """
+    Renderiza o envio opcional de uma curva de CDI (CSV com as colunas 'data' e 'taxa_cdi_anual').
+    Retorna o arquivo enviado (ou None) e o tipo de interpolação ('degrau' ou 'linear').
+    """
+    with st.expander("Curva de CDI (opcional)"):
+        st.caption(
+            "Envie um CSV com as colunas **data** e **taxa_cdi_anual** (% a.a.) para projetar as "
+            "aplicações pós-fixadas com um CDI que varia no tempo. Cada taxa vale a partir da sua data; "
+            "antes do primeiro e depois do último vértice, as taxas das pontas são mantidas."
+        )
+        arquivo_curva = st.file_uploader("Arquivo CSV da curva", type=["csv"], key="curva_cdi_uploader")
+        interpolacao_linear = st.checkbox(
+            "Interpolar linearmente entre as datas (curva a termo)", value=False, key="curva_cdi_linear_checkbox"
+        )
+    return arquivo_curva, 'linear' if interpolacao_linear else 'degrau'
+
+def render_simulation_controls(taxa_cdi_anual_atual):
+    """
+    Renderiza os parâmetros da simulação de Monte Carlo do CDI.
+    Retorna um dicionário com os parâmetros, ou None se a simulação estiver desligada.
+    """
+    with st.expander("Simulação de cenários do CDI (Monte Carlo)"):
+        ativar = st.checkbox("Simular trajetórias aleatórias do CDI", value=False, key="simulacao_cdi_checkbox")
+        st.caption(
+            "O CDI parte da taxa atual e oscila em torno de uma taxa de longo prazo (modelo de reversão à média). "
+            "A pré-fixada não depende do CDI."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            taxa_cdi_longo_prazo = st.number_input(
+                "CDI de longo prazo (% a.a.)", min_value=0.0, value=float(taxa_cdi_anual_atual), step=0.25,
+                format="%.2f", key="simulacao_cdi_longo_prazo_input"
+            )
+            volatilidade = st.number_input(
+                "Volatilidade (p.p. ao ano)", min_value=0.0, value=2.0, step=0.25,
+                format="%.2f", key="simulacao_volatilidade_input"
+            )
+        with col2:
+            velocidade_reversao = st.number_input(
+                "Velocidade de reversão (ao ano)", min_value=0.0, value=0.5, step=0.1,
+                format="%.2f", key="simulacao_velocidade_reversao_input"
+            )
+            numero_trajetorias = st.select_slider(
+                "Número de trajetórias", options=[1_000, 5_000, 10_000, 50_000, 100_000], value=10_000,
+                key="simulacao_trajetorias_slider"
+            )
+    if not ativar:
+        return None
+    return {
+        'taxa_cdi_longo_prazo': taxa_cdi_longo_prazo,
+        'velocidade_reversao': velocidade_reversao,
+        'volatilidade': volatilidade,
+        'numero_trajetorias': numero_trajetorias
+    }
+
+def render_reinvestment_controls():
+    """
+    Renderiza as opções de reinvestimento até o vencimento mais longo.
+    Retorna um dicionário com 'mesmas_condicoes' e, se a reaplicação for noutra aplicação,
+    'tipo', 'taxa' e 'prazo_dias'; ou None se o reinvestimento estiver desligado.
+    """
+    with st.expander("Reinvestimento até o vencimento mais longo"):
+        ativar = st.checkbox(
+            "Reaplicar as aplicações mais curtas até o vencimento mais longo", value=False, key="reinvestimento_checkbox"
+        )
+        st.caption(
+            "No vencimento, o valor líquido é reaplicado (e o IR recomeça do zero) até a data do vencimento "
+            "mais longo, quando a última reaplicação é resgatada."
+        )
+        reaplicar_em = st.radio(
+            "Reaplicar em", ["Mesmas condições", "Outra aplicação"], horizontal=True, key="reinvestimento_modo_radio"
+        )
+        tipos = list(TIPOS_PRODUTO)
+        col_tipo, col_taxa, col_prazo = st.columns([3, 2, 2])
+        with col_tipo:
+            tipo = st.selectbox(
+                "Tipo", tipos, format_func=lambda tipo: TIPOS_PRODUTO[tipo]['rotulo'], key="reinvestimento_tipo_select"
+            )
+        with col_taxa:
+            taxa = st.number_input(
+                f"Taxa ({unidade_da_taxa(tipo)})", min_value=0.01, value=100.0, step=1.0, format="%.2f",
+                key="reinvestimento_taxa_input"
+            )
+        with col_prazo:
+            prazo_dias = st.number_input(
+                "Prazo (dias)", min_value=1, value=PRAZO_PADRAO_DIAS, step=30, key="reinvestimento_prazo_input"
+            )
+    if not ativar:
+        return None
+    if reaplicar_em == "Mesmas condições":
+        return {'mesmas_condicoes': True}
+    return {'mesmas_condicoes': False, 'tipo': tipo, 'taxa': taxa, 'prazo_dias': int(prazo_dias)}
+
+@etapa_medida
+def render_results_summary(valor_aplicar, taxa_cdi_anual_atual, curva_cdi=None):
     """Renderiza o resumo dos dados de entrada."""
     st.subheader("Resultados da Comparação")
     st.markdown(f"**Valor a ser aplicado:** R$ {valor_aplicar:,.2f}")
-    st.markdown(f"**CDI anual atual:** {taxa_cdi_anual_atual:.2f}%")
+    if curva_cdi is None:
+        st.markdown(f"**CDI anual atual:** {taxa_cdi_anual_atual:.2f}%")
+    else:
+        taxas = curva_cdi['taxas_cdi_anual']
+        st.markdown(
+            f"**CDI:** curva com {len(taxas)} vértices ({taxas.min():.2f}% a {taxas.max():.2f}% a.a., "
+            f"interpolação {curva_cdi['interpolacao']})"
+        )
+        st.caption(
+            f"A grade de cenários e o ponto de equilíbrio usam o CDI constante de {taxa_cdi_anual_atual:.2f}%."
+        )
     st.markdown("---")
 
-def render_conclusion(rendimentos_full, enable_prefixada):
+@etapa_medida
+def render_conclusion(rendimentos_full):
     """Renderiza a conclusão principal baseada nos prazos originais."""
     st.subheader("Conclusão (Considerando Prazos Originais)")
     if rendimentos_full:
@@ -169,45 +324,147 @@ def render_conclusion(rendimentos_full, enable_prefixada):
         st.info("Nenhuma aplicação selecionada para comparação.")
     st.markdown("---")
 
-def render_rentability_chart(rendimentos_data, title, cores_aplicacoes):
-    """Renderiza um gráfico de barras de rentabilidade líquida."""
-    st.subheader(title)
-    df_rentabilidade = pd.DataFrame(rendimentos_data)
-    fig = px.bar(
-        df_rentabilidade, 
-        x='Aplicação', 
-        y='Rendimento Líquido (R$)', 
-        title=title,
-        text='Rendimento Líquido (R$)',
-        color='Aplicação',
-        color_discrete_map=cores_aplicacoes 
+@functools.lru_cache(maxsize=None)
+def _layout_base(grafico):
+    """
+    Layout compartilhado de um tipo de gráfico ('barras' ou 'evolucao'), montado uma vez por
+    processo: cada figura só troca os dados e o título. O template vazio evita embutir em toda
+    figura o template completo do plotly, que o tema do Streamlit substitui no navegador.
+    """
+    import plotly.graph_objects as go
+
+    layout = go.Layout(template=go.layout.Template(), legend={'title': {'text': 'Aplicação'}})
+    if grafico == 'barras':
+        layout.update(yaxis_title="Rendimento Líquido (R$)", xaxis_title="", showlegend=False)
+    else:
+        layout.update(
+            xaxis={'type': 'date', 'title': {'text': 'Data'}}, yaxis_title="Valor Líquido (R$)", hovermode="x unified"
+        )
+    return layout
+
+def build_rentability_figure(nomes, rendimentos, title, cores_aplicacoes):
+    """
+    Monta a figura de barras de rentabilidade líquida (sem renderizar): um único traço com os
+    rendimentos num array NumPy (serializado como array tipado) e a cor de cada aplicação.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Bar(
+            x=list(nomes),
+            y=np.asarray(rendimentos, dtype=float),
+            marker={'color': [cores_aplicacoes.get(nome, 'gray') for nome in nomes]},
+            texttemplate='R$ %{y:,.2f}',
+            textposition='outside',
+            hovertemplate='%{x}<br>R$ %{y:,.2f}<extra></extra>'
+        ),
+        layout=_layout_base('barras')
     )
-    fig.update_traces(texttemplate='R$ %{y:,.2f}', textposition='outside')
-    fig.update_layout(yaxis_title="Rendimento Líquido (R$)", xaxis_title="")
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(title_text=title)
+    return fig
+
+@etapa_medida
+def render_rentability_chart(figura, title):
+    """Renderiza um gráfico de barras de rentabilidade líquida (figura já montada, ver build_rentability_figure)."""
+    st.subheader(title)
+    st.plotly_chart(figura, use_container_width=True)
     st.markdown("---")
 
-def render_evolution_chart(df_evolucao, cores_aplicacoes):
-    """Renderiza o gráfico de evolução do patrimônio ao longo do tempo."""
+def build_evolution_figure(evolucoes, data_inicio, cores_aplicacoes):
+    """
+    Monta a figura de evolução do valor líquido (sem renderizar) direto das séries colunares
+    {nome: {'dias', 'valor_liquido'}}. As datas vão como milissegundos desde 1970 (o eixo é
+    de datas), então x e y são serializados como arrays tipados, e não como textos.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    inicio_ms = np.datetime64(data_inicio, 'ms').astype(np.int64)
+    total_pontos = sum(len(evolucao['dias']) for evolucao in evolucoes.values())
+    tipo_traco = go.Scattergl if total_pontos > LIMITE_PONTOS_WEBGL else go.Scatter
+    fig = go.Figure(
+        [
+            tipo_traco(
+                x=(inicio_ms + np.asarray(evolucao['dias'], dtype=np.int64) * 86_400_000).astype(float),
+                y=np.asarray(evolucao['valor_liquido'], dtype=float),
+                name=nome,
+                mode='lines',
+                line={'color': cores_aplicacoes.get(nome)},
+                hovertemplate='R$ %{y:,.2f}'
+            )
+            for nome, evolucao in evolucoes.items()
+        ],
+        layout=_layout_base('evolucao')
+    )
+    fig.update_layout(title_text='Evolução do Valor Líquido das Aplicações')
+    return fig
+
+@etapa_medida
+def render_evolution_chart(figura, reinvestimento=False):
+    """Renderiza o gráfico de evolução do patrimônio ao longo do tempo (figura já montada, ver build_evolution_figure)."""
     st.subheader("📈 Evolução do Patrimônio ao Longo do Tempo")
     st.info("O 'salto' nas linhas de aplicações tributadas representa a redução da alíquota de Imposto de Renda ao cruzar marcos de tempo (180, 360, 720 dias).")
-    fig_evolucao = px.line(
-        df_evolucao, 
-        x='Data', 
-        y='Valor Líquido', 
-        color='Aplicação', 
-        title='Evolução do Valor Líquido das Aplicações',
-        labels={'Valor Líquido': 'Valor Líquido (R$)', 'Data': 'Data'},
-        color_discrete_map=cores_aplicacoes 
+    if reinvestimento:
+        st.caption("As aplicações mais curtas seguem reaplicadas até o vencimento mais longo; a cada reaplicação, o IR volta à primeira faixa.")
+    st.plotly_chart(figura, use_container_width=True)
+    st.markdown("---")
+
+def build_fan_chart_figure(simulacao, data_inicio, cores_aplicacoes):
+    """Monta o gráfico em leque (faixa P5–P95 e mediana) da simulação de Monte Carlo (sem renderizar)."""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    percentil_inferior, mediana, percentil_superior = simulacao['percentis']
+    fig = go.Figure()
+    for nome, banda in simulacao['bandas'].items():
+        datas = (np.datetime64(data_inicio, 'D') + banda['dias']).astype('datetime64[s]')
+        inferior, centro, superior = banda['percentis']
+        cor = cores_aplicacoes.get(nome)
+        fig.add_trace(go.Scatter(
+            x=datas, y=superior, mode='lines', line={'width': 0, 'color': cor},
+            legendgroup=nome, showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=datas, y=inferior, mode='lines', line={'width': 0, 'color': cor}, fill='tonexty',
+            opacity=0.3, legendgroup=nome, name=f'{nome} (P{percentil_inferior}–P{percentil_superior})',
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=datas, y=centro, mode='lines', line={'color': cor}, legendgroup=nome,
+            name=f'{nome} (P{mediana})',
+            customdata=np.column_stack((inferior, superior)),
+            hovertemplate=(
+                f'{nome}<br>P{mediana}: R$ %{{y:,.2f}}<br>'
+                f'P{percentil_inferior}–P{percentil_superior}: R$ %{{customdata[0]:,.2f}} a R$ %{{customdata[1]:,.2f}}<extra></extra>'
+            )
+        ))
+    fig.update_layout(
+        title='Faixas do Valor Líquido nos Cenários de CDI',
+        xaxis_title='Data', yaxis_title='Valor Líquido (R$)', hovermode='x unified'
+    )
+    return fig
+
+@etapa_medida
+def render_fan_chart(simulacao, data_vencimento_comparativa, figura):
+    """Renderiza as probabilidades de vitória e o gráfico em leque (já montado, ver build_fan_chart_figure) da simulação de Monte Carlo."""
+    st.subheader("🎲 Cenários de CDI (Monte Carlo)")
+    st.markdown(
+        f"Em **{simulacao['numero_trajetorias']:,}** trajetórias simuladas do CDI".replace(',', '.') +
+        f", a chance de cada aplicação ter o maior valor líquido em **{data_vencimento_comparativa.strftime('%d/%m/%Y')}**:"
     )
-    fig_evolucao.update_layout(hovermode="x unified")
-    st.plotly_chart(fig_evolucao, use_container_width=True)
+    probabilidades = list(simulacao['probabilidade_vitoria'].items())
+    for inicio in range(0, len(probabilidades), 4):
+        for coluna, (nome, probabilidade) in zip(st.columns(4), probabilidades[inicio:inicio + 4]):
+            coluna.metric(nome, f"{probabilidade:.1%}")
+    st.plotly_chart(figura, use_container_width=True)
     st.markdown("---")
 
+@etapa_medida
 def render_comparative_conclusion(data_vencimento_comparativa, dias_uteis_comparativos, rendimentos_comp):
     """Renderiza a conclusão comparativa até o menor prazo."""
     st.subheader("Conclusão Comparativa (até o menor prazo)")
-    st.markdown(f"Para uma comparação equivalente, todas as aplicações foram simuladas até a data de **{data_vencimento_comparativa.strftime('%d/%m/%Y')}** ({dias_uteis_comparativos} dias úteis estimados).")
+    st.markdown(f"Para uma comparação equivalente, todas as aplicações foram simuladas até a data de **{data_vencimento_comparativa.strftime('%d/%m/%Y')}** ({dias_uteis_comparativos} dias úteis).")
     if rendimentos_comp:
         melhor_aplicacao_comp = max(rendimentos_comp, key=rendimentos_comp.get)
         melhor_rendimento_comp = rendimentos_comp[melhor_aplicacao_comp]
@@ -216,48 +473,263 @@ def render_comparative_conclusion(data_vencimento_comparativa, dias_uteis_compar
         st.info("Nenhuma aplicação selecionada para comparação equivalente.")
     st.markdown("---")
 
-def render_detailed_sections(details_tributada, details_isenta, details_prefixada=None):
-    """Renderiza os detalhamentos completos das aplicações."""
-    st.subheader("Detalhamento Completo das Aplicações")
+@etapa_medida
+def render_reinvestment_conclusion(reinvestimento):
+    """Renderiza a conclusão com reinvestimento até o vencimento mais longo."""
+    st.subheader("Conclusão com Reinvestimento (até o maior prazo)")
+    rendimentos = reinvestimento['rendimentos']
+    reaplicadas = [
+        f"{nome} ({quantidade} reaplicaç{'ão' if quantidade == 1 else 'ões'})"
+        for nome, quantidade in reinvestimento['reaplicacoes'].items() if quantidade
+    ]
+    st.markdown(
+        f"Todas as aplicações foram levadas até **{reinvestimento['data_horizonte'].strftime('%d/%m/%Y')}**, "
+        f"reaplicando {reinvestimento['descricao']}: {', '.join(reaplicadas)}."
+    )
+    melhor_aplicacao = max(rendimentos, key=rendimentos.get)
+    st.success(f"Com reinvestimento, a **{melhor_aplicacao}** é a mais vantajosa, com um rendimento líquido de **R$ {rendimentos[melhor_aplicacao]:,.2f}**.")
+    st.markdown("---")
+
+@st.fragment
+def render_redemption_scrubber(indice_resgate, data_inicio):
+    """
+    Renderiza o seletor de data de resgate antecipado e o ranking das aplicações nessa data.
+    É um fragmento: mover o seletor só relê o índice (resgate.consultar_resgate), sem
+    reexecutar a comparação.
+    """
+    from resgate import consultar_resgate
+
+    st.subheader("⏳ E se eu precisar resgatar antes?")
+    dias_maximo = int(indice_resgate['dias_vencimento'].max())
+    data_resgate = st.slider(
+        "Data de resgate",
+        min_value=data_inicio + timedelta(days=1),
+        max_value=data_inicio + timedelta(days=max(dias_maximo, 2)),
+        value=data_inicio + timedelta(days=min(dias_maximo, 240)),
+        format="DD/MM/YYYY",
+        key="data_resgate_slider"
+    )
+    resgate = consultar_resgate(indice_resgate, (data_resgate - data_inicio).days)
+    st.markdown(f"Resgatando em **{data_resgate.strftime('%d/%m/%Y')}** ({resgate['dias_corridos']} dias corridos), a **{resgate['ranking'][0]}** fica à frente.")
+    linhas = sorted(
+        (
+            {
+                'Posição': posicao,
+                'Aplicação': nome,
+                'Valor Líquido (R$)': round(valor_liquido, 2),
+                'Rendimento Líquido (R$)': round(rendimento_liquido, 2),
+                'IR (R$)': round(imposto_renda, 2),
+                'IOF (R$)': round(iof, 2),
+                'Situação': 'Vencida (resgatada no vencimento)' if vencida else 'Resgate antecipado'
+            }
+            for nome, posicao, valor_liquido, rendimento_liquido, imposto_renda, iof, vencida in zip(
+                indice_resgate['nomes'], resgate['posicao'].tolist(), resgate['valor_liquido'].tolist(),
+                resgate['rendimento_liquido'].tolist(), resgate['imposto_renda'].tolist(),
+                resgate['iof'].tolist(), resgate['vencida'].tolist()
+            )
+        ),
+        key=lambda linha: linha['Posição']
+    )
+    st.dataframe(linhas, use_container_width=True, hide_index=True)
+    st.markdown("---")
+
+def build_scenario_heatmap_figure(taxas_isenta, taxas_tributada, diferencas):
+    """Monta o mapa de calor de cenários (Isenta x Tributada) a partir de uma grade já calculada (sem renderizar)."""
+    import plotly.express as px
+
+    fig_cenarios = px.imshow(
+        diferencas,
+        x=taxas_tributada,
+        y=taxas_isenta,
+        origin='lower',
+        aspect='auto',
+        color_continuous_scale='RdBu',
+        color_continuous_midpoint=0,
+        labels={'x': 'Tributada (% do CDI)', 'y': 'Isenta (% do CDI)', 'color': 'Diferença (R$)'},
+        title='Valor Líquido: Isenta − Tributada (R$)'
+    )
+    fig_cenarios.update_traces(hovertemplate='Tributada: %{x}% do CDI<br>Isenta: %{y}% do CDI<br>Diferença: R$ %{z:,.2f}<extra></extra>')
+    return fig_cenarios
+
+@etapa_medida
+def render_scenario_heatmap(figura, data_vencimento_comparativa):
+    """Renderiza o mapa de calor de cenários (figura já montada, ver build_scenario_heatmap_figure)."""
+    st.subheader("🗺️ Mapa de Cenários: Isenta x Tributada")
+    st.markdown(f"Diferença de valor líquido (Isenta − Tributada) até **{data_vencimento_comparativa.strftime('%d/%m/%Y')}** para cada combinação de taxas. Tons positivos favorecem a isenta.")
+    st.plotly_chart(figura, use_container_width=True)
+    st.markdown("---")
 
-    st.markdown("### 📊 Detalhamento da Aplicação Pós-Fixada Tributada (Prazo Original)")
-    st.markdown(f"**Taxa:** {details_tributada['taxa_aplicacao_cdi']:.2f}% do CDI")
-    st.markdown(f"**Data de Vencimento:** {details_tributada['data_vencimento'].strftime('%d/%m/%Y')}")
-    st.markdown(f"**Prazo total em dias corridos:** {details_tributada['dias_corridos']} dias")
-    st.markdown(f"**Prazo estimado em dias úteis:** {details_tributada['dias_uteis']} dias")
-    st.markdown(f"**Rendimento Bruto:** R$ {details_tributada['rendimento_bruto']:,.2f}")
-    st.markdown(f"**Alíquota de IR aplicada:** {details_tributada['aliquota_ir'] * 100:.1f}%")
-    st.markdown(f"**Imposto de Renda (IR):** R$ {details_tributada['imposto_renda']:,.2f}")
-    st.markdown(f"**Valor Final Líquido:** R$ {details_tributada['valor_final_liquido']:,.2f}")
-    st.markdown(f"**Rendimento Líquido:** R$ {details_tributada['rendimento_liquido']:,.2f}")
+def build_breakeven_figure(prazos_dias_corridos, taxas_tributada_equivalentes, taxa_tributada_cdi):
+    """Monta a curva de equilíbrio (taxa tributada equivalente à isenta) por prazo (sem renderizar)."""
+    import plotly.express as px
+
+    fig_equilibrio = px.line(
+        x=prazos_dias_corridos,
+        y=taxas_tributada_equivalentes,
+        title='Taxa Tributada Equivalente por Prazo',
+        labels={'x': 'Prazo (dias corridos)', 'y': 'Taxa Tributada Equivalente (% do CDI)'}
+    )
+    fig_equilibrio.update_traces(line_color='lightseagreen', hovertemplate='%{x} dias: %{y:.2f}% do CDI<extra></extra>')
+    fig_equilibrio.add_hline(y=taxa_tributada_cdi, line_dash='dot', line_color='darkorange', annotation_text='Tributada informada')
+    for marco in (180, 360, 720):
+        if marco <= prazos_dias_corridos[-1]:
+            fig_equilibrio.add_vline(x=marco, line_dash='dash', line_color='gray')
+    return fig_equilibrio
+
+@etapa_medida
+def render_breakeven_chart(figura, taxa_isenta_cdi, taxa_tributada_cdi, equilibrio_comparativo):
+    """Renderiza a curva de equilíbrio (figura já montada, ver build_breakeven_figure) e os pontos de equilíbrio."""
+    st.subheader("⚖️ Ponto de Equilíbrio: Isenta x Tributada")
+    st.markdown(
+        f"Para empatar com a isenta de **{taxa_isenta_cdi:.2f}% do CDI** até o menor prazo, uma tributada precisa pagar "
+        f"**{equilibrio_comparativo['taxa_tributada']:.2f}% do CDI**, ou uma pré-fixada **{equilibrio_comparativo['taxa_prefixada']:.2f}% a.a.**."
+    )
+    if equilibrio_comparativo.get('cdi_tributada') is not None:
+        st.markdown(f"Com a tributada a {taxa_tributada_cdi:.2f}% do CDI, as duas empatam com o CDI em **{equilibrio_comparativo['cdi_tributada']:.2f}% a.a.**.")
+    if equilibrio_comparativo.get('cdi_prefixada') is not None:
+        st.markdown(f"A isenta supera a pré-fixada informada se o CDI ficar acima de **{equilibrio_comparativo['cdi_prefixada']:.2f}% a.a.**.")
+    st.plotly_chart(figura, use_container_width=True)
     st.markdown("---")
 
-    st.markdown("### 📈 Detalhamento da Aplicação Pós-Fixada Isenta (Prazo Original)")
-    st.markdown(f"**Taxa:** {details_isenta['taxa_aplicacao_cdi']:.2f}% do CDI")
-    st.markdown(f"**Data de Vencimento:** {details_isenta['data_vencimento'].strftime('%d/%m/%Y')}")
-    st.markdown(f"**Prazo total em dias corridos:** {details_isenta['dias_corridos']} dias")
-    st.markdown(f"**Prazo estimado em dias úteis:** {details_isenta['dias_uteis']} dias")
-    st.markdown(f"**Valor Final Líquido:** R$ {details_isenta['valor_final_liquido']:,.2f}")
-    st.markdown(f"**Rendimento Líquido:** R$ {details_isenta['rendimento_liquido']:,.2f}")
+@etapa_medida
+def render_sensitivity_panel(sensibilidade):
+    """Renderiza o painel de sensibilidade: derivadas do valor líquido e a distância até a troca da vencedora."""
+    st.subheader("🎯 Sensibilidade do Resultado (Prazos Originais)")
+    if sensibilidade['desafiante'] is None:
+        st.markdown(f"Nenhuma variação do CDI faz outra aplicação superar a **{sensibilidade['vencedora']}**.")
+    else:
+        variacao = sensibilidade['variacao_cdi_virada']
+        sentido = 'subir' if variacao > 0 else 'cair'
+        destino = '' if sensibilidade['cdi_virada'] is None else f" (para {sensibilidade['cdi_virada']:.2f}% a.a.)"
+        st.markdown(
+            f"A **{sensibilidade['vencedora']}** deixa de ser a mais vantajosa se o CDI {sentido} cerca de "
+            f"**{abs(variacao):.2f} p.p.**{destino}: a **{sensibilidade['desafiante']}** passa à frente."
+        )
+
+    def formatar_ajuste(linha):
+        if linha['ajuste_taxa_empate'] is None:
+            return '—'
+        return f"{linha['ajuste_taxa_empate']:+.2f} p.p. ({unidade_da_taxa(linha['tipo'])})"
+
+    st.dataframe(
+        [
+            {
+                'Aplicação': linha['nome'],
+                'R$ por +1 p.p. de CDI': round(linha['sensibilidade_cdi'], 2),
+                'R$ por +1 na taxa': round(linha['sensibilidade_taxa'], 2),
+                'R$ por R$ 1,00 aplicado': round(linha['sensibilidade_valor'], 4),
+                'Ajuste de taxa para empatar': formatar_ajuste(linha)
+            }
+            for linha in sensibilidade['linhas']
+        ],
+        use_container_width=True, hide_index=True
+    )
+    st.caption(
+        "Derivadas do valor final líquido, calculadas junto com os resultados. O ajuste de taxa é quanto a taxa "
+        "contratada precisaria mudar para empatar com a mais vantajosa (na vencedora, com a segunda colocada). "
+        "As distâncias são estimativas de primeira ordem."
+    )
     st.markdown("---")
 
-    if details_prefixada:
-        st.markdown("### 📊 Detalhamento da Aplicação Pré-Fixada (Prazo Original)")
-        st.markdown(f"**Taxa Anual Acordada:** {details_prefixada['taxa_anual_prefixada']:.2f}% a.a.")
-        st.markdown(f"**Data de Vencimento:** {details_prefixada['data_vencimento'].strftime('%d/%m/%Y')}")
-        st.markdown(f"**Prazo total em dias corridos:** {details_prefixada['dias_corridos']} dias")
-        st.markdown(f"**Rendimento Bruto:** R$ {details_prefixada['rendimento_bruto']:,.2f}")
-        st.markdown(f"**Alíquota de IR aplicada:** {details_prefixada['aliquota_ir'] * 100:.1f}%")
-        st.markdown(f"**Imposto de Renda (IR):** R$ {details_prefixada['imposto_renda']:,.2f}")
-        st.markdown(f"**Valor Final Líquido:** R$ {details_prefixada['valor_final_liquido']:,.2f}")
-        st.markdown(f"**Rendimento Líquido:** R$ {details_prefixada['rendimento_liquido']:,.2f}")
-        st.markdown("---")
+def render_detailed_sections_header():
+    """Renderiza o título dos detalhamentos (cada aplicação vem em seguida, ver render_offer_detail)."""
+    st.subheader("Detalhamento Completo das Aplicações")
+
+@etapa_medida
+def render_offer_detail(detalhe, figura_evolucao):
+    """
+    Renderiza o detalhamento completo de uma aplicação (dicionário de resultados.montar_oferta)
+    e a sua série de evolução (figura já montada, ver build_evolution_figure).
+    """
+    produto = TIPOS_PRODUTO[detalhe['tipo']]
+    st.markdown(f"### 📊 Detalhamento: {detalhe['nome']} (Prazo Original)")
+    st.markdown(f"**Tipo:** {produto['rotulo']}")
+    st.markdown(f"**Taxa:** {detalhe['taxa']:.2f}{unidade_da_taxa(detalhe['tipo'])}")
+    st.markdown(f"**Data de Vencimento:** {detalhe['data_vencimento'].strftime('%d/%m/%Y')}")
+    st.markdown(f"**Prazo total em dias corridos:** {detalhe['dias_corridos']} dias")
+    if produto['indexador'] == 'cdi':
+        st.markdown(f"**Prazo em dias úteis:** {detalhe['dias_uteis']} dias")
+    if not produto['isenta_ir']:
+        st.markdown(f"**Rendimento Bruto:** R$ {detalhe['rendimento_bruto']:,.2f}")
+        if detalhe['iof'] > 0:
+            st.markdown(f"**IOF (resgate antes de 30 dias):** R$ {detalhe['iof']:,.2f}")
+        st.markdown(f"**Alíquota de IR aplicada:** {detalhe['aliquota_ir'] * 100:.1f}%")
+        st.markdown(f"**Imposto de Renda (IR):** R$ {detalhe['imposto_renda']:,.2f}")
+    st.markdown(f"**Valor Final Líquido:** R$ {detalhe['valor_final_liquido']:,.2f}")
+    st.markdown(f"**Rendimento Líquido:** R$ {detalhe['rendimento_liquido']:,.2f}")
+    st.plotly_chart(figura_evolucao, use_container_width=True)
+    st.markdown("---")
+
+def render_export_controls():
+    """
+    Renderiza as opções de exportação dos resultados. Retorna o formato escolhido ('csv' ou
+    'parquet') ou None enquanto a exportação não for pedida: os arquivos só são gerados
+    quando a caixa está marcada, e não a cada reexecução.
+    """
+    st.subheader("Exportar Resultados")
+    preparar = st.checkbox(
+        "Preparar arquivos com a evolução diária e o resumo das aplicações", value=False, key="exportacao_checkbox"
+    )
+    formato = st.radio(
+        "Formato", ['csv', 'parquet'], format_func=lambda formato: formato.upper(), horizontal=True, key="exportacao_formato_radio"
+    )
+    return formato if preparar else None
+
+def render_export_downloads(arquivos, formato, extensao, mime):
+    """Renderiza os botões de download dos arquivos exportados ({'evolucao': bytes, 'resumo': bytes})."""
+    col_evolucao, col_resumo = st.columns(2)
+    with col_evolucao:
+        st.download_button(
+            f"Baixar evolução diária ({formato.upper()}, {len(arquivos['evolucao']) / 1024:,.0f} KB)",
+            data=arquivos['evolucao'], file_name=f"evolucao_aplicacoes.{extensao}", mime=mime,
+            key="baixar_evolucao_button"
+        )
+    with col_resumo:
+        st.download_button(
+            f"Baixar resumo ({formato.upper()})",
+            data=arquivos['resumo'], file_name=f"resumo_aplicacoes.{extensao}", mime=mime,
+            key="baixar_resumo_button"
+        )
+
+def render_debug_controls():
+    """Renderiza, na barra lateral, as opções do modo diagnóstico e retorna se o cProfile deve ser gerado."""
+    st.sidebar.subheader("🛠️ Diagnóstico")
+    return st.sidebar.checkbox("Gerar perfil cProfile da próxima comparação", value=False, key="gerar_cprofile_checkbox")
+
+def render_performance_debug(medicoes, estatisticas_cache, caminho_pstats=None, estatisticas_pacotes=None):
+    """Renderiza o painel de diagnóstico com o tempo (e a memória) de cada etapa da execução."""
+    with st.expander("🛠️ Diagnóstico de desempenho desta execução"):
+        if medicoes:
+            st.dataframe(medicoes, use_container_width=True, hide_index=True)
+            st.markdown(f"**Tempo total medido:** {sum(m['duracao_ms'] for m in medicoes):,.1f} ms")
+        st.markdown(
+            f"**Cache de cálculos:** {estatisticas_cache['acertos']} acertos, {estatisticas_cache['falhas']} falhas "
+            f"({estatisticas_cache['taxa_acerto'] * 100:.1f}%), {estatisticas_cache['tamanho']}/{estatisticas_cache['tamanho_maximo']} entradas"
+        )
+        if estatisticas_pacotes is not None:
+            st.markdown(
+                f"**Cache de resultados (entre sessões):** {estatisticas_pacotes['acertos']} acertos, {estatisticas_pacotes['falhas']} falhas "
+                f"({estatisticas_pacotes['taxa_acerto'] * 100:.1f}%), {estatisticas_pacotes['tamanho']}/{estatisticas_pacotes['tamanho_maximo']} pacotes, "
+                f"{estatisticas_pacotes['invalidacoes_por_data']} renovações pela virada do dia"
+            )
+        if caminho_pstats:
+            with open(caminho_pstats, 'rb') as arquivo:
+                conteudo_pstats = arquivo.read()
+            os.remove(caminho_pstats)
+            st.download_button(
+                "Baixar perfil cProfile (.pstats)",
+                data=conteudo_pstats,
+                file_name="comparador.pstats",
+                mime="application/octet-stream",
+                key="baixar_pstats_button"
+            )
 
+@etapa_medida
 def render_footer():
     """Renderiza o rodapé com o aviso legal."""
     st.markdown("""
     <br>
-    <small>*Lembre-se que este é um cálculo simulado e não substitui uma análise detalhada com um profissional de investimentos. A estimativa de dias úteis pode não ser exata devido a feriados variáveis.*</small>
+    <small>*Lembre-se que este é um cálculo simulado e não substitui uma análise detalhada com um profissional de investimentos. Os dias úteis seguem o calendário de feriados nacionais (ANBIMA/B3); feriados estaduais e municipais não são considerados.*</small>
     <br>
     <br>
     """, unsafe_allow_html=True)
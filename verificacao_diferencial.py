@@ -0,0 +1,938 @@
+# verificacao_diferencial.py
+# Verificação diferencial dos caminhos rápidos (vetorizados, em cache ou em lote) contra as
+# funções escalares de calculations.py, que são a especificação: entradas aleatórias e de
+# fronteira (CDI <= -100%, prazo sem dias úteis, linha inicial repetida da evolução, faixas
+# de 180/360/720 dias) passam pelos dois lados e precisam concordar até o centavo.
+# Como num teste baseado em propriedades, cada divergência de um resultado por oferta é
+# reduzida (shrinking) ao caso mais simples que ainda diverge, ver reduzir_caso.
+# Também registra a aceleração de cada caminho em relação à referência escalar.
+#
+#   python verificacao_diferencial.py --grupos 200 --semente 0 --saida verificacao.json
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import cache_calculos
+import calculations
+import carteira
+import equivalencia
+from api_comparacao import comparar_lote
+from calendario import dias_uteis_entre, proximos_dias_uteis
+from curva_cdi import montar_curva_cdi
+from produtos import TIPOS_PRODUTO
+from reinvestimento import calcular_evolucao_reinvestida
+from resgate import consultar_resgate, montar_indice_resgate, series_de_resgate
+from simulacao_cdi import simular_cenarios_cdi, simular_taxas_cdi
+
+# Diferença máxima aceita: meio centavo nos valores em R$ e arredondamento nas alíquotas
+TOLERANCIA_REAIS = 0.005
+TOLERANCIA_ALIQUOTA = 1e-9
+COLUNAS_REAIS = ('valor_final_liquido', 'rendimento_liquido', 'imposto_renda')
+MAXIMO_EXEMPLOS = 5
+
+# Fronteiras das tabelas de tributacao.py (IOF até 30 dias; IR em 180/360/720) e prazos degenerados
+PRAZOS_FRONTEIRA = (0, 1, 2, 3, 29, 30, 31, 179, 180, 181, 359, 360, 361, 719, 720, 721)
+CDI_FRONTEIRA = (-150.0, -100.0, -99.99, 0.0, 1e-6)
+# Inícios numa sexta-feira antes do Carnaval e na véspera de Natal: prazos curtos sem dia útil
+INICIOS_FRONTEIRA = (date(2025, 2, 28), date(2025, 12, 24), date(2026, 1, 2))
+FAIXA_INICIO = (date(2024, 1, 1), date(2060, 12, 31))
+FAIXA_PRAZO_DIAS = (0, 3650)
+# A evolução é conferida dia a dia contra a referência, então usa prazos menores (cobrindo 720)
+FAIXA_PRAZO_EVOLUCAO = (0, 800)
+FAIXA_TAXA_POR_INDEXADOR = {'cdi': (0.0, 200.0), 'pre': (0.0, 40.0)}
+MAXIMO_OFERTAS_GRUPO = 8
+# A simulação guarda os valores das pós-fixadas em float32: até R$ 10.000, o erro fica abaixo
+# de R$ 0,001
+VALOR_MAXIMO_SIMULACAO = 10_000.0
+# Bisseção escalar de referência da equivalência: limite amplo para as taxas (IOF alto em
+# prazos curtos exige taxas enormes) e para o CDI de equilíbrio da pré-fixada
+LIMITE_BUSCA_REFERENCIA = 1e9
+MAXIMO_ITERACOES_BISSECAO = 400
+MAXIMO_TENTATIVAS_REDUCAO = 500
+
+def gerar_grupos(gerador, quantidade, faixa_prazo=FAIXA_PRAZO_DIAS, com_fronteiras=True):
+    """
+    Sorteia grupos de ofertas: cada grupo compartilha valor, CDI e data de início (como uma
+    comparação do app) e tem ofertas de todos os tipos. Uma fração dos grupos usa CDI, início
+    e prazos de fronteira.
+    """
+    tipos = list(TIPOS_PRODUTO)
+    dias_faixa_inicio = (FAIXA_INICIO[1] - FAIXA_INICIO[0]).days
+    grupos = []
+    for indice in range(quantidade):
+        fronteira = com_fronteiras and indice % 3 == 0
+        quantidade_ofertas = gerador.randint(1, MAXIMO_OFERTAS_GRUPO)
+        ofertas = []
+        for _ in range(quantidade_ofertas):
+            tipo = gerador.choice(tipos)
+            taxa_minima, taxa_maxima = FAIXA_TAXA_POR_INDEXADOR[TIPOS_PRODUTO[tipo]['indexador']]
+            prazos = [prazo for prazo in PRAZOS_FRONTEIRA if prazo <= faixa_prazo[1]]
+            ofertas.append({
+                'tipo': tipo,
+                'taxa': round(gerador.uniform(taxa_minima, taxa_maxima), gerador.choice((0, 2, 6))),
+                'dias': gerador.choice(prazos) if fronteira and gerador.random() < 0.7 else gerador.randint(*faixa_prazo)
+            })
+        grupos.append({
+            'valor': gerador.choice((0.01, 1.0, 1_000_000.0)) if fronteira else round(gerador.uniform(1.0, 1_000_000.0), 2),
+            'taxa_cdi_anual': gerador.choice(CDI_FRONTEIRA) if fronteira and gerador.random() < 0.5 else round(gerador.uniform(0.0, 25.0), 4),
+            'data_inicio': (
+                gerador.choice(INICIOS_FRONTEIRA) if fronteira
+                else FAIXA_INICIO[0] + timedelta(days=gerador.randint(0, dias_faixa_inicio))
+            ),
+            'ofertas': ofertas
+        })
+    return grupos
+
+def _referencia(valor, tipo, taxa, dias, taxa_cdi_anual, data_inicio, curva_cdi=None):
+    """
+    Resultado de uma oferta pelas funções escalares de calculations.py. As pré-fixadas isentas
+    não têm função própria: usam a fórmula de calcular_rendimento_prefixado sem tributos.
+    """
+    produto = TIPOS_PRODUTO[tipo]
+    if produto['indexador'] == 'cdi':
+        dias_uteis = dias_uteis_entre(data_inicio, data_inicio + timedelta(days=max(dias, 0)))
+        resultado = calculations.calcular_rendimento_pos_fixado(
+            valor, taxa, dias_uteis, taxa_cdi_anual, produto['isenta_ir'],
+            prazo_dias_corridos_para_ir=dias, data_inicio=data_inicio, curva_cdi=curva_cdi
+        )
+    elif not produto['isenta_ir']:
+        resultado = calculations.calcular_rendimento_prefixado(valor, taxa, dias)
+    elif dias <= 0:
+        resultado = (valor, 0, 0, 0)
+    else:
+        valor_final = valor * (1 + taxa / 100)**(dias / 365)
+        resultado = (valor_final, valor_final - valor, 0, 0)
+    return dict(zip(('valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda'), resultado))
+
+def _colunas(linhas):
+    """
+    Lista de resultados por oferta -> dicionário de arrays (uma coluna por campo).
+    """
+    return {coluna: np.array([linha[coluna] for linha in linhas], dtype=float) for coluna in linhas[0]} if linhas else {}
+
+def _ofertas_planas(grupos):
+    """
+    Uma entrada por oferta, com os dados do grupo, na ordem dos grupos.
+    """
+    return [
+        {'valor': grupo['valor'], 'taxa_cdi_anual': grupo['taxa_cdi_anual'], 'data_inicio': grupo['data_inicio'], **oferta}
+        for grupo in grupos for oferta in grupo['ofertas']
+    ]
+
+def _descrever(caso):
+    return {chave: (valor.isoformat() if isinstance(valor, date) else valor) for chave, valor in caso.items()}
+
+def comparar(casos, esperado, obtido, reduzir=None):
+    """
+    Compara as colunas comuns (R$ com TOLERANCIA_REAIS, alíquotas com TOLERANCIA_ALIQUOTA);
+    NaN dos dois lados (sem solução) conta como acordo. Retorna o número de casos, de
+    divergências, a maior diferença por coluna e exemplos; com reduzir, cada exemplo traz
+    também o caso reduzido (ver reduzir_caso).
+    """
+    divergentes = np.zeros(len(casos), dtype=bool)
+    maiores_diferencas = {}
+    exemplos = []
+    for coluna in esperado:
+        if coluna not in obtido:
+            continue
+        valores_obtidos = np.asarray(obtido[coluna], dtype=float)
+        diferencas = np.abs(valores_obtidos - esperado[coluna])
+        diferencas = np.where(np.isnan(valores_obtidos) & np.isnan(esperado[coluna]), 0.0, diferencas)
+        diferencas = np.where(np.isnan(diferencas), np.inf, diferencas)
+        tolerancia = TOLERANCIA_REAIS if coluna in COLUNAS_REAIS else TOLERANCIA_ALIQUOTA
+        fora = diferencas > tolerancia
+        divergentes |= fora
+        maiores_diferencas[coluna] = float(diferencas.max(initial=0.0))
+        for posicao in np.flatnonzero(fora)[:MAXIMO_EXEMPLOS - len(exemplos)].tolist():
+            exemplo = {
+                **_descrever(casos[posicao]), 'coluna': coluna,
+                'esperado': float(esperado[coluna][posicao]), 'obtido': float(obtido[coluna][posicao])
+            }
+            if reduzir is not None:
+                exemplo['caso_reduzido'] = _descrever(reduzir(casos[posicao]))
+            exemplos.append(exemplo)
+    return {
+        'casos': len(casos),
+        'divergencias': int(divergentes.sum()),
+        'maior_diferenca': maiores_diferencas,
+        'exemplos': exemplos
+    }
+
+def _cronometrar(funcao, repeticoes):
+    """
+    Executa a função `repeticoes` vezes e retorna o último resultado e o menor tempo (s).
+    Nos caminhos em cache, as repetições depois da primeira medem o cache quente.
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor
+
+def _caminho_ofertas(ofertas, calcular_rapido, repeticoes):
+    """
+    Verifica um caminho que devolve um resultado por oferta contra _referencia.
+    """
+    inicio = time.perf_counter()
+    esperado = _colunas([
+        _referencia(oferta['valor'], oferta['tipo'], oferta['taxa'], oferta['dias'], oferta['taxa_cdi_anual'], oferta['data_inicio'])
+        for oferta in ofertas
+    ])
+    tempo_referencia = time.perf_counter() - inicio
+    obtido, tempo_rapido = _cronometrar(calcular_rapido, repeticoes)
+    return esperado, obtido, tempo_referencia, tempo_rapido
+
+def _por_grupo(grupos, calcular_grupo):
+    """
+    Concatena, na ordem das ofertas, as colunas devolvidas por calcular_grupo(grupo).
+    """
+    partes = [calcular_grupo(grupo) for grupo in grupos]
+    return {coluna: np.concatenate([parte[coluna] for parte in partes]) for coluna in partes[0]} if partes else {}
+
+def _carteira_do_grupo(grupo):
+    return carteira.montar_carteira([
+        {'nome': f"Oferta {posicao}", 'tipo': oferta['tipo'], 'taxa': oferta['taxa'],
+         'data_vencimento': grupo['data_inicio'] + timedelta(days=oferta['dias'])}
+        for posicao, oferta in enumerate(grupo['ofertas'], start=1)
+    ], grupo['data_inicio'])
+
+def verificar_resultados(grupos, repeticoes):
+    """
+    Caminhos que calculam o resultado no vencimento: carteira, cache, grades e API.
+    Retorna {caminho: (casos, esperado, obtido, tempo_referencia, tempo_rapido)}.
+    """
+    caminhos = {}
+    ofertas = _ofertas_planas(grupos)
+
+    def calcular_ofertas_por_grupo():
+        return _por_grupo(grupos, lambda grupo: carteira.calcular_ofertas(
+            grupo['valor'], np.array([oferta['tipo'] for oferta in grupo['ofertas']], dtype=object),
+            np.array([oferta['taxa'] for oferta in grupo['ofertas']]),
+            np.array([oferta['dias'] for oferta in grupo['ofertas']], dtype=np.int64),
+            grupo['taxa_cdi_anual'], grupo['data_inicio']
+        ))
+    caminhos['carteira.calcular_ofertas'] = (ofertas, *_caminho_ofertas(ofertas, calcular_ofertas_por_grupo, repeticoes))
+
+    carteiras = [_carteira_do_grupo(grupo) for grupo in grupos]
+    cache_calculos.limpar_cache()
+    caminhos['cache_calculos.calcular_carteira'] = (ofertas, *_caminho_ofertas(
+        ofertas,
+        lambda: _por_grupo(
+            list(zip(grupos, carteiras)),
+            lambda par: cache_calculos.calcular_carteira(par[1], par[0]['valor'], par[0]['taxa_cdi_anual'])
+        ),
+        repeticoes
+    ))
+
+    pos_fixadas = [oferta for oferta in ofertas if TIPOS_PRODUTO[oferta['tipo']]['indexador'] == 'cdi']
+    prefixadas = [oferta for oferta in ofertas if oferta['tipo'] == 'pre']
+
+    def cache_escalar():
+        linhas = []
+        for oferta in pos_fixadas:
+            dias_uteis = dias_uteis_entre(oferta['data_inicio'], oferta['data_inicio'] + timedelta(days=oferta['dias']))
+            linhas.append(dict(zip(
+                ('valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda'),
+                cache_calculos.calcular_rendimento_pos_fixado(
+                    oferta['valor'], oferta['taxa'], dias_uteis, oferta['taxa_cdi_anual'],
+                    TIPOS_PRODUTO[oferta['tipo']]['isenta_ir'], oferta['dias'], oferta['data_inicio']
+                )
+            )))
+        for oferta in prefixadas:
+            linhas.append(dict(zip(
+                ('valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda'),
+                cache_calculos.calcular_rendimento_prefixado(oferta['valor'], oferta['taxa'], oferta['dias'])
+            )))
+        return _colunas(linhas)
+    cache_calculos.limpar_cache()
+    caminhos['cache_calculos.calcular_rendimento_*'] = (
+        pos_fixadas + prefixadas, *_caminho_ofertas(pos_fixadas + prefixadas, cache_escalar, repeticoes)
+    )
+
+    def grades():
+        pos = calculations.calcular_grade_pos_fixada(
+            np.array([oferta['valor'] for oferta in pos_fixadas]),
+            np.array([oferta['taxa'] for oferta in pos_fixadas]),
+            np.array([
+                dias_uteis_entre(oferta['data_inicio'], oferta['data_inicio'] + timedelta(days=oferta['dias']))
+                for oferta in pos_fixadas
+            ]),
+            np.array([oferta['taxa_cdi_anual'] for oferta in pos_fixadas]),
+            isenta_ir=np.array([TIPOS_PRODUTO[oferta['tipo']]['isenta_ir'] for oferta in pos_fixadas]),
+            prazo_dias_corridos_para_ir=np.array([oferta['dias'] for oferta in pos_fixadas])
+        )
+        pre = calculations.calcular_grade_prefixada(
+            np.array([oferta['valor'] for oferta in prefixadas]),
+            np.array([oferta['taxa'] for oferta in prefixadas]),
+            np.array([oferta['dias'] for oferta in prefixadas])
+        )
+        return {coluna: np.concatenate((pos[coluna], pre[coluna])) for coluna in pos}
+    caminhos['calculations.calcular_grade_*'] = (pos_fixadas + prefixadas, *_caminho_ofertas(pos_fixadas + prefixadas, grades, repeticoes))
+
+    # A API só aceita prazos positivos
+    grupos_api = [
+        {**grupo, 'ofertas': [oferta for oferta in grupo['ofertas'] if oferta['dias'] > 0]}
+        for grupo in grupos
+    ]
+    grupos_api = [grupo for grupo in grupos_api if grupo['ofertas']]
+    corpo_lote = [
+        {
+            'valor': grupo['valor'], 'taxa_cdi_anual': grupo['taxa_cdi_anual'], 'data_inicio': grupo['data_inicio'].isoformat(),
+            'ofertas': [{'tipo': oferta['tipo'], 'taxa': oferta['taxa'], 'prazo_dias': oferta['dias']} for oferta in grupo['ofertas']]
+        }
+        for grupo in grupos_api
+    ]
+    ofertas_api = _ofertas_planas(grupos_api)
+    caminhos['api_comparacao.comparar_lote'] = (ofertas_api, *_caminho_ofertas(
+        ofertas_api,
+        lambda: _colunas([
+            {coluna: oferta[coluna] for coluna in ('valor_final_liquido', 'rendimento_liquido', 'aliquota_ir', 'imposto_renda')}
+            for resposta in comparar_lote(corpo_lote) for oferta in resposta['ofertas']
+        ]),
+        repeticoes
+    ))
+    return caminhos
+
+def _referencia_evolucao(valor, tipo, taxa, dias, taxa_cdi_anual, data_inicio):
+    """
+    Evolução de referência: a linha inicial (o valor aplicado) e, para cada dia corrido de 0
+    ao vencimento, o resgate naquele dia pela função escalar.
+    """
+    linhas = [{'valor_final_liquido': valor, 'aliquota_ir': 0.0, 'imposto_renda': 0.0}]
+    for dia in range(max(dias, 0) + 1):
+        resultado = _referencia(valor, tipo, taxa, dia, taxa_cdi_anual, data_inicio)
+        linhas.append({coluna: resultado[coluna] for coluna in ('valor_final_liquido', 'aliquota_ir', 'imposto_renda')})
+    return linhas
+
+def verificar_evolucoes(grupos, repeticoes):
+    """
+    Caminhos da evolução diária e do resgate antecipado, conferidos dia a dia.
+    """
+    caminhos = {}
+    casos, linhas_referencia = [], []
+    inicio = time.perf_counter()
+    for grupo in grupos:
+        for oferta in grupo['ofertas']:
+            linhas = _referencia_evolucao(
+                grupo['valor'], oferta['tipo'], oferta['taxa'], oferta['dias'], grupo['taxa_cdi_anual'], grupo['data_inicio']
+            )
+            linhas_referencia.extend(linhas)
+            casos.extend(
+                {'valor': grupo['valor'], 'taxa_cdi_anual': grupo['taxa_cdi_anual'], 'data_inicio': grupo['data_inicio'],
+                 **oferta, 'linha': linha}
+                for linha in range(len(linhas))
+            )
+    esperado = _colunas(linhas_referencia)
+    tempo_referencia = time.perf_counter() - inicio
+
+    carteiras = [_carteira_do_grupo(grupo) for grupo in grupos]
+
+    def evolucao_carteira(calcular_evolucao_carteira):
+        linhas = {'valor_final_liquido': [], 'aliquota_ir': [], 'imposto_renda': []}
+        for grupo, carteira_grupo in zip(grupos, carteiras):
+            evolucoes = carteira.evolucoes_por_oferta(
+                calcular_evolucao_carteira(carteira_grupo, grupo['valor'], grupo['taxa_cdi_anual']), carteira_grupo
+            )
+            for evolucao in evolucoes.values():
+                linhas['valor_final_liquido'].append(evolucao['valor_liquido'])
+                linhas['aliquota_ir'].append(evolucao['aliquota_ir'])
+                linhas['imposto_renda'].append(evolucao['imposto_renda'])
+        return {coluna: np.concatenate(partes) for coluna, partes in linhas.items()}
+    obtido, tempo_rapido = _cronometrar(lambda: evolucao_carteira(carteira.calcular_evolucao_carteira), repeticoes)
+    caminhos['carteira.calcular_evolucao_carteira'] = (casos, esperado, obtido, tempo_referencia, tempo_rapido)
+    # Versão em cache (chave em R$ 1,00, escalada para o valor aplicado)
+    cache_calculos.limpar_cache()
+    obtido, tempo_rapido = _cronometrar(lambda: evolucao_carteira(cache_calculos.calcular_evolucao_carteira), repeticoes)
+    caminhos['cache_calculos.calcular_evolucao_carteira'] = (casos, esperado, obtido, tempo_referencia, tempo_rapido)
+
+    # Evoluções por oferta de calculations.py e das versões em cache (sem pré-fixada isenta),
+    # incluindo o formato em lista
+    selecao = np.array([TIPOS_PRODUTO[caso['tipo']]['indexador'] == 'cdi' or caso['tipo'] == 'pre' for caso in casos])
+    casos_calculations = [caso for caso, selecionado in zip(casos, selecao.tolist()) if selecionado]
+
+    def evolucoes_calculations(modulo):
+        linhas = {'valor_final_liquido': [], 'aliquota_ir': [], 'imposto_renda': []}
+        for grupo in grupos:
+            for oferta in grupo['ofertas']:
+                data_fim = grupo['data_inicio'] + timedelta(days=oferta['dias'])
+                if TIPOS_PRODUTO[oferta['tipo']]['indexador'] == 'cdi':
+                    evolucao = modulo.calcular_evolucao_pos_fixada(
+                        grupo['valor'], oferta['taxa'], grupo['taxa_cdi_anual'], grupo['data_inicio'], data_fim,
+                        TIPOS_PRODUTO[oferta['tipo']]['isenta_ir']
+                    )
+                elif oferta['tipo'] == 'pre':
+                    evolucao = modulo.calcular_evolucao_prefixada(grupo['valor'], oferta['taxa'], grupo['data_inicio'], data_fim)
+                else:
+                    continue
+                linhas['valor_final_liquido'].append(evolucao['valor_liquido'])
+                linhas['aliquota_ir'].append(evolucao['aliquota_ir'])
+                linhas['imposto_renda'].append(evolucao['imposto_renda'])
+        return {coluna: np.concatenate(partes) for coluna, partes in linhas.items()}
+    esperado_calculations = {coluna: valores[selecao] for coluna, valores in esperado.items()}
+    tempo_referencia_calculations = tempo_referencia * selecao.mean() if selecao.size else 0.0
+    obtido, tempo_rapido = _cronometrar(lambda: evolucoes_calculations(calculations), repeticoes)
+    caminhos['calculations.calcular_evolucao_*'] = (
+        casos_calculations, esperado_calculations, obtido, tempo_referencia_calculations, tempo_rapido
+    )
+    cache_calculos.limpar_cache()
+    obtido, tempo_rapido = _cronometrar(lambda: evolucoes_calculations(cache_calculos), repeticoes)
+    caminhos['cache_calculos.calcular_evolucao_*'] = (
+        casos_calculations, esperado_calculations, obtido, tempo_referencia_calculations, tempo_rapido
+    )
+
+    def evolucoes_em_lista():
+        valores = []
+        for grupo in grupos:
+            for oferta in grupo['ofertas']:
+                data_fim = grupo['data_inicio'] + timedelta(days=oferta['dias'])
+                if TIPOS_PRODUTO[oferta['tipo']]['indexador'] == 'cdi':
+                    lista = calculations.gerar_evolucao_pos_fixada(
+                        grupo['valor'], oferta['taxa'], grupo['taxa_cdi_anual'], grupo['data_inicio'], data_fim,
+                        TIPOS_PRODUTO[oferta['tipo']]['isenta_ir'], 'Oferta'
+                    )
+                elif oferta['tipo'] == 'pre':
+                    lista = calculations.gerar_evolucao_prefixada(grupo['valor'], oferta['taxa'], grupo['data_inicio'], data_fim, 'Oferta')
+                else:
+                    continue
+                # Datas esperadas: a linha inicial repetida (data de início) e um ponto por dia
+                datas_esperadas = [grupo['data_inicio']] + [grupo['data_inicio'] + timedelta(days=dia) for dia in range(oferta['dias'] + 1)]
+                if [linha['Data'] for linha in lista] != datas_esperadas:
+                    raise AssertionError(f"Datas da evolução em lista divergem para {_descrever({**grupo, **oferta, 'ofertas': None})}")
+                valores.extend(linha['Valor Líquido'] for linha in lista)
+        return {'valor_final_liquido': np.array(valores)}
+    obtido, tempo_rapido = _cronometrar(evolucoes_em_lista, repeticoes)
+    caminhos['calculations.gerar_evolucao_*'] = (
+        casos_calculations, {'valor_final_liquido': esperado['valor_final_liquido'][selecao]}, obtido,
+        tempo_referencia_calculations, tempo_rapido
+    )
+
+    # Resgate antecipado: consultas em dias sorteados (inclusive depois de vencimentos)
+    gerador = np.random.default_rng(0)
+    consultas = [
+        sorted(set(gerador.integers(0, max(oferta['dias'] for oferta in grupo['ofertas']) + 1, size=8).tolist()) | {0})
+        for grupo in grupos
+    ]
+    casos_resgate, linhas_resgate = [], []
+    inicio = time.perf_counter()
+    for grupo, dias_consulta in zip(grupos, consultas):
+        for dia in dias_consulta:
+            for oferta in grupo['ofertas']:
+                # Depois do vencimento, o resgate é o do vencimento
+                resultado = _referencia(grupo['valor'], oferta['tipo'], oferta['taxa'], min(dia, oferta['dias']), grupo['taxa_cdi_anual'], grupo['data_inicio'])
+                linhas_resgate.append({coluna: resultado[coluna] for coluna in ('valor_final_liquido', 'rendimento_liquido', 'imposto_renda')})
+                casos_resgate.append({'valor': grupo['valor'], 'taxa_cdi_anual': grupo['taxa_cdi_anual'], 'data_inicio': grupo['data_inicio'], **oferta, 'dia_resgate': dia})
+    esperado_resgate = _colunas(linhas_resgate)
+    tempo_referencia_resgate = time.perf_counter() - inicio
+
+    def resgates():
+        linhas = {'valor_final_liquido': [], 'rendimento_liquido': [], 'imposto_renda': []}
+        for grupo, carteira_grupo, dias_consulta in zip(grupos, carteiras, consultas):
+            evolucoes = carteira.evolucoes_por_oferta(
+                carteira.calcular_evolucao_carteira(carteira_grupo, grupo['valor'], grupo['taxa_cdi_anual']), carteira_grupo
+            )
+            indice = montar_indice_resgate(
+                {nome: series_de_resgate(evolucao) for nome, evolucao in evolucoes.items()}, grupo['valor'],
+                sem_rendimento=carteira.ofertas_sem_rendimento(carteira_grupo, grupo['taxa_cdi_anual'])
+            )
+            for dia in dias_consulta:
+                resgate = consultar_resgate(indice, dia)
+                linhas['valor_final_liquido'].append(resgate['valor_liquido'])
+                linhas['rendimento_liquido'].append(resgate['rendimento_liquido'])
+                linhas['imposto_renda'].append(resgate['imposto_renda'])
+        return {coluna: np.concatenate(partes) for coluna, partes in linhas.items()}
+    obtido, tempo_rapido = _cronometrar(resgates, repeticoes)
+    caminhos['resgate.consultar_resgate'] = (casos_resgate, esperado_resgate, obtido, tempo_referencia_resgate, tempo_rapido)
+    return caminhos
+
+def _curva_aleatoria(gerador, data_inicio):
+    """
+    Curva de CDI com 2 a 5 vértices nos primeiros anos, em degrau ou linear.
+    """
+    quantidade = gerador.randint(2, 5)
+    datas = sorted({data_inicio + timedelta(days=gerador.randint(0, 1500)) for _ in range(quantidade)})
+    return montar_curva_cdi(datas, [round(gerador.uniform(2.0, 25.0), 2) for _ in datas], gerador.choice(('degrau', 'linear')))
+
+def verificar_curvas(grupos, gerador, repeticoes):
+    """
+    carteira.calcular_ofertas com curva de CDI contra calcular_rendimento_pos_fixado com a mesma curva.
+    """
+    grupos = [
+        {**grupo, 'curva_cdi': _curva_aleatoria(gerador, grupo['data_inicio']),
+         'ofertas': [oferta for oferta in grupo['ofertas'] if TIPOS_PRODUTO[oferta['tipo']]['indexador'] == 'cdi']}
+        for grupo in grupos
+    ]
+    grupos = [grupo for grupo in grupos if grupo['ofertas']]
+    casos = [
+        {'valor': grupo['valor'], 'data_inicio': grupo['data_inicio'], 'curva_cdi': grupo['curva_cdi']['identificador'], **oferta}
+        for grupo in grupos for oferta in grupo['ofertas']
+    ]
+    inicio = time.perf_counter()
+    esperado = _colunas([
+        # Com curva, o CDI constante é ignorado (mas a função escalar ainda o lê)
+        _referencia(grupo['valor'], oferta['tipo'], oferta['taxa'], oferta['dias'], grupo['taxa_cdi_anual'], grupo['data_inicio'], grupo['curva_cdi'])
+        for grupo in grupos for oferta in grupo['ofertas']
+    ])
+    tempo_referencia = time.perf_counter() - inicio
+    obtido, tempo_rapido = _cronometrar(lambda: _por_grupo(grupos, lambda grupo: carteira.calcular_ofertas(
+        grupo['valor'], np.array([oferta['tipo'] for oferta in grupo['ofertas']], dtype=object),
+        np.array([oferta['taxa'] for oferta in grupo['ofertas']]),
+        np.array([oferta['dias'] for oferta in grupo['ofertas']], dtype=np.int64),
+        grupo['taxa_cdi_anual'], grupo['data_inicio'], grupo['curva_cdi']
+    )), repeticoes)
+    return {'carteira.calcular_ofertas[curva_cdi]': (casos, esperado, obtido, tempo_referencia, tempo_rapido)}
+
+def verificar_reinvestimento(grupos, repeticoes):
+    """
+    Reinvestimento nas mesmas condições até o vencimento mais longo contra o encadeamento das
+    funções escalares: cada perna rende pelo calendário a partir do seu início e o IR recomeça.
+    """
+    grupos = [
+        {**grupo, 'ofertas': [oferta for oferta in grupo['ofertas'] if oferta['dias'] > 0]}
+        for grupo in grupos
+    ]
+    grupos = [grupo for grupo in grupos if grupo['ofertas']]
+    casos = [
+        {'valor': grupo['valor'], 'taxa_cdi_anual': grupo['taxa_cdi_anual'], 'data_inicio': grupo['data_inicio'], **oferta}
+        for grupo in grupos for oferta in grupo['ofertas']
+    ]
+
+    inicio = time.perf_counter()
+    valores_finais = []
+    for grupo in grupos:
+        horizonte = max(oferta['dias'] for oferta in grupo['ofertas'])
+        for oferta in grupo['ofertas']:
+            valor, inicio_perna = grupo['valor'], 0
+            while True:
+                fim_perna = min(inicio_perna + oferta['dias'], horizonte) if inicio_perna else oferta['dias']
+                valor = _referencia(
+                    valor, oferta['tipo'], oferta['taxa'], fim_perna - inicio_perna, grupo['taxa_cdi_anual'],
+                    grupo['data_inicio'] + timedelta(days=inicio_perna)
+                )['valor_final_liquido']
+                if fim_perna >= horizonte:
+                    break
+                inicio_perna = fim_perna
+            valores_finais.append(valor)
+    esperado = {'valor_final_liquido': np.array(valores_finais, dtype=float)}
+    tempo_referencia = time.perf_counter() - inicio
+
+    carteiras = [_carteira_do_grupo(grupo) for grupo in grupos]
+    obtido, tempo_rapido = _cronometrar(lambda: {'valor_final_liquido': np.concatenate([
+        calcular_evolucao_reinvestida(carteira_grupo, grupo['valor'], grupo['taxa_cdi_anual'])['valor_liquido'][:, -1]
+        for grupo, carteira_grupo in zip(grupos, carteiras)
+    ])}, repeticoes)
+    return {'reinvestimento.calcular_evolucao_reinvestida': (casos, esperado, obtido, tempo_referencia, tempo_rapido)}
+
+def _cdi_positivo(gerador, taxa_cdi_anual):
+    """
+    CDI do grupo quando está numa faixa usual (0 a 40% a.a.); senão, um CDI sorteado. A
+    simulação e a equivalência não têm a regra escalar do CDI <= -100%.
+    """
+    return taxa_cdi_anual if 0 < taxa_cdi_anual <= 40 else round(gerador.uniform(1.0, 30.0), 2)
+
+def verificar_simulacao(grupos, gerador, repeticoes):
+    """
+    simulacao_cdi.simular_cenarios_cdi com uma única trajetória por grupo contra a função
+    escalar com a curva de CDI dessa trajetória (regenerada pela mesma semente do lote, um
+    vértice por dia útil). Com uma trajetória, todos os percentis das bandas são o próprio
+    valor de cada dia da grade e a oferta que vence na data comparativa tem probabilidade 1.
+    """
+    casos_bandas, linhas_bandas, obtidos_bandas = [], [], []
+    casos_vitorias, esperado_vitorias, obtidos_vitorias = [], [], []
+    tempo_referencia = tempo_rapido = 0.0
+    for grupo in grupos:
+        data_inicio = grupo['data_inicio']
+        valor = min(grupo['valor'], VALOR_MAXIMO_SIMULACAO)
+        modelo = {
+            'taxa_cdi_inicial': _cdi_positivo(gerador, grupo['taxa_cdi_anual']),
+            'taxa_cdi_longo_prazo': round(gerador.uniform(2.0, 20.0), 2),
+            'velocidade_reversao': gerador.uniform(0.0, 3.0),
+            'volatilidade': gerador.choice((0.0, gerador.uniform(0.1, 5.0))),
+            'taxa_cdi_minima': 0.0
+        }
+        semente = gerador.randrange(2**32)
+        carteira_grupo = _carteira_do_grupo(grupo)
+        dias_comparacao = min(oferta['dias'] for oferta in grupo['ofertas'])
+
+        simulacao, tempo = _cronometrar(lambda: simular_cenarios_cdi(
+            carteira_grupo, valor, data_inicio + timedelta(days=dias_comparacao), **modelo,
+            numero_trajetorias=1, semente=semente
+        ), repeticoes)
+        tempo_rapido += tempo
+
+        inicio = time.perf_counter()
+        total_dias_uteis = dias_uteis_entre(data_inicio, data_inicio + timedelta(days=max(oferta['dias'] for oferta in grupo['ofertas'])))
+        curva_cdi = None
+        if total_dias_uteis > 0:
+            trajetoria = simular_taxas_cdi(
+                total_dias_uteis=total_dias_uteis, numero_trajetorias=1,
+                gerador=np.random.default_rng(np.random.SeedSequence(semente).spawn(1)[0]), **modelo
+            )[:, 0]
+            curva_cdi = montar_curva_cdi(proximos_dias_uteis(data_inicio, total_dias_uteis), trajetoria)
+
+        def valor_no_dia(oferta, dia):
+            if TIPOS_PRODUTO[oferta['tipo']]['indexador'] != 'cdi':
+                return _referencia(valor, oferta['tipo'], oferta['taxa'], dia, modelo['taxa_cdi_inicial'], data_inicio)['valor_final_liquido']
+            return calculations.calcular_rendimento_pos_fixado(
+                valor, oferta['taxa'], dias_uteis_entre(data_inicio, data_inicio + timedelta(days=dia)), modelo['taxa_cdi_inicial'],
+                TIPOS_PRODUTO[oferta['tipo']]['isenta_ir'], prazo_dias_corridos_para_ir=dia, data_inicio=data_inicio,
+                curva_cdi=curva_cdi if dia > 0 else None
+            )[0]
+
+        for nome, oferta in zip(carteira_grupo['nomes'], grupo['ofertas']):
+            banda = simulacao['bandas'][nome]
+            for posicao, dia in enumerate(banda['dias'].tolist()):
+                referencia = valor_no_dia(oferta, dia)
+                for percentil, valores_percentil in zip(simulacao['percentis'], banda['percentis']):
+                    casos_bandas.append({
+                        'valor': valor, 'data_inicio': data_inicio, **modelo, 'semente': semente, **oferta,
+                        'dia': dia, 'percentil': percentil
+                    })
+                    linhas_bandas.append(referencia)
+                    obtidos_bandas.append(valores_percentil[posicao])
+
+        # Vencedor na data comparativa; empates (até meio centavo) ficam de fora
+        na_comparacao = np.array([valor_no_dia(oferta, dias_comparacao) for oferta in grupo['ofertas']])
+        tempo_referencia += time.perf_counter() - inicio
+        if len(na_comparacao) > 1 and np.diff(np.sort(na_comparacao))[-1] <= TOLERANCIA_REAIS:
+            continue
+        vencedora = int(np.argmax(na_comparacao))
+        for posicao, (nome, oferta) in enumerate(zip(carteira_grupo['nomes'], grupo['ofertas'])):
+            casos_vitorias.append({'valor': valor, 'data_inicio': data_inicio, **modelo, 'semente': semente, **oferta})
+            esperado_vitorias.append(1.0 if posicao == vencedora else 0.0)
+            obtidos_vitorias.append(simulacao['probabilidade_vitoria'][nome])
+
+    return {
+        'simulacao_cdi.simular_cenarios_cdi[bandas]': (
+            casos_bandas, {'valor_final_liquido': np.array(linhas_bandas, dtype=float)},
+            {'valor_final_liquido': np.array(obtidos_bandas, dtype=float)}, tempo_referencia, tempo_rapido
+        ),
+        'simulacao_cdi.simular_cenarios_cdi[vitorias]': (
+            casos_vitorias, {'probabilidade_vitoria': np.array(esperado_vitorias)},
+            {'probabilidade_vitoria': np.array(obtidos_vitorias)}, tempo_referencia, tempo_rapido
+        )
+    }
+
+def _bissecao_escalar(funcao, minimo, maximo):
+    """
+    Raiz de uma função escalar em [minimo, maximo] por bisseção, até o intervalo não poder
+    mais ser dividido em ponto flutuante. Retorna NaN se não há troca de sinal.
+    """
+    valor_minimo, valor_maximo = funcao(minimo), funcao(maximo)
+    if valor_minimo == 0:
+        return minimo
+    if valor_maximo == 0:
+        return maximo
+    if (valor_minimo > 0) == (valor_maximo > 0):
+        return float('nan')
+    for _ in range(MAXIMO_ITERACOES_BISSECAO):
+        medio = (minimo + maximo) / 2
+        if medio in (minimo, maximo):
+            break
+        valor_medio = funcao(medio)
+        if valor_medio == 0:
+            return medio
+        if (valor_medio > 0) == (valor_minimo > 0):
+            minimo, valor_minimo = medio, valor_medio
+        else:
+            maximo = medio
+    return (minimo + maximo) / 2
+
+def verificar_equivalencia(grupos, gerador, repeticoes):
+    """
+    Soluções de equivalencia.py (fórmulas fechadas e a bisseção vetorizada do CDI de
+    equilíbrio entre isenta e tributada) contra uma bisseção escalar sobre as funções de
+    calculations.py. A comparação é em R$: o valor final da perna resolvida na solução
+    rápida e na de referência. Sem dias úteis, a pós-fixada não depende da taxa nem do CDI,
+    então não há solução única (NaN), exceto a taxa pré-fixada equivalente (zero).
+    Na bisseção entre isenta e tributada, metade dos casos usa a taxa tributada da fórmula
+    fechada para um CDI sorteado, o que garante um equilíbrio no intervalo de busca. Com um
+    único dia útil as duas pernas são lineares no CDI e essa taxa as torna idênticas (todo
+    CDI empata), então esses casos usam uma taxa sorteada.
+    """
+    casos = []
+    for grupo in grupos:
+        taxa_cdi_anual = _cdi_positivo(gerador, grupo['taxa_cdi_anual'])
+        for oferta in grupo['ofertas']:
+            casos.append({
+                'valor': grupo['valor'], 'data_inicio': grupo['data_inicio'], 'taxa_cdi_anual': taxa_cdi_anual,
+                'dias': oferta['dias'], 'taxa_isenta': round(gerador.uniform(10.0, 200.0), 2),
+                'taxa_prefixada': round(gerador.uniform(*FAIXA_TAXA_POR_INDEXADOR['pre']), 2),
+                'fator_tributada': gerador.choice((None, gerador.uniform(0.8, 1.6)))
+            })
+    for caso in casos:
+        caso['dias_uteis'] = dias_uteis_entre(caso['data_inicio'], caso['data_inicio'] + timedelta(days=max(caso['dias'], 0)))
+        if caso['fator_tributada'] is None and caso['dias_uteis'] != 1:
+            caso['taxa_tributada'] = float(equivalencia.taxa_tributada_equivalente(
+                caso['taxa_isenta'], caso['dias'], caso['taxa_cdi_anual'], caso['data_inicio']
+            ))
+        else:
+            caso['taxa_tributada'] = caso['taxa_isenta'] * (caso['fator_tributada'] or gerador.uniform(0.8, 1.6))
+
+    # Nas pontas da busca de referência, o valor final pode estourar o float (OverflowError, ou
+    # NaN do IOF nulo vezes rendimento infinito): vale infinito
+    def sem_estouro(calcular):
+        try:
+            with np.errstate(all='ignore'):
+                valor_final = calcular()[0]
+        except OverflowError:
+            return float('inf')
+        return float('inf') if np.isnan(valor_final) else valor_final
+
+    def isenta(caso, taxa_cdi_anual):
+        return sem_estouro(lambda: calculations.calcular_rendimento_pos_fixado(
+            caso['valor'], caso['taxa_isenta'], caso['dias_uteis'], taxa_cdi_anual, True, caso['dias'], caso['data_inicio']
+        ))
+
+    def tributada(caso, taxa, taxa_cdi_anual):
+        return sem_estouro(lambda: calculations.calcular_rendimento_pos_fixado(
+            caso['valor'], taxa, caso['dias_uteis'], taxa_cdi_anual, False, caso['dias'], caso['data_inicio']
+        ))
+
+    def prefixada(caso, taxa):
+        return sem_estouro(lambda: calculations.calcular_rendimento_prefixado(caso['valor'], taxa, caso['dias']))
+
+    problemas = {
+        'equivalencia.taxa_tributada_equivalente': {
+            'rapido': lambda indices, grupo: equivalencia.taxa_tributada_equivalente(
+                grupo['taxa_isenta'], grupo['dias'], grupo['taxa_cdi_anual'], grupo['data_inicio']
+            ),
+            'referencia': lambda caso: _bissecao_escalar(
+                lambda taxa: tributada(caso, taxa, caso['taxa_cdi_anual']) - isenta(caso, caso['taxa_cdi_anual']),
+                0.0, LIMITE_BUSCA_REFERENCIA
+            ) if caso['dias_uteis'] > 0 else float('nan'),
+            'valor': lambda caso, taxa: tributada(caso, taxa, caso['taxa_cdi_anual'])
+        },
+        'equivalencia.taxa_prefixada_equivalente': {
+            'rapido': lambda indices, grupo: equivalencia.taxa_prefixada_equivalente(
+                grupo['taxa_isenta'], grupo['dias'], grupo['taxa_cdi_anual'], grupo['data_inicio']
+            ),
+            'referencia': lambda caso: _bissecao_escalar(
+                lambda taxa: prefixada(caso, taxa) - isenta(caso, caso['taxa_cdi_anual']),
+                0.0, LIMITE_BUSCA_REFERENCIA
+            ) if caso['dias'] > 0 else float('nan'),
+            'valor': prefixada
+        },
+        'equivalencia.cdi_equilibrio_prefixada': {
+            'rapido': lambda indices, grupo: equivalencia.cdi_equilibrio_prefixada(
+                grupo['taxa_isenta'], grupo['taxa_prefixada'], grupo['dias'], grupo['data_inicio']
+            ),
+            'referencia': lambda caso: _bissecao_escalar(
+                lambda taxa_cdi_anual: isenta(caso, taxa_cdi_anual) - prefixada(caso, caso['taxa_prefixada']),
+                -99.0, LIMITE_BUSCA_REFERENCIA
+            ) if caso['dias_uteis'] > 0 else float('nan'),
+            'valor': isenta
+        },
+        'equivalencia.cdi_equilibrio_tributada': {
+            'rapido': lambda indices, grupo: equivalencia.cdi_equilibrio_tributada(
+                grupo['taxa_isenta'], grupo['taxa_tributada'], grupo['dias'], grupo['data_inicio']
+            ),
+            'referencia': lambda caso: _bissecao_escalar(
+                lambda taxa_cdi_anual: isenta(caso, taxa_cdi_anual) - tributada(caso, caso['taxa_tributada'], taxa_cdi_anual),
+                equivalencia.CDI_MINIMO_BUSCA, equivalencia.CDI_MAXIMO_BUSCA
+            ) if caso['dias_uteis'] > 0 else float('nan'),
+            'valor': isenta
+        }
+    }
+
+    # As funções rápidas são vetorizadas nos prazos e nas taxas, com CDI e início escalares
+    lotes = {}
+    for indice, caso in enumerate(casos):
+        lotes.setdefault((caso['taxa_cdi_anual'], caso['data_inicio']), []).append(indice)
+    lotes = [
+        (indices, {
+            'taxa_cdi_anual': taxa_cdi_anual, 'data_inicio': data_inicio,
+            **{campo: np.array([casos[indice][campo] for indice in indices]) for campo in ('taxa_isenta', 'taxa_prefixada', 'taxa_tributada', 'dias')}
+        })
+        for (taxa_cdi_anual, data_inicio), indices in lotes.items()
+    ]
+
+    caminhos = {}
+    for nome, problema in problemas.items():
+        inicio = time.perf_counter()
+        solucoes_referencia = [problema['referencia'](caso) for caso in casos]
+        tempo_referencia = time.perf_counter() - inicio
+
+        def resolver():
+            solucoes = np.empty(len(casos))
+            for indices, lote in lotes:
+                solucoes[indices] = problema['rapido'](indices, lote)
+            return solucoes
+        with np.errstate(all='ignore'):
+            solucoes_rapidas, tempo_rapido = _cronometrar(resolver, repeticoes)
+
+        def valores(solucoes):
+            return np.array([
+                problema['valor'](caso, solucao) if np.isfinite(solucao) else float('nan')
+                for caso, solucao in zip(casos, solucoes)
+            ], dtype=float)
+        caminhos[nome] = (
+            [{chave: valor for chave, valor in caso.items() if chave != 'fator_tributada'} for caso in casos],
+            {'valor_final_liquido': valores(solucoes_referencia)}, {'valor_final_liquido': valores(solucoes_rapidas.tolist())},
+            tempo_referencia, tempo_rapido
+        )
+    return caminhos
+
+def _casas_decimais(numero):
+    """
+    Casas decimais necessárias para escrever o número (16 para dízimas).
+    """
+    for casas in range(16):
+        if round(numero, casas) == numero:
+            return casas
+    return 16
+
+def _complexidade(campo, valor):
+    """
+    Ordem usada na redução: menos casas decimais e, depois, menor módulo. Datas contam
+    pela distância ao início da faixa sorteada.
+    """
+    if campo == 'data_inicio':
+        return (0, abs((valor - FAIXA_INICIO[0]).days))
+    return (_casas_decimais(valor), abs(valor))
+
+def _simplificacoes(caso):
+    """
+    Candidatos mais simples para cada campo reduzível de um caso (a redução só aceita os
+    que diminuem a complexidade, então sempre termina).
+    """
+    dias = caso['dias']
+    yield 'dias', [0, 1, dias // 2, dias - dias // 4, dias - 1]
+    for campo in ('valor', 'taxa', 'taxa_cdi_anual'):
+        numero = caso[campo]
+        yield campo, [0.0, 1.0, float(round(numero)), float(round(numero / 2)), round(numero, 2)]
+    yield 'data_inicio', [FAIXA_INICIO[0], FAIXA_INICIO[0] + (caso['data_inicio'] - FAIXA_INICIO[0]) / 2]
+
+def reduzir_caso(caso, diverge, tentativas=MAXIMO_TENTATIVAS_REDUCAO):
+    """
+    Reduz um caso divergente, como o shrinking dos testes baseados em propriedades: tenta,
+    campo a campo, valores mais simples (prazo menor, números redondos, início mais cedo) e
+    fica com cada simplificação em que diverge(caso) continua verdadeiro, até nenhuma
+    funcionar ou as tentativas acabarem. Retorna o caso reduzido.
+    """
+    atual = dict(caso)
+    reduziu = True
+    while reduziu and tentativas > 0:
+        reduziu = False
+        for campo, candidatos in _simplificacoes(atual):
+            for candidato in candidatos:
+                if tentativas <= 0 or _complexidade(campo, candidato) >= _complexidade(campo, atual[campo]):
+                    continue
+                tentativas -= 1
+                reduzido = {**atual, campo: candidato}
+                if diverge(reduzido):
+                    atual, reduziu = reduzido, True
+                    break
+    return atual
+
+def _diverge_unitario(calcular):
+    """
+    Critério da redução para um caminho de resultado por oferta: o cálculo rápido de uma
+    oferta isolada diverge de _referencia. Entradas que um dos lados rejeita (ValueError,
+    ex.: fora do calendário ou prazo recusado pela API) não são casos válidos.
+    """
+    def diverge(caso):
+        try:
+            esperado = _referencia(caso['valor'], caso['tipo'], caso['taxa'], caso['dias'], caso['taxa_cdi_anual'], caso['data_inicio'])
+            obtido = calcular(caso)
+        except ValueError:
+            return False
+        except Exception:
+            return True
+        return comparar([caso], _colunas([esperado]), {coluna: np.atleast_1d(obtido[coluna]) for coluna in esperado})['divergencias'] > 0
+    return diverge
+
+# Cálculo de uma oferta isolada pelos caminhos de resultado no vencimento (usado na redução)
+CALCULOS_UNITARIOS = {
+    'carteira.calcular_ofertas': lambda caso: carteira.calcular_ofertas(
+        caso['valor'], np.array([caso['tipo']], dtype=object), np.array([caso['taxa']]),
+        np.array([caso['dias']], dtype=np.int64), caso['taxa_cdi_anual'], caso['data_inicio']
+    ),
+    'cache_calculos.calcular_carteira': lambda caso: cache_calculos.calcular_carteira(
+        _carteira_do_grupo({'data_inicio': caso['data_inicio'], 'ofertas': [caso]}), caso['valor'], caso['taxa_cdi_anual']
+    ),
+    'api_comparacao.comparar_lote': lambda caso: comparar_lote([{
+        'valor': caso['valor'], 'taxa_cdi_anual': caso['taxa_cdi_anual'], 'data_inicio': caso['data_inicio'].isoformat(),
+        'ofertas': [{'tipo': caso['tipo'], 'taxa': caso['taxa'], 'prazo_dias': caso['dias']}]
+    }])[0]['ofertas'][0]
+}
+
+def executar(grupos=200, grupos_evolucao=20, semente=0, repeticoes=3, filtro=None):
+    """
+    Gera as entradas, verifica todos os caminhos (reportando só os que contêm o texto do filtro) e
+    retorna o relatório com as divergências (reduzidas, nos caminhos de CALCULOS_UNITARIOS) e a
+    aceleração de cada caminho.
+    """
+    gerador = random.Random(semente)
+    grupos_resultado = gerar_grupos(gerador, grupos)
+    grupos_curtos = gerar_grupos(gerador, grupos_evolucao, FAIXA_PRAZO_EVOLUCAO)
+
+    etapas = (
+        lambda: verificar_resultados(grupos_resultado, repeticoes),
+        lambda: verificar_evolucoes(grupos_curtos, repeticoes),
+        lambda: verificar_curvas(grupos_resultado, gerador, repeticoes),
+        lambda: verificar_reinvestimento(grupos_curtos, repeticoes),
+        lambda: verificar_simulacao(grupos_curtos, gerador, repeticoes),
+        lambda: verificar_equivalencia(grupos_curtos, gerador, repeticoes)
+    )
+    caminhos = {}
+    for etapa in etapas:
+        for nome, (casos, esperado, obtido, tempo_referencia, tempo_rapido) in etapa().items():
+            if filtro and filtro not in nome:
+                continue
+            reduzir = None
+            if nome in CALCULOS_UNITARIOS:
+                reduzir = lambda caso, calcular=CALCULOS_UNITARIOS[nome]: reduzir_caso(caso, _diverge_unitario(calcular))
+            caminhos[nome] = {
+                **comparar(casos, esperado, obtido, reduzir),
+                'tempo_referencia_s': tempo_referencia,
+                'tempo_rapido_s': tempo_rapido,
+                'aceleracao': tempo_referencia / tempo_rapido if tempo_rapido else None
+            }
+            marcador = 'ok' if caminhos[nome]['divergencias'] == 0 else f"{caminhos[nome]['divergencias']} DIVERGÊNCIAS"
+            print(
+                f"{nome:<45} {caminhos[nome]['casos']:>8} casos  {caminhos[nome]['aceleracao'] or 0:>8.1f}x  {marcador}",
+                file=sys.stderr
+            )
+    return {
+        'metadados': {
+            'data_execucao': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': np.__version__
+        },
+        'configuracao': {
+            'grupos': grupos, 'grupos_evolucao': grupos_evolucao, 'semente': semente, 'repeticoes': repeticoes,
+            'tolerancia_reais': TOLERANCIA_REAIS, 'tolerancia_aliquota': TOLERANCIA_ALIQUOTA
+        },
+        'caminhos': caminhos
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificação diferencial dos caminhos rápidos contra as funções escalares de calculations.py.")
+    parser.add_argument('--grupos', type=int, default=200, help="Grupos (comparações) sorteados para os resultados no vencimento (padrão: %(default)s)")
+    parser.add_argument('--grupos-evolucao', type=int, default=20, help="Grupos conferidos dia a dia na evolução (padrão: %(default)s)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente das entradas aleatórias (padrão: %(default)s)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções de cada caminho rápido; vale a mais rápida (padrão: %(default)s)")
+    parser.add_argument('--filtro', help="Reporta apenas os caminhos cujo nome contém este texto")
+    parser.add_argument('--saida', help="Grava o relatório em JSON neste arquivo (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    relatorio = executar(args.grupos, args.grupos_evolucao, args.semente, args.repeticoes, args.filtro)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    return 1 if any(caminho['divergencias'] for caminho in relatorio['caminhos'].values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())